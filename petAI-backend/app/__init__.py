@@ -2,6 +2,7 @@ from flask import Flask, request
 from flask_cors import CORS
 from flask_migrate import Migrate
 
+from .cli import register_cli
 from .config import Config
 from .models import bcrypt, db
 from .routes.activity_routes import activity_bp
@@ -20,6 +21,7 @@ from .routes.styles_routes import style_bp
 from .routes.user_routes import interests_bp, user_bp
 from .routes.store_routes import store_bp
 from .routes.chest_routes import chest_bp
+from .services.auth_token_service import AuthTokenService
 
 migrate = Migrate()
 
@@ -27,6 +29,7 @@ migrate = Migrate()
 def create_app(config_class: type[Config] = Config) -> Flask:
     app = Flask(__name__)
     app.config.from_object(config_class)
+    AuthTokenService.check_signing_key(app.config)
     print("creating app... ")
     # CORS MUST be configured before blueprints load.
     CORS(
@@ -59,6 +62,14 @@ def create_app(config_class: type[Config] = Config) -> Flask:
     app.register_blueprint(iap_bp)
     app.register_blueprint(push_bp)
 
+    register_cli(app)
+
+    sweep_interval = app.config.get("ENTITLEMENT_SWEEP_INTERVAL_SECONDS") or 0
+    if sweep_interval > 0 and not app.testing:
+        from .services.entitlement_sweeper import EntitlementSweeper
+
+        EntitlementSweeper.start_background(app, sweep_interval)
+
     @app.after_request
     def apply_cors(response):
         origin = request.headers.get("Origin")
@@ -1,5 +1,8 @@
+from .etag import etag_cached
+from .idempotency import idempotent
 from .token_auth import (
     active_user_required,
+    get_current_entitlement,
     get_current_token_value,
     get_current_user,
     get_current_user_id,
@@ -14,4 +17,7 @@ __all__ = [
     "get_current_user",
     "get_current_user_id",
     "get_current_token_value",
+    "get_current_entitlement",
+    "idempotent",
+    "etag_cached",
 ]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from functools import wraps
+
+from flask import make_response, request
+
+from ..services.state_version_service import StateVersionService
+from .token_auth import get_current_user_id
+
+
+def etag_cached(scope: str):
+    """Answer If-None-Match with 304 from the user's state version before the view does any work.
+
+    Must sit below token_required. Successful responses carry a weak ETag computed after the
+    view ran, since some reads (shop baseline coins, first-time pet creation) write state too.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            user_id = get_current_user_id()
+            if not user_id:
+                return fn(*args, **kwargs)
+            tag = StateVersionService.etag(user_id, scope)
+            if tag and request.if_none_match.contains_weak(tag):
+                response = make_response("", 304)
+                response.set_etag(tag, weak=True)
+                response.headers["Cache-Control"] = "private, no-cache"
+                return response
+
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200:
+                tag = StateVersionService.etag(user_id, scope)
+                if tag:
+                    response.set_etag(tag, weak=True)
+                    response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from ..models import db
+from ..routes import error_response
+from ..services.idempotency_service import IdempotencyService
+from .token_auth import get_current_user_id
+
+
+def idempotent(fn):
+    """Replay the stored response when a client retries with the same Idempotency-Key header.
+
+    Must sit below token_required so the key is scoped to the authenticated user. Wrapped views
+    flush but never commit: the decorator commits their writes together with the stored response,
+    so a claim left without a response never has committed side effects and is safe to re-run.
+    Error responses roll the view's writes back. Requests without the header run normally.
+    """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (request.headers.get("Idempotency-Key") or "").strip()
+        user_id = get_current_user_id()
+        if not key or not user_id:
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code < 400:
+                db.session.commit()
+            else:
+                db.session.rollback()
+            return response
+        if len(key) > IdempotencyService.MAX_KEY_LENGTH:
+            return error_response("Idempotency-Key is too long", 400)
+
+        request_hash = IdempotencyService.request_hash(request.method, request.path, request.get_data())
+        outcome, record = IdempotencyService.claim(user_id, key, request_hash)
+        if outcome == "mismatch":
+            return error_response("Idempotency-Key was already used for a different request", 422)
+        if outcome == "in_progress":
+            return error_response("A request with this Idempotency-Key is still in progress", 409)
+        if outcome == "replay":
+            response = Response(record.response_body, status=record.status_code, mimetype="application/json")
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+
+        record_id = record.id
+        try:
+            response = make_response(fn(*args, **kwargs))
+        except Exception:
+            IdempotencyService.release(record_id)
+            raise
+        if response.status_code >= 500:
+            IdempotencyService.release(record_id)
+        else:
+            if response.status_code >= 400:
+                db.session.rollback()
+            if not IdempotencyService.complete(record_id, response.status_code, response.get_data(as_text=True)):
+                return error_response("This request outlived its Idempotency-Key lock and was not applied", 409)
+        return response
+
+    return wrapper
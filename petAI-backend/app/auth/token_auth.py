@@ -16,30 +16,23 @@ def token_required(fn):
         if not token_value:
             return error_response("Authorization token missing", 401)
 
-        token = AuthTokenService.get_token(token_value)
-        if not AuthTokenService.is_token_active(token):
+        user, token = AuthTokenService.authenticate(token_value)
+        if user is None:
             return error_response("Invalid or expired token", 401)
-        user = token.user
-        inactive = False
         # Lazy-import to avoid circular dependency.
-        from ..services.user_service import UserService
-        from ..services.subscription_service import SubscriptionService
-
-        remaining = UserService._trial_days_left(user)
-        sub_payload = SubscriptionService.subscription_payload(user.id)
-        sub_active = sub_payload.get("active", False)
-        if remaining <= 0 and not sub_active:
-            UserService.mark_trial_expired(user)
-            inactive = True
-        elif sub_active and not user.is_active:
-            UserService.reactivate_user(user.id)
-        if not user.is_active:
-            inactive = True
+        from ..services.entitlement_service import EntitlementService
+
+        # Read-only: users.is_active is kept in sync by EntitlementSweeper, not per request.
+        entitlement = EntitlementService.resolve(user)
+        inactive = not entitlement["subscription_active"] and (
+            entitlement["trial_days_left"] <= 0 or not user.is_active
+        )
 
         # Store on both g and request so downstream code can access it reliably.
         g.current_user = user
         g.current_token_value = token_value
         g.current_token = token
+        g.current_entitlement = entitlement
         setattr(request, "current_user", user)
         setattr(request, "current_token_value", token_value)
         setattr(request, "current_token", token)
@@ -54,10 +47,10 @@ def active_user_required(fn):
     def wrapper(*args, **kwargs):
         inactive = getattr(request, "current_user_inactive", False)
         if inactive:
+            entitlement = getattr(g, "current_entitlement", None) or {}
+            if entitlement.get("trial_days_left", 0) > 0:
+                return error_response("Account inactive. Upgrade to continue.", 403)
             return error_response("Trial expired. Upgrade to continue.", 403)
-        user = getattr(request, "current_user", None)
-        if user is not None and not getattr(user, "is_active", True):
-            return error_response("Account inactive. Upgrade to continue.", 403)
         return fn(*args, **kwargs)
 
     return wrapper
@@ -70,13 +63,11 @@ def premium_required(fn):
         if user is None:
             return error_response("Invalid token", 401)
 
-        from ..services.user_service import UserService
-        from ..services.subscription_service import SubscriptionService
+        from ..services.entitlement_service import EntitlementService
 
-        remaining = UserService._trial_days_left(user)
-        sub_payload = SubscriptionService.subscription_payload(user.id)
-        sub_active = sub_payload.get("active", False)
-        if remaining <= 0 and not sub_active:
+        # Reuses the entitlement resolved by token_required for this request.
+        entitlement = EntitlementService.resolve(user)
+        if not entitlement["has_access"]:
             return error_response("Subscription required", 403)
         return fn(*args, **kwargs)
 
@@ -94,3 +85,7 @@ def get_current_user_id() -> int | None:
 
 def get_current_token_value() -> str | None:
     return getattr(g, "current_token_value", None)
+
+
+def get_current_entitlement() -> dict | None:
+    return getattr(g, "current_entitlement", None)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import time
+
+import click
+from flask import Flask
+
+from .services.auth_token_service import AuthTokenService
+from .services.carry_over_service import CarryOverService
+from .services.daily_stats_service import DailyStatsService
+from .services.daily_pregeneration_service import DailyPregenerationService
+from .services.entitlement_service import EntitlementService
+from .services.entitlement_sweeper import EntitlementSweeper
+from .services.idempotency_service import IdempotencyService
+from .services.job_run_service import JobRunService
+from .services.profile_card_service import ProfileCardService
+from .services.segment_grant_service import SegmentGrantService
+
+
+def register_cli(app: Flask) -> None:
+    @app.cli.command("sweep-entitlements")
+    @click.option("--batch-size", type=int, default=EntitlementSweeper.DEFAULT_BATCH_SIZE, show_default=True)
+    def sweep_entitlements(batch_size: int) -> None:
+        """Deactivate expired trials and reactivate users with paid access."""
+        result = EntitlementSweeper.sweep(batch_size=batch_size)
+        click.echo(f"deactivated={result['deactivated']} reactivated={result['reactivated']}")
+
+    @app.cli.command("rebuild-entitlements")
+    @click.option("--stale-only", is_flag=True, help="Only recompute active rows whose expiry has passed.")
+    @click.option("--batch-size", type=int, default=500, show_default=True)
+    def rebuild_entitlements(stale_only: bool, batch_size: int) -> None:
+        """Backfill or repair the user_entitlements table."""
+        count = EntitlementService.rebuild(stale_only=stale_only, batch_size=batch_size)
+        click.echo(f"rebuilt={count}")
+
+    @app.cli.command("rebuild-daily-stats")
+    @click.option("--batch-size", type=int, default=1000, show_default=True, help="Users per INSERT ... SELECT.")
+    def rebuild_daily_stats(batch_size: int) -> None:
+        """Backfill or repair the user_daily_stats rollup from activity_logs."""
+        result = DailyStatsService.rebuild(batch_size=batch_size)
+        click.echo(f"users={result['users']} rows={result['rows']}")
+
+    @app.cli.command("rebuild-profile-cards")
+    @click.option("--batch-size", type=int, default=500, show_default=True, help="Users per rebuild batch.")
+    def rebuild_profile_cards(batch_size: int) -> None:
+        """Rebuild every profile card, e.g. after item triggers are edited."""
+        click.echo(f"cards={ProfileCardService.rebuild(batch_size=batch_size)}")
+
+    @app.cli.command("prune-tokens")
+    @click.option("--batch-size", type=int, default=1000, show_default=True)
+    @click.option("--max-batches", type=int, default=None, help="Stop after this many delete batches.")
+    def prune_tokens(batch_size: int, max_batches: int | None) -> None:
+        """Delete expired and superseded auth tokens and report throughput."""
+        report = AuthTokenService.prune_tokens(batch_size=batch_size, max_batches=max_batches)
+        for key, value in report.items():
+            click.echo(f"{key}={value}")
+
+    @app.cli.command("prune-idempotency-keys")
+    @click.option("--batch-size", type=int, default=1000, show_default=True)
+    def prune_idempotency_keys(batch_size: int) -> None:
+        """Delete idempotency records past their TTL."""
+        click.echo(f"deleted={IdempotencyService.prune_expired(batch_size=batch_size)}")
+
+    @app.cli.command("grant-segment")
+    @click.option("--filters", default="{}", help='JSON filters, e.g. \'{"plan": "PREMIUM", "min_streak": 7}\'.')
+    @click.option("--grant", "grant", required=True, help='JSON grant, e.g. \'{"type": "coins", "amount": 100}\'.')
+    @click.option("--chunk-size", type=int, default=JobRunService.DEFAULT_CHUNK_SIZE, show_default=True)
+    def grant_segment(filters: str, grant: str, chunk_size: int) -> None:
+        """Create and run a segment grant job; resume it with `flask run-job` if interrupted."""
+        try:
+            params = {"filters": json.loads(filters), "grant": json.loads(grant), "chunk_size": chunk_size}
+        except json.JSONDecodeError as exc:
+            raise click.BadParameter(str(exc))
+        try:
+            job = SegmentGrantService.create_job(params, created_by="cli")
+        except (LookupError, ValueError) as exc:
+            raise click.ClickException(str(exc))
+        click.echo(f"job={job.id} total={job.total}")
+        _run_job(job.id, None)
+
+    @app.cli.command("pregenerate-daily-tasks")
+    @click.option(
+        "--lead-minutes",
+        type=int,
+        default=DailyPregenerationService.DEFAULT_LEAD_MINUTES,
+        show_default=True,
+        help="Cover offsets whose local midnight is at most this far away.",
+    )
+    @click.option("--all-offsets", is_flag=True, help="Generate the next local day for every offset.")
+    @click.option(
+        "--active-within-days",
+        type=int,
+        default=DailyPregenerationService.DEFAULT_ACTIVE_WITHIN_DAYS,
+        show_default=True,
+    )
+    @click.option("--chunk-size", type=int, default=DailyPregenerationService.DEFAULT_CHUNK_SIZE, show_default=True)
+    @click.option("--resume", is_flag=True, help="Continue the latest unfinished run instead of starting a new one.")
+    def pregenerate_daily_tasks(
+        lead_minutes: int,
+        all_offsets: bool,
+        active_within_days: int,
+        chunk_size: int,
+        resume: bool,
+    ) -> None:
+        """Materialize tomorrow's daily tasks for users nearing local midnight; run from cron every 30 minutes."""
+        job = DailyPregenerationService.latest_unfinished() if resume else None
+        if job is None:
+            params = {
+                "lead_minutes": lead_minutes,
+                "all_offsets": all_offsets,
+                "active_within_days": active_within_days,
+                "chunk_size": chunk_size,
+            }
+            try:
+                job = DailyPregenerationService.create_job(params, created_by="cli")
+            except ValueError as exc:
+                raise click.ClickException(str(exc))
+        click.echo(f"job={job.id} total={job.total} offsets={','.join(job.params['targets']) or '-'}")
+        processed, affected = job.processed or 0, job.affected or 0
+        started = time.perf_counter()
+        _run_job(job.id, None)
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        job = JobRunService.get(job.id)
+        users, rows = job.processed - processed, job.affected - affected
+        click.echo(f"elapsed_seconds={elapsed:.2f}")
+        click.echo(f"users_per_second={users / elapsed:.1f}")
+        click.echo(f"rows_per_second={rows / elapsed:.1f}")
+
+    @app.cli.command("carry-over-tasks")
+    @click.option("--date", "target_date", default=None, help="Day to carry tasks into (YYYY-MM-DD); defaults to today in UTC.")
+    @click.option("--chunk-size", type=int, default=CarryOverService.DEFAULT_CHUNK_SIZE, show_default=True)
+    @click.option("--resume", is_flag=True, help="Continue the latest unfinished run instead of starting a new one.")
+    def carry_over_tasks(target_date: str | None, chunk_size: int, resume: bool) -> None:
+        """Move unfinished tasks forward per activity type carry_over_days; run shortly after midnight UTC."""
+        job = CarryOverService.latest_unfinished() if resume else None
+        if job is None:
+            try:
+                job = CarryOverService.create_job({"target_date": target_date, "chunk_size": chunk_size}, created_by="cli")
+            except ValueError as exc:
+                raise click.ClickException(str(exc))
+        click.echo(f"job={job.id} total={job.total} target_date={job.params['target_date']}")
+        _run_job(job.id, None)
+
+    @app.cli.command("simulate-economy")
+    @click.option("--opens", type=int, default=1_000_000, show_default=True, help="Chest opens for the expected-value pass.")
+    @click.option("--users", type=int, default=10_000, show_default=True)
+    @click.option("--days", type=int, default=90, show_default=True)
+    @click.option("--activities-per-day", type=float, default=2.0, show_default=True, help="Poisson mean on active days.")
+    @click.option("--skip-day-probability", type=float, default=0.3, show_default=True)
+    @click.option("--interest-level", default="sometimes", show_default=True)
+    @click.option("--seed", type=int, default=None)
+    def simulate_economy(
+        opens: int,
+        users: int,
+        days: int,
+        activities_per_day: float,
+        skip_day_probability: float,
+        interest_level: str,
+        seed: int | None,
+    ) -> None:
+        """Monte Carlo the live chest tables and reward constants; prints a JSON report."""
+        from .services.economy_simulator import EconomySimulator, SimulationInputs
+
+        try:
+            simulator = EconomySimulator(SimulationInputs.from_app(), seed=seed)
+            report = {
+                "chests": simulator.simulate_chest_opens(opens),
+                "trajectories": simulator.simulate_users(
+                    users,
+                    days,
+                    activities_per_day=activities_per_day,
+                    skip_day_probability=skip_day_probability,
+                    interest_level=interest_level,
+                ),
+            }
+        except (RuntimeError, ValueError) as exc:
+            raise click.ClickException(str(exc))
+        click.echo(json.dumps(report, indent=2))
+
+    @app.cli.command("run-job")
+    @click.argument("job_id", type=int)
+    @click.option("--max-chunks", type=int, default=None, help="Stop after this many chunks.")
+    def run_job(job_id: int, max_chunks: int | None) -> None:
+        """Start or resume a JobRun from its last checkpoint."""
+        _run_job(job_id, max_chunks)
+
+
+def _run_job(job_id: int, max_chunks: int | None) -> None:
+    try:
+        job = JobRunService.run(job_id, max_chunks=max_chunks)
+    except LookupError as exc:
+        raise click.ClickException(str(exc))
+    for key in ("id", "status", "processed", "total", "affected", "cursor"):
+        click.echo(f"{key}={getattr(job, key)}")
@@ -25,14 +25,33 @@ def _load_env_file() -> None:
 
 _load_env_file()
 
+# Development fallback only; signed auth tokens refuse to run with it.
+DEFAULT_SECRET_KEY = "supersecretkey"
+
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///petai.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
+    SECRET_KEY = os.getenv("SECRET_KEY", DEFAULT_SECRET_KEY)
     AUTH_TOKEN_EXPIRES_SECONDS = int(os.getenv("AUTH_TOKEN_EXPIRES_SECONDS", 30 * 24 * 60 * 60))
+    # "opaque" stores tokens in auth_tokens; "signed" issues HMAC tokens validated without a lookup
+    # and requires a real SECRET_KEY.
+    AUTH_TOKEN_FORMAT = os.getenv("AUTH_TOKEN_FORMAT", "opaque").lower()
+    # Opaque tokens per device: "none" always inserts, "reuse" returns the live token, "rotate" replaces it.
+    AUTH_TOKEN_DEVICE_POLICY = os.getenv("AUTH_TOKEN_DEVICE_POLICY", "none").lower()
     ADMIN_TOKEN_TTL_SECONDS = int(os.getenv("ADMIN_TOKEN_TTL_SECONDS", 12 * 60 * 60))
     ENABLE_MOCK_IAP = os.getenv("ENABLE_MOCK_IAP", "false").lower() == "true"
+    # Optional JSON file overriding PET_EVOLUTIONS; re-read when its mtime changes.
+    PET_LEVEL_CURVE_PATH = os.getenv("PET_LEVEL_CURVE_PATH") or None
+    PET_LEVEL_CURVE_CHECK_SECONDS = int(os.getenv("PET_LEVEL_CURVE_CHECK_SECONDS", 5))
+    # Upper bound on how long another process's Item/Chest edits can go unseen by the cached loot tables.
+    LOOT_TABLE_TTL_SECONDS = int(os.getenv("LOOT_TABLE_TTL_SECONDS", 300))
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60))
+    # A claim older than this with no stored response is treated as abandoned (e.g. worker crash).
+    IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 60))
+    ENTITLEMENT_CACHE_TTL_SECONDS = int(os.getenv("ENTITLEMENT_CACHE_TTL_SECONDS", 60))
+    # 0 disables the in-process sweeper; run `flask sweep-entitlements` from cron instead.
+    ENTITLEMENT_SWEEP_INTERVAL_SECONDS = int(os.getenv("ENTITLEMENT_SWEEP_INTERVAL_SECONDS", 0))
 
     
 
@@ -63,3 +82,6 @@ INTEREST_LEVEL_XP = {
     "usually": 10,
     "always": 5,
 }
+
+# A completion pays max(COMPLETION_MIN_COINS, xp awarded) coins.
+COMPLETION_MIN_COINS = 5
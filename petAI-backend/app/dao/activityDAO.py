@@ -10,13 +10,21 @@ from ..models.activity import ActivityLog
 
 class ActivityDAO:
     @staticmethod
-    def log(user_id: int, interest_id: int, xp_earned: int, activity_name: str | None = None) -> ActivityLog:
+    def log(
+        user_id: int,
+        interest_id: int,
+        xp_earned: int,
+        activity_name: str | None = None,
+        timestamp: datetime | None = None,
+    ) -> ActivityLog:
         entry = ActivityLog(
             user_id=user_id,
             interest_id=interest_id,
             xp_earned=xp_earned,
             activity_name=activity_name,
         )
+        if timestamp is not None:
+            entry.timestamp = timestamp
         db.session.add(entry)
         return entry
 
@@ -20,6 +20,7 @@ class ActivityTypeDAO:
         weekly_goal_unit: str | None = None,
         weekly_schedule: str | None = None,
         rrule: str | None = None,
+        carry_over_days: int | None = None,
     ) -> ActivityType:
         existing = (
             ActivityType.query.filter(
@@ -45,6 +46,8 @@ class ActivityTypeDAO:
                 existing.weekly_schedule = weekly_schedule
             if rrule is not None:
                 existing.rrule = rrule
+            if carry_over_days is not None:
+                existing.carry_over_days = carry_over_days
             return existing
         activity_type = ActivityType(
             user_id=user_id,
@@ -57,6 +60,7 @@ class ActivityTypeDAO:
             weekly_goal_unit=weekly_goal_unit,
             weekly_schedule=weekly_schedule,
             rrule=rrule,
+            carry_over_days=carry_over_days or 0,
         )
         db.session.add(activity_type)
         db.session.flush()
@@ -87,6 +91,10 @@ class ActivityTypeDAO:
             .all()
         )
 
+    @staticmethod
+    def list_for_users(user_ids: list[int]) -> list[ActivityType]:
+        return ActivityType.query.filter(ActivityType.user_id.in_(user_ids)).order_by(ActivityType.id.asc()).all()
+
     @staticmethod
     def list_for_interest(user_id: int, interest_id: int) -> list[ActivityType]:
         return (
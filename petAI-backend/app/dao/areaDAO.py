@@ -20,6 +20,10 @@ class AreaDAO:
     def list_for_user(user_id: int) -> list[Area]:
         return Area.query.filter_by(user_id=user_id).order_by(Area.id.asc()).all()
 
+    @staticmethod
+    def list_for_users(user_ids: list[int]) -> list[Area]:
+        return Area.query.filter(Area.user_id.in_(user_ids)).order_by(Area.id.asc()).all()
+
     @staticmethod
     def get_by_user_and_name(user_id: int, name: str) -> Area | None:
         lowered = name.strip().lower()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from sqlalchemy import select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models import db
+
+
+def update_returning(instance, values: dict, returning: tuple[str, ...], *, where=None) -> dict | None:
+    """Apply a single-statement UPDATE to one row and return the resulting column values.
+
+    Uses UPDATE ... RETURNING where the dialect supports it, otherwise UPDATE followed by a
+    SELECT in the same transaction (the row stays write-locked in between). The returned
+    values are written back onto ``instance`` as committed state so the ORM does not flush
+    stale Python-side values over them. Returns None when ``where`` matched no row.
+    """
+    if instance.id is None:
+        db.session.flush()
+    model = type(instance)
+    columns = [getattr(model, name) for name in returning]
+    criteria = [model.id == instance.id]
+    if where is not None:
+        criteria.append(where)
+    stmt = update(model).where(*criteria).values(values).execution_options(synchronize_session=False)
+
+    if db.engine.dialect.update_returning:
+        row = db.session.execute(stmt.returning(*columns)).first()
+    else:
+        result = db.session.execute(stmt)
+        row = None
+        if result.rowcount:
+            row = db.session.execute(select(*columns).where(model.id == instance.id)).first()
+    if row is None:
+        return None
+
+    fresh = dict(zip(returning, row))
+    for name, value in fresh.items():
+        set_committed_value(instance, name, value)
+    return fresh
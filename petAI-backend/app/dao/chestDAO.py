@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+from ..models import db
 from ..models.chest import Chest
 
 
 class ChestDAO:
     @staticmethod
     def get_by_item_id(item_id: int) -> Chest | None:
-        return Chest.query.filter_by(item_id=item_id).first()
+        return db.session.get(Chest, item_id)
 
     @staticmethod
     def list_chests() -> list[Chest]:
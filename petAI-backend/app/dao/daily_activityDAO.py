@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime, timezone
 
-from sqlalchemy import and_
+from sqlalchemy import and_, insert
 
 from ..models import db
 from ..models.daily_activity import DailyActivity
 
 
 class DailyActivityDAO:
+    BULK_INSERT_CHUNK = 500
+
     @staticmethod
     def get_by_id(activity_id: int) -> DailyActivity | None:
         return DailyActivity.query.filter_by(id=activity_id).first()
@@ -26,6 +28,69 @@ class DailyActivityDAO:
             .all()
         )
 
+    @staticmethod
+    def list_for_user_between(user_id: int, start_date: date, end_date: date) -> list[DailyActivity]:
+        return (
+            DailyActivity.query.filter(
+                and_(
+                    DailyActivity.user_id == user_id,
+                    DailyActivity.todo_date >= start_date,
+                    DailyActivity.todo_date <= end_date,
+                )
+            )
+            .order_by(DailyActivity.todo_date.asc(), DailyActivity.id.asc())
+            .all()
+        )
+
+    @staticmethod
+    def _insert_ignoring_duplicates():
+        """INSERT that skips rows hitting uq_user_activitytype_date_title instead of raising."""
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+            return pg_insert(DailyActivity).on_conflict_do_nothing(constraint="uq_user_activitytype_date_title")
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            return sqlite_insert(DailyActivity).on_conflict_do_nothing(
+                index_elements=["user_id", "activity_type_id", "scheduled_for", "title"]
+            )
+        return insert(DailyActivity)
+
+    @classmethod
+    def bulk_insert(cls, rows: list[dict]) -> int:
+        """Insert pending tasks as multi-row INSERTs, letting the unique constraint drop duplicates.
+
+        Rows carry the same keys as create(). Returns how many rows were actually inserted, so
+        concurrent generators for the same user/day never race into an IntegrityError.
+        """
+        if not rows:
+            return 0
+        now = datetime.now(timezone.utc)
+        payload = [
+            {
+                "user_id": row["user_id"],
+                "interest_id": row["interest_id"],
+                "activity_type_id": row["activity_type_id"],
+                "goal_id": row.get("goal_id"),
+                "title": row["title"],
+                "scheduled_for": row["scheduled_for"],
+                "todo_date": row.get("todo_date") or row["scheduled_for"],
+                "status": "pending",
+                "xp_awarded": 0,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for row in rows
+        ]
+        inserted = 0
+        for offset in range(0, len(payload), cls.BULK_INSERT_CHUNK):
+            chunk = payload[offset : offset + cls.BULK_INSERT_CHUNK]
+            result = db.session.execute(cls._insert_ignoring_duplicates().values(chunk))
+            inserted += max(result.rowcount or 0, 0)
+        return inserted
+
     @staticmethod
     def create(
         *,
@@ -53,11 +118,15 @@ class DailyActivityDAO:
         return activity
 
     @staticmethod
-    def mark_completed(activity: DailyActivity, xp_awarded: int | None = None) -> DailyActivity:
+    def mark_completed(
+        activity: DailyActivity,
+        xp_awarded: int | None = None,
+        completed_at: datetime | None = None,
+    ) -> DailyActivity:
         from datetime import datetime, timezone
 
         activity.status = "completed"
-        activity.completed_at = datetime.now(timezone.utc)
+        activity.completed_at = completed_at or datetime.now(timezone.utc)
         if xp_awarded is not None:
             activity.xp_awarded = xp_awarded
         db.session.add(activity)
@@ -2,10 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from sqlalchemy import and_
+from sqlalchemy import and_, case, exists, func, or_, select
+from sqlalchemy.orm import aliased, joinedload
 
 from ..models import db
+from ..models.activity_type import ActivityType
+from ..models.areas import Area
 from ..models.goal import Goal
+from .atomic import update_returning
 
 
 class GoalDAO:
@@ -53,6 +57,20 @@ class GoalDAO:
             query = query.filter(Goal.redeemed_at.is_(None))
         return query.order_by(Goal.created_at.desc()).first()
 
+    @staticmethod
+    def latest_active_by_type(user_ids: list[int]) -> dict[int, Goal]:
+        """latest_active for every activity type of the given users, in one query."""
+        now = datetime.now(timezone.utc)
+        goals = (
+            Goal.query.filter(and_(Goal.user_id.in_(user_ids), Goal.expires_at >= now))
+            .order_by(Goal.created_at.desc())
+            .all()
+        )
+        latest: dict[int, Goal] = {}
+        for goal in goals:
+            latest.setdefault(goal.activity_type_id, goal)
+        return latest
+
     @staticmethod
     def latest_for_activity(user_id: int, activity_type_id: int) -> Goal | None:
         return (
@@ -66,6 +84,89 @@ class GoalDAO:
             .first()
         )
 
+    @staticmethod
+    def latest_by_activity_type(user_id: int) -> dict[int, tuple[Goal | None, Goal | None]]:
+        """Per activity type: (latest active unredeemed goal, latest goal of any state), in one window query.
+
+        Matches latest_active(include_redeemed=False) and latest_for_activity for every type at once.
+        """
+        now = datetime.now(timezone.utc)
+        is_open = case((and_(Goal.expires_at >= now, Goal.redeemed_at.is_(None)), 1), else_=0)
+        newest_first = (Goal.created_at.desc(), Goal.id.desc())
+        ranked = (
+            select(
+                Goal.id.label("goal_id"),
+                is_open.label("is_open"),
+                func.row_number().over(partition_by=Goal.activity_type_id, order_by=newest_first).label("rank_all"),
+                func.row_number()
+                .over(partition_by=(Goal.activity_type_id, is_open), order_by=newest_first)
+                .label("rank_open"),
+            )
+            .where(Goal.user_id == user_id)
+            .subquery()
+        )
+        rows = db.session.execute(
+            select(Goal, ranked.c.is_open, ranked.c.rank_all, ranked.c.rank_open)
+            .join(ranked, ranked.c.goal_id == Goal.id)
+            .where(or_(ranked.c.rank_all == 1, and_(ranked.c.is_open == 1, ranked.c.rank_open == 1)))
+        ).all()
+        latest: dict[int, tuple[Goal | None, Goal | None]] = {}
+        for goal, open_flag, rank_all, rank_open in rows:
+            active, newest = latest.get(goal.activity_type_id, (None, None))
+            if rank_all == 1:
+                newest = goal
+            if open_flag == 1 and rank_open == 1:
+                active = goal
+            latest[goal.activity_type_id] = (active, newest)
+        return latest
+
+    @staticmethod
+    def count_redeemable(user_id: int) -> int:
+        """Completed weekly goals the progression snapshot would offer for redemption, in one COUNT.
+
+        Mirrors the snapshot: only the latest open goal of each activity type in one of the user's
+        areas counts, and the type needs a weekly target plus either a plan or a goal amount.
+        """
+        now = datetime.now(timezone.utc)
+        newer = aliased(Goal)
+        target = func.coalesce(func.nullif(Goal.amount, 0), ActivityType.weekly_goal_value)
+        has_plan = and_(
+            ActivityType.weekly_goal_unit.isnot(None),
+            func.coalesce(ActivityType.weekly_schedule, "") != "",
+        )
+        newer_open = exists().where(
+            newer.user_id == Goal.user_id,
+            newer.activity_type_id == Goal.activity_type_id,
+            newer.expires_at >= now,
+            newer.redeemed_at.is_(None),
+            or_(
+                newer.created_at > Goal.created_at,
+                and_(newer.created_at == Goal.created_at, newer.id > Goal.id),
+            ),
+        )
+        return int(
+            db.session.execute(
+                select(func.count())
+                .select_from(Goal)
+                .join(ActivityType, ActivityType.id == Goal.activity_type_id)
+                .where(
+                    Goal.user_id == user_id,
+                    Goal.expires_at >= now,
+                    Goal.redeemed_at.is_(None),
+                    ActivityType.user_id == user_id,
+                    ActivityType.interest_id.in_(select(Area.id).where(Area.user_id == user_id)),
+                    ActivityType.weekly_goal_value > 0,
+                    or_(has_plan, Goal.amount > 0),
+                    or_(
+                        Goal.completed_at.isnot(None),
+                        and_(target > 0, func.coalesce(Goal.progress_value, 0) >= target),
+                    ),
+                    ~newer_open,
+                )
+            ).scalar()
+            or 0
+        )
+
     @staticmethod
     def list_redeemed_between(
         user_id: int,
@@ -81,21 +182,25 @@ class GoalDAO:
                     Goal.redeemed_at <= end,
                 )
             )
+            .options(joinedload(Goal.activity_type).joinedload(ActivityType.area))
             .order_by(Goal.redeemed_at.desc())
             .all()
         )
 
     @staticmethod
     def increment_progress(goal: Goal, value: float) -> Goal:
-        goal.progress_value = (goal.progress_value or 0) + value
-        if (
-            goal.completed_at is None
-            and goal.amount is not None
-            and goal.amount > 0
-            and (goal.progress_value or 0) >= goal.amount
-        ):
-            goal.completed_at = datetime.now(timezone.utc)
-        db.session.add(goal)
+        update_returning(goal, {"progress_value": func.coalesce(Goal.progress_value, 0) + value}, ("progress_value",))
+        # Only the first writer to cross the target stamps completed_at.
+        update_returning(
+            goal,
+            {"completed_at": datetime.now(timezone.utc)},
+            ("completed_at",),
+            where=and_(
+                Goal.completed_at.is_(None),
+                Goal.amount > 0,
+                Goal.progress_value >= Goal.amount,
+            ),
+        )
         return goal
 
     @staticmethod
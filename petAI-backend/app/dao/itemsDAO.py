@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from sqlalchemy import delete, insert, update
+
 from ..models import db
 from ..models.pet import Pet
 from ..models.storeListing import StoreListing
 from ..models.item import Item
 from ..models.user import User
+from .atomic import update_returning
 from .userDAO import UserDAO
 from ..models.itemOwnership import ItemOwnership
 class ItemsDAO:
@@ -42,7 +45,47 @@ class ItemOwnershipDAO:
     @staticmethod
     def get_items_owned_by_user(user_id: int) -> list[ItemOwnership]:
         return ItemOwnership.query.filter_by(user_id=user_id).all()
-    
+
+    @staticmethod
+    def owned_quantities(user_id: int, item_ids) -> dict[int, int]:
+        item_ids = list(item_ids)
+        if not item_ids:
+            return {}
+        rows = (
+            db.session.query(ItemOwnership.item_id, db.func.coalesce(db.func.sum(ItemOwnership.quantity), 0))
+            .filter(ItemOwnership.user_id == user_id, ItemOwnership.item_id.in_(item_ids))
+            .group_by(ItemOwnership.item_id)
+            .all()
+        )
+        return {item_id: int(quantity) for item_id, quantity in rows}
+
+    @staticmethod
+    def get_items_from_inventory(user_id: int, item_ids) -> dict[int, ItemOwnership]:
+        item_ids = list(item_ids)
+        if not item_ids:
+            return {}
+        # populate_existing so stacks just changed by a Core upsert are not served stale.
+        rows = (
+            ItemOwnership.query.filter(ItemOwnership.user_id == user_id, ItemOwnership.item_id.in_(item_ids))
+            .order_by(ItemOwnership.id.asc())
+            .populate_existing()
+        )
+        owned: dict[int, ItemOwnership] = {}
+        for row in rows:
+            owned.setdefault(row.item_id, row)
+        return owned
+
+    @staticmethod
+    def consume(ownership: ItemOwnership, amount: int) -> int | None:
+        """Atomically take amount off the stack only if it holds that many; None when it does not."""
+        fresh = update_returning(
+            ownership,
+            {"quantity": ItemOwnership.quantity - amount},
+            ("quantity",),
+            where=ItemOwnership.quantity >= amount,
+        )
+        return fresh["quantity"] if fresh else None
+
     @staticmethod
     def add_item_to_user_inventory(user_id: int, item_id: int, quantity: int) -> None:
         item = ItemsDAO.get_item_by_id(item_id)
@@ -54,6 +97,57 @@ class ItemOwnershipDAO:
         ItemOwnershipDAO.create_item_ownership(user_id, item_id,user.pet.id,quantity)
         
     @staticmethod
+    @staticmethod
+    def add_quantities(user_id: int, pet_id: int | None, quantities: dict[int, int]) -> None:
+        """Add quantities onto the user's stacks, creating missing ones, in one upsert."""
+        if not quantities:
+            return
+        rows = [
+            {
+                "user_id": user_id,
+                "item_id": item_id,
+                "pet_id": pet_id,
+                "acquired_at": db.func.now(),
+                "quantity": quantity,
+            }
+            for item_id, quantity in quantities.items()
+        ]
+        dialect = db.engine.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            statement = dialect_insert(ItemOwnership).values(rows)
+            db.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[ItemOwnership.user_id, ItemOwnership.item_id],
+                    set_={"quantity": ItemOwnership.quantity + statement.excluded.quantity},
+                )
+            )
+            return
+        for row in rows:
+            updated = db.session.execute(
+                update(ItemOwnership)
+                .where(ItemOwnership.user_id == user_id, ItemOwnership.item_id == row["item_id"])
+                .values(quantity=ItemOwnership.quantity + row["quantity"])
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not updated:
+                db.session.execute(insert(ItemOwnership).values(row))
+
+    @staticmethod
+    def delete_if_empty(ownership: ItemOwnership) -> bool:
+        """Delete the stack only while it is still empty, so a concurrent grant is never lost."""
+        deleted = db.session.execute(
+            delete(ItemOwnership)
+            .where(ItemOwnership.id == ownership.id, ItemOwnership.quantity <= 0)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if deleted:
+            db.session.expunge(ownership)
+        return bool(deleted)
+
     def create_item_ownership(user_id: int, item_id: int,pet_id:int,quantity:int) -> ItemOwnership:
         try:
             item_ownership = ItemOwnership(user_id=user_id, item_id=item_id, pet_id=pet_id,acquired_at=db.func.now(), quantity=quantity)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+from sqlalchemy import func
+
 from ..models import db
 from ..models.pet import Pet
 from ..models.petStyle import PetStyle
+from .atomic import update_returning
 
 class PetDAO:
     @staticmethod
@@ -20,6 +23,34 @@ class PetDAO:
         db.session.add(pet)
         return pet
 
+    @staticmethod
+    def increment_xp(pet: Pet, amount: int) -> int:
+        fresh = update_returning(pet, {"xp": func.coalesce(Pet.xp, 0) + amount}, ("xp",))
+        if fresh:
+            PetDAO._queue_profile_card(pet)
+        return fresh["xp"] if fresh else (pet.xp or 0)
+
+    @staticmethod
+    def advance_level(pet: Pet, level: int, stage: str, next_evolution_xp: int) -> bool:
+        """Raise the pet to level unless a concurrent writer already got there; never moves it down."""
+        fresh = update_returning(
+            pet,
+            {"level": level, "stage": stage, "next_evolution_xp": next_evolution_xp},
+            ("level", "stage", "next_evolution_xp"),
+            where=Pet.level < level,
+        )
+        if fresh is None:
+            return False
+        PetDAO._queue_profile_card(pet)
+        return True
+
+    @staticmethod
+    def _queue_profile_card(pet: Pet) -> None:
+        # Core UPDATEs skip the Pet mapper events, so the friend card is queued by hand.
+        from ..services.profile_card_service import ProfileCardService  # local import to avoid cycle
+
+        ProfileCardService.queue_user(pet.user_id)
+
     @staticmethod
     def delete_for_user(user_id: int) -> None:
         Pet.query.filter_by(user_id=user_id).delete(synchronize_session=False)
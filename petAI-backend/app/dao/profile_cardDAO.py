@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from sqlalchemy import delete, insert, select
+
+from ..models import db
+from ..models.profile_card import ProfileCard
+
+
+class ProfileCardDAO:
+    _UPDATABLE = (
+        "display_name",
+        "pet_stage",
+        "pet_level",
+        "pet_xp",
+        "pet_next_evolution_xp",
+        "pet_type",
+        "pet_current_sprite",
+        "style_triggers",
+        "updated_at",
+    )
+
+    @staticmethod
+    def get_many(user_ids: list[int]) -> dict[int, ProfileCard]:
+        if not user_ids:
+            return {}
+        cards = db.session.execute(select(ProfileCard).where(ProfileCard.user_id.in_(user_ids))).scalars()
+        return {card.user_id: card for card in cards}
+
+    @classmethod
+    def upsert(cls, rows: list[dict]) -> None:
+        if not rows:
+            return
+        dialect = db.engine.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            statement = dialect_insert(ProfileCard).values(rows)
+            db.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[ProfileCard.user_id],
+                    set_={name: statement.excluded[name] for name in cls._UPDATABLE},
+                )
+            )
+            return
+        db.session.execute(delete(ProfileCard).where(ProfileCard.user_id.in_([row["user_id"] for row in rows])))
+        db.session.execute(insert(ProfileCard).values(rows))
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from sqlalchemy import or_
+from datetime import date
+
+from sqlalchemy import case, func, or_, select, update
 
 from ..models import db
 from ..models.user import PlanType, User
+from .atomic import update_returning
 
 
 class UserDAO:
@@ -77,3 +80,72 @@ class UserDAO:
             db.session.add(user)
             db.session.commit()
 
+
+    @staticmethod
+    def increment_coins(user: User, amount: int) -> int:
+        """Atomically add amount (may be negative) to the balance, flooring at zero."""
+        new_balance = func.coalesce(User.coins, 0) + amount
+        fresh = update_returning(user, {"coins": case((new_balance < 0, 0), else_=new_balance)}, ("coins",))
+        return fresh["coins"] if fresh else (user.coins or 0)
+
+    @staticmethod
+    def spend_coins(user: User, amount: int) -> int | None:
+        """Atomically deduct amount only if the balance covers it; None when it does not."""
+        fresh = update_returning(
+            user,
+            {"coins": User.coins - amount},
+            ("coins",),
+            where=User.coins >= amount,
+        )
+        return fresh["coins"] if fresh else None
+
+    @staticmethod
+    def mark_daily_materialized(user: User, through: date) -> None:
+        """Advance the daily-task marker to through; never moves it backwards."""
+        update_returning(
+            user,
+            {"daily_materialized_through": through},
+            ("daily_materialized_through",),
+            where=or_(User.daily_materialized_through.is_(None), User.daily_materialized_through < through),
+        )
+
+    @staticmethod
+    def mark_daily_materialized_many(user_ids: list[int], through: date) -> int:
+        result = db.session.execute(
+            update(User)
+            .where(
+                User.id.in_(user_ids),
+                or_(User.daily_materialized_through.is_(None), User.daily_materialized_through < through),
+            )
+            .values(daily_materialized_through=through)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    @staticmethod
+    def daily_materialized_through_many(user_ids: list[int]) -> dict[int, date | None]:
+        rows = db.session.execute(
+            select(User.id, User.daily_materialized_through).where(User.id.in_(user_ids))
+        ).all()
+        return {user_id: through for user_id, through in rows}
+
+    @staticmethod
+    def increment_activity_count(user: User) -> int:
+        fresh = update_returning(
+            user, {"activity_count": func.coalesce(User.activity_count, 0) + 1}, ("activity_count",)
+        )
+        return fresh["activity_count"] if fresh else (user.activity_count or 0)
+
+    @staticmethod
+    def bump_state_version(user_ids: list[int]) -> int:
+        result = db.session.execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(state_version=func.coalesce(User.state_version, 0) + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    @staticmethod
+    def get_state_version(user_id: int) -> int | None:
+        return db.session.execute(select(User.state_version).where(User.id == user_id)).scalar()
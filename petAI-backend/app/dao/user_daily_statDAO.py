@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+from sqlalchemy import case, delete, func, insert, literal, select, update
+
+from ..models import db
+from ..models.activity import ActivityLog
+from ..models.user_daily_stat import UserDailyStat
+
+
+class UserDailyStatDAO:
+    @staticmethod
+    def _upsert(values: dict):
+        """INSERT that adds onto an existing (user_id, day) row instead of failing."""
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return None
+        statement = dialect_insert(UserDailyStat).values(**values)
+        return statement.on_conflict_do_update(
+            index_elements=[UserDailyStat.user_id, UserDailyStat.day],
+            set_={
+                "xp": UserDailyStat.xp + statement.excluded.xp,
+                "count": UserDailyStat.count + statement.excluded.count,
+                "coins": UserDailyStat.coins + statement.excluded.coins,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+
+    @classmethod
+    def record(cls, user_id: int, day: date, *, xp: int, coins: int, count: int = 1) -> None:
+        values = {
+            "user_id": user_id,
+            "day": day,
+            "xp": xp,
+            "count": count,
+            "coins": coins,
+            "updated_at": datetime.now(timezone.utc),
+        }
+        statement = cls._upsert(values)
+        if statement is not None:
+            db.session.execute(statement)
+            return
+        updated = db.session.execute(
+            update(UserDailyStat)
+            .where(UserDailyStat.user_id == user_id, UserDailyStat.day == day)
+            .values(
+                xp=UserDailyStat.xp + xp,
+                count=UserDailyStat.count + count,
+                coins=UserDailyStat.coins + coins,
+                updated_at=values["updated_at"],
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if not updated.rowcount:
+            db.session.execute(insert(UserDailyStat).values(**values))
+
+    @staticmethod
+    def list_between(user_id: int, start_day: date, end_day: date) -> list[UserDailyStat]:
+        return (
+            UserDailyStat.query.filter(
+                UserDailyStat.user_id == user_id,
+                UserDailyStat.day >= start_day,
+                UserDailyStat.day <= end_day,
+            )
+            .order_by(UserDailyStat.day.asc())
+            .all()
+        )
+
+    @staticmethod
+    def count_between(user_id: int, start_day: date, end_day: date) -> int:
+        return int(
+            db.session.execute(
+                select(func.coalesce(func.sum(UserDailyStat.count), 0)).where(
+                    UserDailyStat.user_id == user_id,
+                    UserDailyStat.day >= start_day,
+                    UserDailyStat.day <= end_day,
+                )
+            ).scalar()
+            or 0
+        )
+
+    @staticmethod
+    def utc_day(column):
+        """Calendar day of a timestamp in UTC, the bucket DailyStatsService.day_for uses."""
+        if db.engine.dialect.name == "postgresql":
+            # date() on timestamptz follows the session TimeZone, which need not be UTC.
+            return func.date(func.timezone("UTC", column))
+        return func.date(column)
+
+    @classmethod
+    def rebuild_users(cls, first_user_id: int, last_user_id: int, *, min_coins: int) -> int:
+        """Recompute every row for users in [first_user_id, last_user_id] from activity_logs with one INSERT ... SELECT."""
+        db.session.execute(
+            delete(UserDailyStat)
+            .where(UserDailyStat.user_id.between(first_user_id, last_user_id))
+            .execution_options(synchronize_session=False)
+        )
+        day = cls.utc_day(ActivityLog.timestamp)
+        coins = case((ActivityLog.xp_earned > min_coins, ActivityLog.xp_earned), else_=min_coins)
+        source = (
+            select(
+                ActivityLog.user_id,
+                day,
+                func.sum(ActivityLog.xp_earned),
+                func.count(ActivityLog.id),
+                func.sum(coins),
+                literal(datetime.now(timezone.utc), UserDailyStat.updated_at.type),
+            )
+            .where(ActivityLog.user_id.between(first_user_id, last_user_id), ActivityLog.timestamp.isnot(None))
+            .group_by(ActivityLog.user_id, day)
+        )
+        result = db.session.execute(
+            insert(UserDailyStat).from_select(["user_id", "day", "xp", "count", "coins", "updated_at"], source)
+        )
+        return max(result.rowcount or 0, 0)
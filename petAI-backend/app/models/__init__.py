@@ -24,10 +24,17 @@ from .petStyle import PetStyle  # noqa: E402,F401
 from .subscription import Subscription  # noqa: E402,F401
 from .access_code import AccessCode  # noqa: E402,F401
 from .access_code_redemption import AccessCodeRedemption  # noqa: E402,F401
+from .user_entitlement import UserEntitlement  # noqa: E402,F401
 from .milestone_redemption import MilestoneRedemption  # noqa: E402,F401
 from .chest import Chest  # noqa: E402,F401
 from .push_token import PushToken  # noqa: E402,F401
 from .event_log import EventLog  # noqa: E402,F401
+from .idempotency_record import IdempotencyRecord  # noqa: E402,F401
+from .job_run import JobRun  # noqa: E402,F401
+from .job_run_member import JobRunMember  # noqa: E402,F401
+from .user_daily_stat import UserDailyStat  # noqa: E402,F401
+from .profile_card import ProfileCard  # noqa: E402,F401
+from .cache_version import CacheVersion  # noqa: E402,F401
 
 __all__ = [
     "db",
@@ -48,7 +55,14 @@ __all__ = [
     "Subscription",
     "AccessCode",
     "AccessCodeRedemption",
+    "UserEntitlement",
     "MilestoneRedemption",
     "PushToken",
     "EventLog",
+    "IdempotencyRecord",
+    "JobRun",
+    "JobRunMember",
+    "UserDailyStat",
+    "ProfileCard",
+    "CacheVersion",
 ]
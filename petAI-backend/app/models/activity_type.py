@@ -23,6 +23,8 @@ class ActivityType(db.Model):
     weekly_goal_unit = db.Column(db.String(32))
     weekly_schedule = db.Column(db.String(255))
     rrule = db.Column(db.String(255))
+    # How many days an unfinished task keeps moving forward to the next day; 0 disables carry-over.
+    carry_over_days = db.Column(db.Integer, default=0, nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), default=_utcnow, nullable=False)
     updated_at = db.Column(db.DateTime(timezone=True), default=_utcnow, onupdate=_utcnow, nullable=False)
     area = db.relationship("Area", back_populates="activity_types")
@@ -42,6 +44,7 @@ class ActivityType(db.Model):
             "goal": self.goal,
             "plan": self._plan_dict(),
             "rrule": self.rrule,
+            "carry_over_days": self.carry_over_days,
         }
 
     @property
@@ -16,6 +16,11 @@ class AuthToken(db.Model):
     token = db.Column(db.String(255), unique=True, nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at = db.Column(db.DateTime(timezone=True), default=_utcnow, nullable=False)
-    expires_at = db.Column(db.DateTime(timezone=True))
+    expires_at = db.Column(db.DateTime(timezone=True), index=True)
+    device_id = db.Column(db.String(64))
 
     user = db.relationship("User", back_populates="tokens")
+
+    __table_args__ = (
+        db.Index("ix_auth_tokens_user_device", "user_id", "device_id"),
+    )
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from . import db
+
+
+class CacheVersion(db.Model):
+    """Shared counter per cached dataset, bumped in the same transaction as the data it describes.
+
+    Every worker compares its in-process cache against this row, so a committed change reaches all
+    of them and a rolled-back one reaches none.
+    """
+
+    __tablename__ = "cache_versions"
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -38,6 +38,7 @@ class DailyActivity(db.Model):
             "title",
             name="uq_user_activitytype_date_title",
         ),
+        db.Index("ix_daily_activities_user_todo_date", "user_id", "todo_date"),
     )
 
     def to_dict(self) -> dict:
@@ -13,6 +13,8 @@ def _utcnow() -> datetime:
 
 class ItemOwnership(db.Model):
     __tablename__ = "itemsOwnership"
+    # One stack per user and item, so grants can upsert onto it.
+    __table_args__ = (db.Index("uq_itemsOwnership_user_item", "user_id", "item_id", unique=True),)
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
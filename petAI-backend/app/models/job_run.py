@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from . import db
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobRun(db.Model):
+    """A resumable batch job that walks users in id order, checkpointing after every chunk."""
+
+    __tablename__ = "job_runs"
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(64), nullable=False, index=True)
+    status = db.Column(db.String(16), nullable=False, default=STATUS_PENDING)
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    # Highest user id already processed; work resumes strictly after it.
+    cursor = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    affected = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    created_by = db.Column(db.String(120))
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
+    finished_at = db.Column(db.DateTime(timezone=True))
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status == self.STATUS_COMPLETED
+
+    def to_dict(self) -> dict:
+        progress = None
+        if self.total:
+            progress = round(min(self.processed / self.total, 1.0), 4)
+        elif self.status == self.STATUS_COMPLETED:
+            progress = 1.0
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "cursor": self.cursor,
+            "total": self.total,
+            "processed": self.processed,
+            "affected": self.affected,
+            "progress": progress,
+            "error": self.error,
+            "created_by": self.created_by,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from . import db
+
+
+class JobRunMember(db.Model):
+    """A user frozen into a job's segment when the job was created."""
+
+    __tablename__ = "job_run_members"
+
+    job_id = db.Column(db.Integer, db.ForeignKey("job_runs.id", ondelete="CASCADE"), primary_key=True)
+    user_id = db.Column(db.Integer, primary_key=True)
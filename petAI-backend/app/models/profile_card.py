@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from . import db
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ProfileCard(db.Model):
+    """Public view of a user and their pet, served as-is to friend lists and search.
+
+    Rewritten in the same transaction as the pet, style or username write it reflects, so reads
+    never have to check or rebuild it.
+    """
+
+    __tablename__ = "profile_cards"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    display_name = db.Column(db.String(50), nullable=False)
+    pet_stage = db.Column(db.String(50))
+    pet_level = db.Column(db.Integer)
+    pet_xp = db.Column(db.Integer)
+    pet_next_evolution_xp = db.Column(db.Integer)
+    pet_type = db.Column(db.String(50))
+    pet_current_sprite = db.Column(db.String(255))
+    style_triggers = db.Column(db.JSON, nullable=False, default=list)
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        default=_utcnow,
+        onupdate=_utcnow,
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.user_id,
+            "username": self.display_name,
+            "pet_stage": self.pet_stage,
+            "pet_level": self.pet_level,
+            "pet_xp": self.pet_xp,
+            "pet_next_evolution_xp": self.pet_next_evolution_xp,
+            "pet_type": self.pet_type,
+            "pet_current_sprite": self.pet_current_sprite,
+            "pet_style_triggers": list(self.style_triggers or []),
+        }
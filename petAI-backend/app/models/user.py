@@ -39,6 +39,14 @@ class User(db.Model):
     gender = db.Column(db.String(32))
     coins = db.Column(db.Integer, default=0, nullable=False)
     activity_count = db.Column(db.Integer, default=0, nullable=False)
+    # Bumped to revoke every signed access token issued before it.
+    token_generation = db.Column(db.Integer, default=0, nullable=False)
+    # Last date whose daily tasks are already generated; cleared when areas or activity types change.
+    daily_materialized_through = db.Column(db.Date, nullable=True)
+    # Client-reported offset from UTC; buckets users for nightly task pre-generation.
+    utc_offset_minutes = db.Column(db.Integer, default=0, nullable=False)
+    # Bumped by every write that changes what the hub, daily and style reads return; feeds their ETags.
+    state_version = db.Column(db.Integer, default=0, nullable=False)
 
     created_at = db.Column(db.DateTime(timezone=True), default=_utcnow, nullable=False)
     plan = db.Column(PgEnum(PlanType, name="plan_type_enum"), default=PlanType.FREE, nullable=False)
@@ -58,6 +66,7 @@ class User(db.Model):
 
     __table_args__ = (
         db.CheckConstraint("coins >= 0", name="ck_user_coins_non_negative"),
+        db.Index("ix_users_utc_offset_id", "utc_offset_minutes", "id"),
     )
 
     def set_password(self, password: str) -> None:
@@ -92,4 +101,5 @@ class User(db.Model):
             "last_activity_at": self.last_activity_at.isoformat() if self.last_activity_at else None,
             "coins": self.coins,
             "activity_count": self.activity_count,
+            "utc_offset_minutes": self.utc_offset_minutes,
         }
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from . import db
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: datetime | None) -> datetime | None:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class UserEntitlement(db.Model):
+    """Denormalized effective entitlement per user, derived from subscriptions and access codes."""
+
+    __tablename__ = "user_entitlements"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    active = db.Column(db.Boolean, nullable=False, default=False)
+    status = db.Column(db.String(20), nullable=False, default="none")
+    provider = db.Column(db.String(32))
+    product_id = db.Column(db.String(120))
+    is_trial = db.Column(db.Boolean, nullable=False, default=False)
+    expires_at = db.Column(db.DateTime(timezone=True))
+    started_at = db.Column(db.DateTime(timezone=True))
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        default=_utcnow,
+        onupdate=_utcnow,
+    )
+
+    def is_stale(self, now: datetime | None = None) -> bool:
+        """An active row whose expiry has passed must be recomputed from the source tables."""
+        expires_at = _aware(self.expires_at)
+        if not self.active or expires_at is None:
+            return False
+        return expires_at <= (now or _utcnow())
+
+    def to_payload(self) -> dict:
+        if self.status == "none":
+            return {"active": False, "status": "none"}
+        expires_at = _aware(self.expires_at)
+        started_at = _aware(self.started_at)
+        return {
+            "active": bool(self.active),
+            "status": self.status,
+            "product_id": self.product_id,
+            "provider": self.provider,
+            "is_trial": bool(self.is_trial),
+            "expires_at": expires_at.isoformat() if expires_at else None,
+            "started_at": started_at.isoformat() if started_at else None,
+        }
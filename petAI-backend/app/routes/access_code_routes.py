@@ -6,7 +6,7 @@ from ..auth import get_current_user_id, token_required
 from ..models import db
 from ..routes import error_response, success_response
 from ..services.access_code_service import AccessCodeService
-from ..services.subscription_service import SubscriptionService
+from ..services.entitlement_service import EntitlementService
 
 
 access_codes_bp = Blueprint("access_codes", __name__, url_prefix="/access-codes")
@@ -24,7 +24,7 @@ def redeem_access_code():
     if not raw_code:
         return error_response("Code not working", 400)
 
-    if SubscriptionService.subscription_payload(user_id).get("active"):
+    if EntitlementService.subscription_for_user(user_id).get("active"):
         return error_response("Code not working", 400)
 
     try:
@@ -43,6 +43,6 @@ def redeem_access_code():
             "access_code": redemption.access_code.to_dict()
             if redemption.access_code
             else None,
-            "subscription": SubscriptionService.subscription_payload(user_id),
+            "subscription": EntitlementService.subscription_for_user(user_id),
         },
     )
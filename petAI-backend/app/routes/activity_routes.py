@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from flask import Blueprint, request
 
-from ..auth import active_user_required, get_current_user_id, premium_required, token_required
+from ..auth import active_user_required, get_current_user_id, idempotent, premium_required, token_required
 from ..models import db
 from ..routes import error_response, success_response
 from ..services.activity_service import ActivityService
+from ..services.activity_sync_service import ActivitySyncService
 from ..services.pet_service import PetService
 from ..dao.areaDAO import AreaDAO
 from ..dao.activity_typeDAO import ActivityTypeDAO
@@ -63,6 +64,7 @@ def update_activity_type(activity_type_id: int):
     weekly_goal_unit = (payload.get("weekly_goal_unit") or "").strip() or None
     days = payload.get("days") if isinstance(payload.get("days"), list) else None
     rrule = (payload.get("rrule") or "").strip() or None
+    carry_over_days = payload.get("carry_over_days")
 
     if not activity_name:
         return error_response("activity name is required", 400)
@@ -79,6 +81,7 @@ def update_activity_type(activity_type_id: int):
             weekly_goal_unit=weekly_goal_unit,
             days=days,
             rrule=rrule,
+            carry_over_days=carry_over_days,
         )
         db.session.commit()
     except LookupError as exc:
@@ -120,6 +123,7 @@ def options_activity_type_detail(activity_type_id: int):  # noqa: ARG001
 @token_required
 @premium_required
 @active_user_required
+@idempotent
 def complete_activity():
     payload = request.get_json(silent=True) or {}
     area_name = (payload.get("area") or "").strip()
@@ -140,7 +144,7 @@ def complete_activity():
             effort_value=value if value is None else float(value),
             effort_unit=unit,
         )
-        db.session.commit()
+        db.session.flush()
     except LookupError as exc:
         db.session.rollback()
         return error_response(str(exc), 404)
@@ -158,6 +162,7 @@ def complete_activity():
             "level": pet["level"],
             "stage": pet["stage"],
             "evolved": result["evolved"],
+            "levels_gained": result.get("levels_gained", 0),
             "pet": pet,
             "xp_awarded": result["xp_awarded"],
             "coins_awarded": result.get("coins_awarded"),
@@ -174,6 +179,29 @@ def complete_activity():
     )
 
 
+@activity_bp.route("/sync", methods=["POST"])
+@token_required
+@premium_required
+@active_user_required
+def sync_completions():
+    payload = request.get_json(silent=True) or {}
+    user_id = _resolve_user_id()
+    if not user_id:
+        return error_response("user_id is required", 400)
+
+    try:
+        result = ActivitySyncService.sync(user_id, payload.get("completions"))
+        db.session.commit()
+    except LookupError as exc:
+        db.session.rollback()
+        return error_response(str(exc), 404)
+    except ValueError as exc:
+        db.session.rollback()
+        return error_response(str(exc), 400)
+
+    return success_response("Completions synced", result, 200)
+
+
 @activity_bp.route("", methods=["POST"])
 @token_required
 @premium_required
@@ -190,6 +218,7 @@ def create_activity():
     weekly_goal_unit = (payload.get("weekly_goal_unit") or "").strip() or None
     days = payload.get("days") if isinstance(payload.get("days"), list) else None
     rrule = (payload.get("rrule") or "").strip() or None
+    carry_over_days = payload.get("carry_over_days")
 
     if not activity_name:
         return error_response("activity name is required", 400)
@@ -205,6 +234,7 @@ def create_activity():
             weekly_goal_unit=weekly_goal_unit,
             days=days,
             rrule=rrule,
+            carry_over_days=carry_over_days,
         )
         db.session.commit()
     except LookupError as exc:
@@ -9,15 +9,18 @@ from sqlalchemy import or_
 
 from ..dao.chestDAO import ChestDAO
 from ..dao.itemsDAO import ItemOwnershipDAO
-from ..models import Admin_Users, db
+from ..models import AccessCode, Admin_Users, db
 from ..models.user import User
 from ..routes import error_response, success_response
+from ..services.access_code_service import AccessCodeService
 from ..services.auth_token_service import AuthTokenService
 from ..services.chest_service import ChestService
+from ..services.entitlement_service import EntitlementService
+from ..services.job_run_service import JobRunService
+from ..services.level_curve import LevelCurveService
 from ..services.pet_service import PetService
-from ..models import AccessCode, Admin_Users, db
-from ..routes import error_response, success_response
-from ..services.access_code_service import AccessCodeService
+from ..services.segment_grant_service import SegmentGrantService
+from ..services.state_version_service import StateVersionService
 
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
@@ -197,7 +200,6 @@ def logout():
     return redirect(url_for("admin.login"))
 
 
-<<<<<<< HEAD
 @admin_bp.route("/api/users", methods=["GET"])
 @admin_login_required
 def list_users():
@@ -251,6 +253,7 @@ def update_user_coins(user_id: int):
     else:
         return error_response("coins or delta is required", 400)
 
+    StateVersionService.touch(user.id)
     db.session.commit()
     return success_response("Coins updated", {"user_id": user.id, "coins": user.coins})
 
@@ -293,23 +296,21 @@ def grant_chests(user_id: int):
             db.session.add(owned)
         else:
             ItemOwnershipDAO.create_item_ownership(user_id, chest_item_id, pet.id, quantity)
+        StateVersionService.touch(user.id)
         db.session.commit()
         return success_response(
             "Chests granted",
             {"user_id": user.id, "quantity": quantity, "chest_item_id": chest_item_id},
         )
 
-    granted = []
-    for _ in range(quantity):
-        reward = ChestService.grant_chest(user_id=user.id, tier=tier)
-        if reward:
-            granted.append(reward)
-
+    granted = ChestService.grant_chests(user_id=user.id, tier=tier, quantity=quantity)
     db.session.commit()
     return success_response(
         "Chests granted",
         {"user_id": user.id, "quantity": len(granted), "tier": tier, "granted": granted},
-=======
+    )
+
+
 @admin_bp.route("/access-codes", methods=["GET", "POST"])
 @admin_login_required
 def access_codes():
@@ -387,5 +388,115 @@ def access_codes():
         "Access code created",
         {"access_code": code.to_dict()},
         201,
->>>>>>> fdc624a8d75430061f33a30682831793f9809366
     )
+
+
+@admin_bp.route("/access-codes/<int:code_id>", methods=["POST"])
+@admin_login_required
+def update_access_code(code_id: int):
+    code = db.session.get(AccessCode, code_id)
+    if not code:
+        return error_response("Access code not found", 404)
+
+    payload = request.get_json(silent=True) or {}
+    if "active" in payload:
+        active = _parse_bool(payload.get("active"))
+        if active is None:
+            return error_response("active must be a boolean", 400)
+        code.active = active
+    if "expires_at" in payload:
+        expires_raw = payload.get("expires_at")
+        expires_at = _parse_iso_datetime(expires_raw)
+        if expires_raw and expires_at is None:
+            return error_response("expires_at must be ISO-8601", 400)
+        code.expires_at = expires_at
+
+    # Redeemers may gain or lose access immediately, so recompute their entitlements in the same commit.
+    for redemption in code.redemptions:
+        EntitlementService.refresh(redemption.user_id)
+    db.session.commit()
+
+    return success_response("Access code updated", {"access_code": code.to_dict()})
+
+
+@admin_bp.route("/api/level-curve", methods=["GET"])
+@admin_login_required
+def get_level_curve():
+    return success_response("Level curve", {"curve": LevelCurveService.current().to_dict()})
+
+
+@admin_bp.route("/api/level-curve/reload", methods=["POST"])
+@admin_login_required
+def reload_level_curve():
+    try:
+        curve = LevelCurveService.reload()
+    except ValueError as exc:
+        return error_response(str(exc), 400)
+    return success_response("Level curve reloaded", {"curve": curve.to_dict()})
+
+
+@admin_bp.route("/api/segment-grants", methods=["POST"])
+@admin_login_required
+def create_segment_grant():
+    payload = request.get_json(silent=True) or {}
+    admin = getattr(request, "current_admin", None)
+    try:
+        job = SegmentGrantService.create_job(
+            payload,
+            created_by=(admin.username or admin.email) if admin else None,
+        )
+    except LookupError as exc:
+        db.session.rollback()
+        return error_response(str(exc), 404)
+    except ValueError as exc:
+        db.session.rollback()
+        return error_response(str(exc), 400)
+
+    run = _parse_bool(payload.get("run"))
+    if run is None or run:
+        try:
+            max_chunks = int(payload["max_chunks"]) if payload.get("max_chunks") is not None else None
+        except (TypeError, ValueError):
+            return error_response("max_chunks must be an integer", 400)
+        try:
+            job = JobRunService.run(job.id, max_chunks=max_chunks)
+        except Exception:
+            current_app.logger.exception("Segment grant job %s failed", job.id)
+            job = JobRunService.get(job.id)
+    return success_response("Segment grant created", {"job": job.to_dict()}, 201)
+
+
+@admin_bp.route("/api/jobs", methods=["GET"])
+@admin_login_required
+def list_jobs():
+    kind = (request.args.get("kind") or "").strip() or None
+    limit = min(max(request.args.get("limit", 50, type=int) or 50, 1), 200)
+    jobs = JobRunService.list_recent(kind, limit)
+    return success_response("Jobs", {"jobs": [job.to_dict() for job in jobs]})
+
+
+@admin_bp.route("/api/jobs/<int:job_id>", methods=["GET"])
+@admin_login_required
+def get_job(job_id: int):
+    job = JobRunService.get(job_id)
+    if not job:
+        return error_response("Job not found", 404)
+    return success_response("Job", {"job": job.to_dict()})
+
+
+@admin_bp.route("/api/jobs/<int:job_id>/resume", methods=["POST"])
+@admin_login_required
+def resume_job(job_id: int):
+    payload = request.get_json(silent=True) or {}
+    try:
+        max_chunks = int(payload["max_chunks"]) if payload.get("max_chunks") is not None else None
+    except (TypeError, ValueError):
+        return error_response("max_chunks must be an integer", 400)
+    try:
+        job = JobRunService.run(job_id, max_chunks=max_chunks)
+    except LookupError as exc:
+        return error_response(str(exc), 404)
+    except Exception:
+        current_app.logger.exception("Job %s failed", job_id)
+        job = JobRunService.get(job_id)
+    return success_response("Job resumed", {"job": job.to_dict()})
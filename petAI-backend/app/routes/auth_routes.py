@@ -7,6 +7,7 @@ from ..auth import get_current_token_value, token_required
 from ..models import db
 from ..routes import error_response, success_response
 from ..services.auth_token_service import AuthTokenService
+from ..services.state_version_service import StateVersionService
 from ..services.user_service import UserService
 from ..dao.userDAO import UserDAO
 
@@ -41,7 +42,7 @@ def register():
         db.session.rollback()
         return error_response("Failed to create user", 500)
 
-    token_value = AuthTokenService.issue_token(user.id)
+    token_value = AuthTokenService.issue_token(user.id, AuthTokenService.device_id_from_request(payload))
     db.session.commit()
 
     data = UserService.get_user_payload(user)
@@ -62,7 +63,7 @@ def login():
     if not user or not user.check_password(password):
         return error_response("Invalid credentials", 401)
 
-    token_value = AuthTokenService.issue_token(user.id)
+    token_value = AuthTokenService.issue_token(user.id, AuthTokenService.device_id_from_request(payload))
     db.session.commit()
 
     data = UserService.get_user_payload(user)
@@ -93,7 +94,8 @@ def guest_access():
         return error_response(f"Failed to create guest user: {exc}", 500)
 
     # emitir token
-    token_value = AuthTokenService.issue_token(user.id)
+    payload = request.get_json(silent=True) or {}
+    token_value = AuthTokenService.issue_token(user.id, AuthTokenService.device_id_from_request(payload))
     db.session.commit()
 
     # payload final
@@ -159,6 +161,8 @@ def convert_guest():
         user.email = email
         user.set_password(password)
         user.is_guest = False
+        # The new username shows up on friends' lists, so their ETags must change.
+        StateVersionService.touch(user.id)
 
         db.session.commit()
 
@@ -167,7 +171,7 @@ def convert_guest():
         return error_response(f"Failed to convert guest: {exc}", 500)
 
     # emitir token novo para limpar o antigo e iniciar sessão fresh
-    new_token = AuthTokenService.issue_token(user.id)
+    new_token = AuthTokenService.issue_token(user.id, AuthTokenService.device_id_from_request(payload))
     db.session.commit()
 
     data = UserService.get_user_payload(user)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from flask import Blueprint, request
 
-from ..auth import get_current_user_id, token_required
+from ..auth import get_current_user_id, idempotent, token_required
 from ..dao.chestDAO import ChestDAO
 from ..dao.itemsDAO import ItemOwnershipDAO, ItemsDAO, StoreListingDAO
 from ..dao.userDAO import UserDAO
@@ -10,6 +10,7 @@ from ..models import db
 from ..routes import error_response, success_response
 from ..services.chest_service import ChestService
 from ..services.pet_service import PetService
+from ..services.state_version_service import StateVersionService
 
 
 chest_bp = Blueprint("chests", __name__, url_prefix="/chests")
@@ -63,6 +64,7 @@ def list_user_chests():
 
 @chest_bp.route("/open/<int:item_id>", methods=["POST"])
 @token_required
+@idempotent
 def open_chest(item_id: int):
     user_id = _resolve_user_id()
     if not user_id:
@@ -70,7 +72,7 @@ def open_chest(item_id: int):
 
     try:
         result = ChestService.open_chest_for_user(user_id=user_id, chest_item_id=item_id)
-        db.session.commit()
+        db.session.flush()
     except LookupError as exc:
         db.session.rollback()
         return error_response(str(exc), 404)
@@ -81,6 +83,33 @@ def open_chest(item_id: int):
     return success_response("Chest opened", result)
 
 
+@chest_bp.route("/open/<int:item_id>/bulk", methods=["POST"])
+@token_required
+@idempotent
+def open_chests_bulk(item_id: int):
+    user_id = _resolve_user_id()
+    if not user_id:
+        return error_response("user_id is required", 400)
+
+    data = request.get_json(silent=True) or {}
+    try:
+        count = int(data.get("count", 1))
+    except (TypeError, ValueError):
+        return error_response("count must be an integer", 400)
+
+    try:
+        result = ChestService.open_chests_for_user(user_id=user_id, chest_item_id=item_id, count=count)
+        db.session.flush()
+    except LookupError as exc:
+        db.session.rollback()
+        return error_response(str(exc), 404)
+    except ValueError as exc:
+        db.session.rollback()
+        return error_response(str(exc), 400)
+
+    return success_response("Chests opened", result)
+
+
 @chest_bp.route("/store", methods=["GET"])
 @token_required
 def get_chest_store_listings():
@@ -183,12 +212,10 @@ def buy_chest(store_listing_id: int):
             return error_response("Already have max items", 400)
 
     price_to_pay = quantity * (store_listing.price or 0)
-    user_coins = user.coins or 0
-    if user_coins < price_to_pay:
+    # Checked and deducted in one conditional UPDATE so concurrent coin writes are never overwritten.
+    if price_to_pay > 0 and UserDAO.spend_coins(user, price_to_pay) is None:
         return error_response("Insufficient coins", 400)
 
-    user.coins = user_coins - price_to_pay
-
     if store_listing.stock is not None:
         store_listing.stock -= quantity
         if store_listing.stock <= 0:
@@ -200,6 +227,7 @@ def buy_chest(store_listing_id: int):
     else:
         ItemOwnershipDAO.create_item_ownership(user_id, item.id, pet.id, quantity)
 
+    StateVersionService.touch(user_id)
     db.session.commit()
 
     return success_response(
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from datetime import date, timedelta
+
 from flask import Blueprint, request
 
-from ..auth import get_current_user_id, premium_required, token_required
+from ..auth import etag_cached, get_current_user_id, premium_required, token_required
 from ..routes import error_response, success_response
 from ..services.daily_activity_service import DailyActivityService
 from ..models import db
@@ -13,6 +15,7 @@ daily_bp = Blueprint("daily", __name__, url_prefix="/daily")
 @daily_bp.route("/activities", methods=["GET"])
 @token_required
 @premium_required
+@etag_cached("daily")
 def list_daily_activities():
     user_id = get_current_user_id()
     if not user_id:
@@ -25,6 +28,32 @@ def list_daily_activities():
     )
 
 
+@daily_bp.route("/calendar", methods=["GET"])
+@token_required
+@premium_required
+def daily_calendar():
+    user_id = get_current_user_id()
+    if not user_id:
+        return error_response("user_id is required", 400)
+    try:
+        start = date.fromisoformat(request.args["start"]) if request.args.get("start") else DailyActivityService._today()
+        end = date.fromisoformat(request.args["end"]) if request.args.get("end") else start + timedelta(days=30)
+    except ValueError:
+        return error_response("start and end must be YYYY-MM-DD dates", 400)
+
+    try:
+        days = DailyActivityService.calendar(user_id, start, end)
+        db.session.commit()
+    except LookupError as exc:
+        db.session.rollback()
+        return error_response(str(exc), 404)
+    except ValueError as exc:
+        db.session.rollback()
+        return error_response(str(exc), 400)
+
+    return success_response("Calendar", {"start": start.isoformat(), "end": end.isoformat(), "days": days})
+
+
 @daily_bp.route("/activities/complete", methods=["POST"])
 @token_required
 @premium_required
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from flask import Blueprint, request
 
-from ..auth import get_current_user_id, premium_required, token_required
+from ..auth import etag_cached, get_current_user_id, idempotent, premium_required, token_required
 from ..models import db
 from ..routes import error_response, success_response
 from ..services.hub_service import HubService
@@ -15,6 +15,7 @@ hub_bp = Blueprint("hub", __name__, url_prefix="/hub")
 @hub_bp.route("/shop", methods=["GET"])
 @token_required
 @premium_required
+@etag_cached("shop")
 def get_shop_state():
     user_id = get_current_user_id()
     if not user_id:
@@ -77,6 +78,7 @@ def purchase_coins():
 @hub_bp.route("/friends", methods=["GET"])
 @token_required
 @premium_required
+@etag_cached("friends")
 def friends_feed():
     user_id = get_current_user_id()
     if not user_id:
@@ -89,6 +91,7 @@ def friends_feed():
 @hub_bp.route("/progression", methods=["GET"])
 @token_required
 @premium_required
+@etag_cached("progression")
 def progression():
     user_id = get_current_user_id()
     if not user_id:
@@ -103,6 +106,7 @@ def progression():
 
 @hub_bp.route("/progression/redeem", methods=["POST"])
 @token_required
+@idempotent
 def redeem_progression():
     user_id = get_current_user_id()
     if not user_id:
@@ -124,7 +128,7 @@ def redeem_progression():
             goal_id=goal_id,
             milestone_id=milestone_id,
         )
-        db.session.commit()
+        db.session.flush()
     except LookupError as exc:
         db.session.rollback()
         return error_response(str(exc), 404)
@@ -3,7 +3,9 @@ from __future__ import annotations
 from flask import Blueprint, current_app, request
 
 from ..auth import get_current_user_id, token_required
+from ..models import db
 from ..routes import error_response, success_response
+from ..services.entitlement_service import EntitlementService
 from ..services.subscription_service import SubscriptionService
 
 
@@ -16,7 +18,7 @@ def subscription_status():
     user_id = get_current_user_id()
     if not user_id:
         return error_response("user_id is required", 400)
-    payload = SubscriptionService.subscription_payload(user_id)
+    payload = EntitlementService.subscription_for_user(user_id)
     return success_response("Subscription status", payload)
 
 
@@ -34,4 +36,5 @@ def mock_subscription():
         return error_response("active is required", 400)
     active = bool(active)
     sub = SubscriptionService.set_mock_subscription(user_id, active=active)
+    db.session.commit()
     return success_response("Mock subscription updated", {"subscription": sub.to_dict()})
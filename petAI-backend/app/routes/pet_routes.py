@@ -6,6 +6,7 @@ from ..auth import get_current_user_id, premium_required, token_required
 from ..models import db
 from ..routes import error_response, success_response
 from ..services.pet_service import PetService
+from ..services.state_version_service import StateVersionService
 
 
 pet_bp = Blueprint("pet", __name__, url_prefix="/pet")
@@ -59,11 +60,14 @@ def evolve_pet():
         return error_response("Pet not found", 404)
 
     result = PetService.evolve_if_needed(pet)
+    if result["evolved"] or result["levels_gained"]:
+        StateVersionService.touch(user_id)
     db.session.commit()
     return success_response(
         "Pet evolution checked",
         {
             "pet": PetService.pet_payload(pet),
             "evolved": result["evolved"],
+            "levels_gained": result["levels_gained"],
         },
     )
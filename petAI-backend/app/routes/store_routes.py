@@ -2,17 +2,14 @@ from __future__ import annotations
 
 from flask import Blueprint, request
 
-<<<<<<< HEAD
-from ..auth import get_current_user_id, token_required
+from ..auth import get_current_user_id, idempotent, premium_required, token_required
 from ..dao.chestDAO import ChestDAO
-=======
-from ..auth import get_current_user_id, premium_required, token_required
->>>>>>> fdc624a8d75430061f33a30682831793f9809366
 from ..dao.itemsDAO import ItemOwnershipDAO, ItemsDAO, StoreListingDAO
 from ..dao.userDAO import UserDAO
 from ..models import db
 from ..routes import error_response, success_response
 from ..services.pet_service import PetService
+from ..services.state_version_service import StateVersionService
 
 store_bp = Blueprint("store", __name__, url_prefix="/store")
 
@@ -78,6 +75,7 @@ def get_store_listings():
 @store_bp.route("/buy/<int:store_listing_id>", methods=["POST"])
 @token_required
 @premium_required
+@idempotent
 def buy_item(store_listing_id: int):
     data = request.get_json(silent=True) or {}
 
@@ -122,12 +120,10 @@ def buy_item(store_listing_id: int):
             return error_response("Already have max items", 400)
 
     price_to_pay = quantity * (store_listing.price or 0)
-    user_coins = user.coins or 0
-    if user_coins < price_to_pay:
+    # Checked and deducted in one conditional UPDATE so concurrent coin writes are never overwritten.
+    if price_to_pay > 0 and UserDAO.spend_coins(user, price_to_pay) is None:
         return error_response("Insufficient coins", 400)
 
-    user.coins = user_coins - price_to_pay
-
     if store_listing.stock is not None:
         store_listing.stock -= quantity
         if store_listing.stock <= 0:
@@ -139,7 +135,8 @@ def buy_item(store_listing_id: int):
     else:
         ItemOwnershipDAO.create_item_ownership(user_id, item.id, pet.id, quantity)
 
-    db.session.commit()
+    StateVersionService.touch(user_id)
+    db.session.flush()
 
     return success_response(
         "Item purchased successfully",
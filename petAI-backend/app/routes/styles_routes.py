@@ -2,12 +2,13 @@ from __future__ import annotations
 
 from flask import Blueprint, request
 
-from ..auth import get_current_user_id, premium_required, token_required
+from ..auth import etag_cached, get_current_user_id, premium_required, token_required
 from ..dao.itemsDAO import ItemOwnershipDAO, ItemsDAO
 from ..models import db
 from ..models.petStyle import PetStyle
 from ..routes import error_response, success_response
 from ..services.pet_service import PetService
+from ..services.state_version_service import StateVersionService
 
 
 style_bp = Blueprint("style", __name__, url_prefix="/style")
@@ -23,6 +24,7 @@ def _resolve_user_id() -> int | None:
 @style_bp.route("", methods=["GET"])
 @token_required
 @premium_required
+@etag_cached("inventory")
 def get_inventory_items():
     user_id = _resolve_user_id()
     if not user_id:
@@ -57,6 +59,7 @@ def get_inventory_items():
 @style_bp.route("/equipped", methods=["GET"])
 @token_required
 @premium_required
+@etag_cached("style")
 def get_equipped_style():
     user_id = _resolve_user_id()
     if not user_id:
@@ -157,6 +160,7 @@ def equip_item(item_id: int):
         else:
             return error_response("Item type cannot be equipped", 400)
 
+    StateVersionService.touch(user_id)
     db.session.commit()
 
     return success_response(
@@ -109,9 +109,19 @@ def update_profile():
         age_value = int(age) if age is not None else None
     except (TypeError, ValueError):
         return error_response("age must be a number", 400)
+    utc_offset = payload.get("utc_offset_minutes")
+    try:
+        utc_offset_value = int(utc_offset) if utc_offset is not None else None
+    except (TypeError, ValueError):
+        return error_response("utc_offset_minutes must be a number", 400)
 
     try:
-        user_dict = UserService.update_profile(user_id, age=age_value, gender=gender)
+        user_dict = UserService.update_profile(
+            user_id,
+            age=age_value,
+            gender=gender,
+            utc_offset_minutes=utc_offset_value,
+        )
         db.session.commit()
     except ValueError as exc:
         db.session.rollback()
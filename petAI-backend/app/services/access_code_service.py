@@ -3,6 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from ..models import AccessCode, AccessCodeRedemption, db
+from ..services.entitlement_service import EntitlementService
 
 
 class AccessCodeService:
@@ -66,6 +67,7 @@ class AccessCodeService:
         redemption = AccessCodeRedemption(user_id=user_id, access_code_id=code.id)
         db.session.add(redemption)
         code.redeemed_count = (code.redeemed_count or 0) + 1
+        EntitlementService.refresh(user_id)
         return redemption
 
     @staticmethod
@@ -77,7 +79,7 @@ class AccessCodeService:
                 AccessCodeRedemption.user_id == user_id,
                 AccessCode.active.is_(True),
             )
-            .order_by(AccessCodeRedemption.redeemed_at.desc())
+            .order_by(AccessCodeRedemption.redeemed_at.desc(), AccessCodeRedemption.id.desc())
             .first()
         )
         if not redemption:
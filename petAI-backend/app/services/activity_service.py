@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone, date
-from dateutil.rrule import rrulestr
 
-from ..config import INTEREST_LEVEL_XP
+from ..config import COMPLETION_MIN_COINS, INTEREST_LEVEL_XP
 from ..dao.activityDAO import ActivityDAO
 from ..dao.activity_typeDAO import ActivityTypeDAO
 from ..dao.goalDAO import GoalDAO
@@ -14,7 +13,12 @@ from ..models import db
 from ..models.activity import ActivityLog
 from ..services.pet_service import PetService
 from ..services.user_service import UserService
+from ..services.carry_over_service import CarryOverService
 from ..services.chest_service import ChestService
+from ..services.daily_stats_service import DailyStatsService
+from ..services.gameplay_state import GameplayState, GameplayStateService
+from ..services.recurrence import RecurrenceService
+from ..services.state_version_service import StateVersionService
 
 
 class ActivityService:
@@ -28,16 +32,17 @@ class ActivityService:
         target_value: float | None = None,
         effort_unit: str | None = None,
         increment_goal: bool = True,
+        state: GameplayState | None = None,
+        completed_at: datetime | None = None,
     ) -> dict:
-        user = UserDAO.get_by_id(user_id)
-        if not user:
-            raise LookupError("User not found")
+        state = state or GameplayStateService.load(user_id)
+        user = state.user
 
-        area = AreaDAO.get_by_user_and_name(user_id, area_name.strip())
+        area = state.area_by_name(area_name)
         if not area:
             raise LookupError("area not found for user")
 
-        activity_type = ActivityTypeDAO.primary_for_area(user_id, area.id) or ActivityTypeDAO.get_or_create(
+        activity_type = state.primary_activity_type(area) or ActivityTypeDAO.get_or_create(
             user_id, area.id, area.name, level="sometimes"
         )
         if target_value is None and getattr(activity_type, "_plan_dict", None):
@@ -65,16 +70,20 @@ class ActivityService:
         if base_xp <= 0:
             raise ValueError("Configured XP for area level is invalid")
 
-        now = datetime.now(timezone.utc)
+        now = completed_at or datetime.now(timezone.utc)
         today = now.date()
-        last_activity_date = user.last_activity_at.date() if user.last_activity_at else None
+        last_activity_at = user.last_activity_at
+        if last_activity_at is not None and last_activity_at.tzinfo is None:
+            last_activity_at = last_activity_at.replace(tzinfo=timezone.utc)
+        last_activity_date = last_activity_at.date() if last_activity_at else None
 
         streak = user.streak_current or 0
         if last_activity_date is None:
             streak = 1
         else:
             delta_days = (today - last_activity_date).days
-            if delta_days == 0:
+            if delta_days <= 0:
+                # Same day, or a replayed completion older than what we already counted.
                 streak = max(streak, 1)
             elif delta_days == 1:
                 streak = streak + 1
@@ -82,7 +91,8 @@ class ActivityService:
                 streak = 1
         user.streak_current = streak
         user.streak_best = max(user.streak_best or 0, streak)
-        user.last_activity_at = now
+        if last_activity_at is None or now > last_activity_at:
+            user.last_activity_at = now
 
         xp_multiplier = UserService.streak_multiplier(streak)
         effort_boost = 1.0
@@ -99,13 +109,13 @@ class ActivityService:
             interest_id=area.id,
             xp_earned=xp_amount,
             activity_name=activity_title,
+            timestamp=completed_at,
         )
 
-        activity_count = (user.activity_count or 0) + 1
-        user.activity_count = activity_count
+        activity_count = UserService.record_activity(user)
 
         if increment_goal and activity_type:
-            goal = GoalDAO.latest_active(user_id, activity_type.id, include_redeemed=False)
+            goal = state.latest_active_goal(activity_type.id, include_redeemed=False)
             if goal and goal.amount and goal.amount > 0:
                 increment = None
                 if effort_value is not None and effort_value > 0:
@@ -128,17 +138,19 @@ class ActivityService:
                         increment = 1.0
                 GoalDAO.increment_progress(goal, float(increment or 0.0))
 
-        pet = PetService.get_pet_by_user(user_id) or PetService.create_pet(user_id)
+        pet = PetService.pet_for_state(state)
         evolution_result = PetService.add_xp(pet, xp_amount)
         pet = evolution_result["pet"]
-        coins_awarded = max(5, xp_amount)
+        coins_awarded = max(COMPLETION_MIN_COINS, xp_amount)
         UserService.add_coins(user, coins_awarded)
+        DailyStatsService.record_completion(user_id, now, xp=xp_amount, coins=coins_awarded)
+        StateVersionService.touch(user_id)
 
         chest_payload = None
         grant_due = activity_count % ChestService.CHEST_INTERVAL == 0
         bonus_chance = ChestService.should_grant_bonus_chest()
         if grant_due or bonus_chance:
-            chest_payload = ChestService.grant_chest(user_id=user.id)
+            chest_payload = ChestService.grant_chest(user_id=user.id, state=state)
 
         next_chest_in = ChestService.CHEST_INTERVAL - (activity_count % ChestService.CHEST_INTERVAL)
         if next_chest_in == ChestService.CHEST_INTERVAL:
@@ -153,6 +165,7 @@ class ActivityService:
             "coins_awarded": coins_awarded,
             "coins_balance": user.coins,
             "evolved": evolution_result["evolved"],
+            "levels_gained": evolution_result["levels_gained"],
             "interest_id": area.id,
             "streak_current": user.streak_current,
             "streak_best": user.streak_best,
@@ -188,6 +201,7 @@ class ActivityService:
         weekly_goal_unit: str | None = None,
         days: list[str] | None = None,
         rrule: str | None = None,
+        carry_over_days: int | None = None,
     ) -> dict:
         user = UserDAO.get_by_id(user_id)
         if not user:
@@ -221,6 +235,7 @@ class ActivityService:
             weekly_goal_unit=normalized_unit,
             weekly_schedule=schedule,
             rrule=rrule.strip() if rrule else None,
+            carry_over_days=CarryOverService.normalize_days(carry_over_days),
         )
 
         goal = None
@@ -304,6 +319,7 @@ class ActivityService:
         weekly_goal_unit: str | None = None,
         days: list[str] | None = None,
         rrule: str | None = None,
+        carry_over_days: int | None = None,
     ) -> dict:
         activity_type = ActivityTypeDAO.get_by_id(activity_type_id)
         if not activity_type or activity_type.user_id != user_id:
@@ -333,7 +349,12 @@ class ActivityService:
         activity_type.weekly_goal_value = weekly_goal_value
         activity_type.weekly_goal_unit = normalized_unit
         activity_type.weekly_schedule = schedule
+        if rrule:
+            RecurrenceService.compile(rrule, RecurrenceService.anchor(activity_type))
         activity_type.rrule = rrule.strip() if rrule else None
+        carry_over_days = CarryOverService.normalize_days(carry_over_days)
+        if carry_over_days is not None:
+            activity_type.carry_over_days = carry_over_days
 
         goal = None
         if weekly_goal_value is not None:
@@ -407,29 +428,22 @@ class ActivityService:
         rrule: str,
         goal,
     ) -> None:
-        start_dt = datetime.now(timezone.utc)
-        end_dt = start_dt + timedelta(days=6)
-        try:
-            rule = rrulestr(rrule, dtstart=start_dt)
-            occurrences = rule.between(start_dt - timedelta(seconds=1), end_dt, inc=True)
-        except Exception:
-            raise ValueError("Invalid recurrence rule")
-
-        unique_dates = sorted({occ.date() for occ in occurrences})
-        for day in unique_dates:
-            existing = [
-                a
-                for a in DailyActivityDAO.list_for_user_on_date(user_id, day)
-                if a.activity_type_id == activity_type.id and a.title == title
+        start_date = datetime.now(timezone.utc).date()
+        end_date = start_date + timedelta(days=6)
+        occurrences = RecurrenceService.occurrences(
+            rrule, RecurrenceService.anchor(activity_type), start_date, end_date
+        )
+        DailyActivityDAO.bulk_insert(
+            [
+                {
+                    "user_id": user_id,
+                    "interest_id": area_id,
+                    "activity_type_id": activity_type.id,
+                    "goal_id": goal.id if goal else None,
+                    "title": title,
+                    "scheduled_for": day,
+                    "todo_date": day,
+                }
+                for day in occurrences
             ]
-            if existing:
-                continue
-            DailyActivityDAO.create(
-                user_id=user_id,
-                interest_id=area_id,
-                activity_type_id=activity_type.id,
-                goal_id=goal.id if goal else None,
-                title=title,
-                scheduled_for=day,
-                todo_date=day,
-            )
+        )
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from ..models import db
+from ..services.activity_service import ActivityService
+from ..services.daily_activity_service import DailyActivityService
+from ..services.gameplay_state import GameplayStateService
+from ..services.pet_service import PetService
+
+
+class ActivitySyncService:
+    """Replay a client's queued offline completions in one transaction, oldest first."""
+
+    MAX_ITEMS = 100
+
+    @staticmethod
+    def _parse_timestamp(raw) -> datetime:
+        if not isinstance(raw, str) or not raw.strip():
+            raise ValueError("client_timestamp is required")
+        try:
+            parsed = datetime.fromisoformat(raw.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError("client_timestamp must be ISO-8601")
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        # Never let a skewed device clock push streaks into the future.
+        return min(parsed.astimezone(timezone.utc), datetime.now(timezone.utc))
+
+    @staticmethod
+    def _optional_float(value) -> float | None:
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError("value must be numeric")
+
+    @classmethod
+    def _apply(cls, user_id: int, item: dict, completed_at: datetime) -> dict:
+        value = item.get("value") if item.get("value") is not None else item.get("amount")
+        unit = (item.get("unit") or "").strip() or None
+        if item.get("activity_id") is not None:
+            try:
+                activity_id = int(item["activity_id"])
+            except (TypeError, ValueError):
+                raise ValueError("activity_id must be an integer")
+            result = DailyActivityService.complete_daily_activity(
+                user_id,
+                activity_id,
+                logged_value=value,
+                unit=unit,
+                completed_at=completed_at,
+            )
+            completion = result["completion"]
+            return {
+                "xp_awarded": completion.get("xp_awarded"),
+                "coins_awarded": completion.get("coins_awarded"),
+                "streak_current": completion.get("streak_current"),
+                "xp_multiplier": completion.get("xp_multiplier"),
+                "evolved": completion.get("evolved"),
+                "levels_gained": completion.get("levels_gained", 0),
+                "chest": completion.get("chest"),
+                "daily_activity": result["daily_activity"],
+                "goal_progress_increment": result["goal_progress_increment"],
+            }
+
+        area_name = (item.get("area") or "").strip()
+        if not area_name:
+            raise ValueError("area or activity_id is required")
+        result = ActivityService.complete_activity(
+            user_id,
+            area_name,
+            effort_value=cls._optional_float(value),
+            effort_unit=unit,
+            completed_at=completed_at,
+        )
+        return {
+            "xp_awarded": result["xp_awarded"],
+            "coins_awarded": result["coins_awarded"],
+            "streak_current": result["streak_current"],
+            "xp_multiplier": result["xp_multiplier"],
+            "evolved": result["evolved"],
+            "levels_gained": result["levels_gained"],
+            "chest": result["chest"],
+            "activity": result["activity"].to_dict(),
+        }
+
+    @classmethod
+    def sync(cls, user_id: int, items: list) -> dict:
+        """Apply completions sorted by client_timestamp; each runs in its own savepoint.
+
+        A failing item is rolled back on its own and reported; the rest still apply.
+        The caller commits.
+        """
+        if not isinstance(items, list) or not items:
+            raise ValueError("completions must be a non-empty list")
+        if len(items) > cls.MAX_ITEMS:
+            raise ValueError(f"at most {cls.MAX_ITEMS} completions per sync")
+
+        results: list[dict | None] = [None] * len(items)
+        ordered: list[tuple[datetime, int, dict]] = []
+        for index, item in enumerate(items):
+            client_id = item.get("client_id") if isinstance(item, dict) else None
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("completion must be an object")
+                ordered.append((cls._parse_timestamp(item.get("client_timestamp")), index, item))
+            except ValueError as exc:
+                results[index] = {"index": index, "client_id": client_id, "status": "error", "error": str(exc)}
+        ordered.sort(key=lambda entry: (entry[0], entry[1]))
+
+        applied = 0
+        for completed_at, index, item in ordered:
+            entry = {"index": index, "client_id": item.get("client_id")}
+            savepoint = db.session.begin_nested()
+            try:
+                entry["result"] = cls._apply(user_id, item, completed_at)
+                savepoint.commit()
+                entry["status"] = "ok"
+                applied += 1
+            except (LookupError, ValueError) as exc:
+                savepoint.rollback()
+                # Rolled-back objects may be expired or detached; reload state for the next item.
+                GameplayStateService.discard(user_id)
+                entry["status"] = "error"
+                entry["error"] = str(exc)
+            results[index] = entry
+
+        state = GameplayStateService.load(user_id)
+        pet = state.pet
+        return {
+            "results": results,
+            "applied": applied,
+            "failed": len(items) - applied,
+            "pet": PetService.pet_payload(pet) if pet else None,
+            "coins_balance": state.user.coins,
+            "streak_current": state.user.streak_current,
+            "streak_best": state.user.streak_best,
+        }
@@ -1,38 +1,111 @@
 from __future__ import annotations
 
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 
-from flask import current_app
+from flask import current_app, has_app_context, request
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import delete, event, exists, func, select, text, update
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
+from ..config import DEFAULT_SECRET_KEY
 from ..models import AuthToken, db
+from ..models.user import User
 
 
 class AuthTokenService:
+    SIGNED_TOKEN_PREFIX = "st1."
+    _REVOCATION_SET_LIMIT = 10_000
+    _revocation_lock = threading.Lock()
+
+    DEVICE_POLICIES = ("none", "reuse", "rotate")
+
     @staticmethod
-    def issue_token(user_id: int) -> str:
+    def issue_token(user_id: int, device_id: str | None = None) -> str:
+        if AuthTokenService.signed_tokens_enabled():
+            return AuthTokenService._issue_signed_token(user_id)
+        device_id = (device_id or "").strip()[:64] or None
+        policy = AuthTokenService._device_policy() if device_id else "none"
+        if policy == "reuse":
+            existing = (
+                AuthToken.query.filter_by(user_id=user_id, device_id=device_id)
+                .order_by(AuthToken.id.desc())
+                .first()
+            )
+            if AuthTokenService.is_token_active(existing):
+                existing.expires_at = AuthTokenService._compute_expiration()
+                return existing.token
+        elif policy == "rotate":
+            AuthToken.query.filter_by(user_id=user_id, device_id=device_id).delete(synchronize_session="fetch")
+
         token_value = AuthTokenService._generate_token_value()
         expires_at = AuthTokenService._compute_expiration()
-        token = AuthToken(user_id=user_id, token=token_value, expires_at=expires_at)
+        token = AuthToken(user_id=user_id, token=token_value, expires_at=expires_at, device_id=device_id)
         db.session.add(token)
         return token_value
 
+    @staticmethod
+    def _device_policy() -> str:
+        policy = (current_app.config.get("AUTH_TOKEN_DEVICE_POLICY") or "none").lower()
+        return policy if policy in AuthTokenService.DEVICE_POLICIES else "none"
+
+    @staticmethod
+    def device_id_from_request(payload: dict | None = None) -> str | None:
+        """Clients identify a device via the X-Device-Id header or a device_id body field."""
+        raw = request.headers.get("X-Device-Id") or (payload or {}).get("device_id")
+        if not raw:
+            return None
+        return str(raw).strip()[:64] or None
+
     @staticmethod
     def revoke_token(token_value: str) -> bool:
         if not token_value:
             return False
+        if AuthTokenService.is_signed_token(token_value):
+            claims = AuthTokenService.verify_signed_token(token_value)
+            if not claims:
+                return False
+            AuthTokenService.bump_generation(claims["uid"])
+            return True
         token = AuthToken.query.filter_by(token=token_value).first()
         if not token:
             return False
         db.session.delete(token)
         return True
 
+    @staticmethod
+    def revoke_all_for_user(user_id: int) -> None:
+        """Invalidate every signed and opaque token the user holds."""
+        AuthTokenService.bump_generation(user_id)
+        AuthToken.query.filter_by(user_id=user_id).delete(synchronize_session="fetch")
+
     @staticmethod
     def get_token(token_value: str) -> AuthToken | None:
         if not token_value:
             return None
         return AuthToken.query.filter_by(token=token_value).first()
 
+    @staticmethod
+    def authenticate(token_value: str) -> tuple[User | None, AuthToken | None]:
+        """Resolve the user behind a bearer token, accepting both signed and opaque formats."""
+        if AuthTokenService.is_signed_token(token_value):
+            claims = AuthTokenService.verify_signed_token(token_value)
+            if not claims:
+                return None, None
+            user = db.session.get(User, claims["uid"])
+            if not user or (user.token_generation or 0) != claims["gen"]:
+                return None, None
+            return user, None
+
+        token = AuthTokenService.get_token(token_value)
+        if not AuthTokenService.is_token_active(token):
+            return None, None
+        return token.user, token
+
     @staticmethod
     def is_token_active(token: AuthToken | None) -> bool:
         if not token:
@@ -56,6 +129,165 @@ class AuthTokenService:
             return None
         return token
 
+    # --- Signed tokens ---
+    @staticmethod
+    def signed_tokens_enabled() -> bool:
+        return (current_app.config.get("AUTH_TOKEN_FORMAT") or "opaque").lower() == "signed"
+
+    @staticmethod
+    def is_signed_token(token_value: str | None) -> bool:
+        return bool(token_value) and token_value.startswith(AuthTokenService.SIGNED_TOKEN_PREFIX)
+
+    @staticmethod
+    def check_signing_key(config) -> None:
+        """Refuse signed tokens without a configured SECRET_KEY: anyone knowing the default could mint them."""
+        if (config.get("AUTH_TOKEN_FORMAT") or "opaque").lower() != "signed":
+            return
+        if config.get("SECRET_KEY") in (None, "", DEFAULT_SECRET_KEY):
+            raise RuntimeError("AUTH_TOKEN_FORMAT=signed requires a non-default SECRET_KEY")
+
+    @staticmethod
+    def _token_serializer() -> URLSafeSerializer:
+        secret_key = current_app.secret_key or current_app.config.get("SECRET_KEY")
+        if secret_key in (None, "", DEFAULT_SECRET_KEY):
+            raise RuntimeError("Signed auth tokens require a non-default SECRET_KEY")
+        return URLSafeSerializer(secret_key, salt="access-token")
+
+    @staticmethod
+    def _issue_signed_token(user_id: int) -> str:
+        user = db.session.get(User, user_id)
+        if not user:
+            raise LookupError("User not found")
+        issued_at = int(time.time())
+        expires_at = AuthTokenService._compute_expiration()
+        claims = {
+            "uid": user.id,
+            "iat": issued_at,
+            "exp": int(expires_at.timestamp()) if expires_at else None,
+            "gen": user.token_generation or 0,
+        }
+        return AuthTokenService.SIGNED_TOKEN_PREFIX + AuthTokenService._token_serializer().dumps(claims)
+
+    @staticmethod
+    def verify_signed_token(token_value: str) -> dict | None:
+        """Check signature, expiry and the in-memory revocation set without touching the database."""
+        if not AuthTokenService.is_signed_token(token_value):
+            return None
+        raw = token_value[len(AuthTokenService.SIGNED_TOKEN_PREFIX) :]
+        try:
+            claims = AuthTokenService._token_serializer().loads(raw)
+        except BadSignature:
+            return None
+        if not isinstance(claims, dict) or not isinstance(claims.get("uid"), int):
+            return None
+        expires_at = claims.get("exp")
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        generation = claims.get("gen")
+        if not isinstance(generation, int):
+            return None
+        if generation < AuthTokenService._min_generation(claims["uid"]):
+            return None
+        return claims
+
+    @staticmethod
+    def bump_generation(user_id: int) -> int | None:
+        db.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(token_generation=User.token_generation + 1)
+            .execution_options(synchronize_session=False)
+        )
+        generation = db.session.query(User.token_generation).filter(User.id == user_id).scalar()
+        user = db.session.identity_map.get(db.session.identity_key(User, user_id))
+        if user is not None and generation is not None:
+            set_committed_value(user, "token_generation", generation)
+        if generation is not None:
+            # Only published to the in-memory revocation set once the bump is committed.
+            pending = db.session.info.setdefault("pending_token_revocations", {})
+            pending[user_id] = generation
+        return generation
+
+    @staticmethod
+    def _revocations() -> OrderedDict[int, int]:
+        return current_app.extensions.setdefault("auth_token_revocations", OrderedDict())
+
+    @staticmethod
+    def _remember_revocation(user_id: int, min_generation: int) -> None:
+        revocations = AuthTokenService._revocations()
+        with AuthTokenService._revocation_lock:
+            revocations[user_id] = max(min_generation, revocations.get(user_id, 0))
+            revocations.move_to_end(user_id)
+            while len(revocations) > AuthTokenService._REVOCATION_SET_LIMIT:
+                revocations.popitem(last=False)
+
+    @staticmethod
+    def _min_generation(user_id: int) -> int:
+        with AuthTokenService._revocation_lock:
+            return AuthTokenService._revocations().get(user_id, 0)
+
+    # --- Compaction ---
+    @staticmethod
+    def prune_tokens(batch_size: int = 1000, max_batches: int | None = None) -> dict:
+        """Delete expired tokens and tokens superseded by a newer one on the same device.
+
+        Deletes in id batches with a commit after each, so locks and WAL bursts stay small.
+        """
+        batch_size = max(1, int(batch_size))
+        started = time.perf_counter()
+        rows_before = AuthTokenService.token_count()
+        now = datetime.now(timezone.utc)
+
+        newer = aliased(AuthToken)
+        superseded = exists().where(
+            newer.user_id == AuthToken.user_id,
+            newer.device_id == AuthToken.device_id,
+            newer.id > AuthToken.id,
+        )
+        criteria = {
+            "expired": (AuthToken.expires_at.isnot(None), AuthToken.expires_at <= now),
+            "superseded": (AuthToken.device_id.isnot(None), superseded),
+        }
+        deleted = {name: 0 for name in criteria}
+        batches = 0
+        for name, where in criteria.items():
+            while max_batches is None or batches < max_batches:
+                ids = db.session.execute(
+                    select(AuthToken.id).where(*where).order_by(AuthToken.id).limit(batch_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                db.session.execute(
+                    delete(AuthToken).where(AuthToken.id.in_(ids)).execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                deleted[name] += len(ids)
+                batches += 1
+
+        elapsed = time.perf_counter() - started
+        total_deleted = sum(deleted.values())
+        return {
+            "rows_before": rows_before,
+            "rows_after": AuthTokenService.token_count(),
+            "deleted_expired": deleted["expired"],
+            "deleted_superseded": deleted["superseded"],
+            "batches": batches,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(total_deleted / elapsed, 1) if elapsed > 0 else None,
+            "table_bytes": AuthTokenService.table_size_bytes(),
+        }
+
+    @staticmethod
+    def token_count() -> int:
+        return db.session.execute(select(func.count(AuthToken.id))).scalar() or 0
+
+    @staticmethod
+    def table_size_bytes() -> int | None:
+        """Heap + index size on Postgres; other backends do not expose a per-table size."""
+        if db.engine.dialect.name != "postgresql":
+            return None
+        return db.session.execute(text("SELECT pg_total_relation_size('auth_tokens')")).scalar()
+
     @staticmethod
     def _generate_token_value() -> str:
         return secrets.token_urlsafe(48)
@@ -66,3 +298,17 @@ class AuthTokenService:
         if not ttl_seconds or ttl_seconds <= 0:
             return None
         return datetime.now(timezone.utc) + timedelta(seconds=int(ttl_seconds))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_token_revocations(session) -> None:
+    pending = session.info.pop("pending_token_revocations", None)
+    if not pending or not has_app_context():
+        return
+    for user_id, generation in pending.items():
+        AuthTokenService._remember_revocation(user_id, generation)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_token_revocations(session) -> None:
+    session.info.pop("pending_token_revocations", None)
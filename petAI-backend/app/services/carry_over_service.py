@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import case, exists, func, select, update
+
+from ..models import JobRun, db
+from ..models.activity_type import ActivityType
+from ..models.daily_activity import DailyActivity
+from .job_run_service import JobRunService
+from .state_version_service import StateVersionService
+
+
+class CarryOverService:
+    """Move unfinished daily tasks forward to the target day, following each activity type's carry_over_days.
+
+    Only the newest pending task of a type moves, and only when the type has nothing on the target
+    day yet, so a type that is generated every day never stacks copies.
+    """
+
+    KIND = "daily_carry_over"
+    MAX_CARRY_OVER_DAYS = 7
+    DEFAULT_CHUNK_SIZE = 500
+
+    @classmethod
+    def normalize_days(cls, value) -> int | None:
+        if value is None:
+            return None
+        try:
+            days = int(value)
+        except (TypeError, ValueError):
+            raise ValueError("carry_over_days must be an integer")
+        if not 0 <= days <= cls.MAX_CARRY_OVER_DAYS:
+            raise ValueError(f"carry_over_days must be between 0 and {cls.MAX_CARRY_OVER_DAYS}")
+        return days
+
+    @classmethod
+    def validate(cls, params: dict) -> dict:
+        raw_date = params.get("target_date")
+        if raw_date:
+            try:
+                target_date = date.fromisoformat(str(raw_date).strip())
+            except ValueError:
+                raise ValueError("target_date must be YYYY-MM-DD")
+        else:
+            target_date = datetime.now(timezone.utc).date()
+        try:
+            chunk_size = int(params.get("chunk_size") or cls.DEFAULT_CHUNK_SIZE)
+        except (TypeError, ValueError):
+            raise ValueError("chunk_size must be an integer")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be greater than zero")
+        return {"target_date": target_date.isoformat(), "chunk_size": chunk_size}
+
+    @staticmethod
+    def _eligible_user_ids():
+        return select(ActivityType.user_id).where(ActivityType.carry_over_days > 0).distinct()
+
+    @classmethod
+    def count(cls, params: dict) -> int:
+        return int(db.session.execute(select(func.count()).select_from(cls._eligible_user_ids().subquery())).scalar() or 0)
+
+    @classmethod
+    def run_chunk(cls, params: dict, after_id: int, limit: int) -> tuple[int | None, int, int]:
+        user_ids = (
+            db.session.execute(
+                cls._eligible_user_ids()
+                .where(ActivityType.user_id > after_id)
+                .order_by(ActivityType.user_id.asc())
+                .limit(limit)
+            )
+            .scalars()
+            .all()
+        )
+        if not user_ids:
+            return None, 0, 0
+        moved = cls.carry_over(user_ids[0], user_ids[-1], date.fromisoformat(params["target_date"]))
+        if moved:
+            StateVersionService.touch(*user_ids)
+        return user_ids[-1], len(user_ids), moved
+
+    @classmethod
+    def carry_over(cls, first_user_id: int, last_user_id: int, target_date: date) -> int:
+        """Advance todo_date for eligible pending tasks of users in [first_user_id, last_user_id] in one UPDATE."""
+        tasks = DailyActivity.__table__
+        types = ActivityType.__table__
+        other = tasks.alias("other_task")
+
+        allowed_days = select(types.c.carry_over_days).where(types.c.id == tasks.c.activity_type_id).scalar_subquery()
+        earliest_scheduled = case(
+            {days: target_date - timedelta(days=days) for days in range(1, cls.MAX_CARRY_OVER_DAYS + 1)},
+            value=allowed_days,
+            else_=target_date,
+        )
+        carrying_types = select(types.c.id).where(
+            types.c.carry_over_days > 0,
+            types.c.user_id.between(first_user_id, last_user_id),
+        )
+        same_type = (other.c.user_id == tasks.c.user_id) & (other.c.activity_type_id == tasks.c.activity_type_id)
+        statement = (
+            update(tasks)
+            .where(
+                tasks.c.user_id.between(first_user_id, last_user_id),
+                tasks.c.status == "pending",
+                tasks.c.todo_date < target_date,
+                tasks.c.activity_type_id.in_(carrying_types),
+                tasks.c.scheduled_for >= earliest_scheduled,
+                ~exists().where(same_type, other.c.todo_date == target_date),
+                ~exists().where(
+                    same_type,
+                    other.c.status == "pending",
+                    other.c.todo_date < target_date,
+                    other.c.scheduled_for > tasks.c.scheduled_for,
+                ),
+            )
+            .values(todo_date=target_date, updated_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        return max(db.session.execute(statement).rowcount or 0, 0)
+
+    @classmethod
+    def create_job(cls, params: dict | None = None, *, created_by: str | None = None) -> JobRun:
+        return JobRunService.create(cls.KIND, params or {}, created_by=created_by)
+
+    @classmethod
+    def latest_unfinished(cls) -> JobRun | None:
+        return (
+            JobRun.query.filter(JobRun.kind == cls.KIND, JobRun.status != JobRun.STATUS_COMPLETED)
+            .order_by(JobRun.id.desc())
+            .first()
+        )
+
+
+JobRunService.register(CarryOverService.KIND, CarryOverService)
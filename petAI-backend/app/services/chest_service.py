@@ -3,9 +3,11 @@ from __future__ import annotations
 import random
 
 from ..dao.chestDAO import ChestDAO
-from ..dao.itemsDAO import ItemOwnershipDAO, ItemsDAO
+from ..dao.itemsDAO import ItemOwnershipDAO
 from ..models import db
+from ..services.loot_table import LootTableService
 from ..services.pet_service import PetService
+from ..services.state_version_service import StateVersionService
 from ..services.user_service import UserService
 from ..dao.userDAO import UserDAO
 
@@ -13,6 +15,7 @@ from ..dao.userDAO import UserDAO
 class ChestService:
     CHEST_INTERVAL = 5
     BONUS_CHEST_CHANCE = 0.10
+    MAX_BULK_OPEN = 100
     CHEST_TIERS = ("common", "rare", "epic")
     CHEST_TIER_WEIGHTS = {
         "common": 0.7,
@@ -66,7 +69,7 @@ class ChestService:
         return random.random() < cls.BONUS_CHEST_CHANCE
 
     @classmethod
-    def grant_chest(cls, *, user_id: int, tier: str | None = None) -> dict | None:
+    def grant_chest(cls, *, user_id: int, tier: str | None = None, state=None) -> dict | None:
         chest = cls._pick_chest(tier)
         if not chest or not chest.item_id:
             return None
@@ -76,11 +79,38 @@ class ChestService:
             owned.quantity = (owned.quantity or 0) + 1
             db.session.add(owned)
         else:
-            pet = PetService.get_pet_by_user(user_id) or PetService.create_pet(user_id)
+            if state is not None:
+                pet = PetService.pet_for_state(state)
+            else:
+                pet = PetService.get_pet_by_user(user_id) or PetService.create_pet(user_id)
             owned = ItemOwnershipDAO.create_item_ownership(user_id, chest.item_id, pet.id, 1)
 
+        StateVersionService.touch(user_id)
         return cls._chest_payload(chest, owned)
 
+    @classmethod
+    def grant_chests(cls, *, user_id: int, tier: str | None = None, quantity: int = 1) -> list[dict]:
+        """Grant quantity randomly picked chests with one ownership upsert per distinct chest."""
+        tables = LootTableService.current()
+        picks = [tables.pick_chest_id(tier) for _ in range(quantity)]
+        counts: dict[int, int] = {}
+        for chest_item_id in picks:
+            if chest_item_id is not None:
+                counts[chest_item_id] = counts.get(chest_item_id, 0) + 1
+        if not counts:
+            return []
+
+        pet = PetService.get_pet_by_user(user_id) or PetService.create_pet(user_id)
+        ItemOwnershipDAO.add_quantities(user_id, pet.id, counts)
+        existing = ItemOwnershipDAO.get_items_from_inventory(user_id, counts)
+        StateVersionService.touch(user_id)
+        db.session.flush()
+        return [
+            cls._chest_payload(ChestDAO.get_by_item_id(chest_item_id), existing[chest_item_id])
+            for chest_item_id in picks
+            if chest_item_id is not None
+        ]
+
     @classmethod
     def open_chest_for_user(cls, *, user_id: int, chest_item_id: int) -> dict:
         user = UserDAO.get_by_id(user_id)
@@ -105,6 +135,7 @@ class ChestService:
         else:
             owned.quantity = remaining
 
+        StateVersionService.touch(user_id)
         db.session.flush()
 
         return {
@@ -114,6 +145,87 @@ class ChestService:
             "coins_balance": user.coins,
         }
 
+    @classmethod
+    def open_chests_for_user(cls, *, user_id: int, chest_item_id: int, count: int) -> dict:
+        """Open count chests of one type with a fixed number of writes.
+
+        Rewards are rolled up front; XP and coins land in one pet/user update each and
+        won items get one ownership upsert per distinct item.
+        """
+        if count <= 0:
+            raise ValueError("count must be greater than zero")
+        if count > cls.MAX_BULK_OPEN:
+            raise ValueError(f"at most {cls.MAX_BULK_OPEN} chests per request")
+
+        user = UserDAO.get_by_id(user_id)
+        if not user:
+            raise LookupError("User not found")
+        chest = ChestDAO.get_by_item_id(chest_item_id)
+        if not chest:
+            raise LookupError("Chest not found")
+        owned = ItemOwnershipDAO.get_item_from_inventory(user_id, chest_item_id)
+        if not owned or (owned.quantity or 0) < count:
+            raise ValueError("Not enough chests owned")
+        remaining = ItemOwnershipDAO.consume(owned, count)
+        if remaining is None:
+            raise ValueError("Not enough chests owned")
+
+        chest_tier = (chest.tier or "common").strip().lower()
+        config = cls._resolve_chest_config(chest, chest_tier)
+        pool = LootTableService.current().item_pool(chest_tier, config.get("max_item_rarity"))
+        owned_qty = ItemOwnershipDAO.owned_quantities(user_id, pool.capped_item_ids) if pool else {}
+
+        rewards: list[dict] = []
+        item_counts: dict[int, int] = {}
+        total_xp = 0
+        total_coins = 0
+        for _ in range(count):
+            picked = None
+            if pool and random.random() < config["item_chance"]:
+                picked = pool.sample(owned_qty)
+            if picked:
+                # Count this batch's wins so max_quantity holds across the whole request.
+                owned_qty[picked.id] = owned_qty.get(picked.id, 0) + 1
+                item_counts[picked.id] = item_counts.get(picked.id, 0) + 1
+                reward = {"type": "item", "item": picked.to_reward()}
+            elif random.random() < 0.5:
+                xp = random.randint(*config["xp_range"])
+                total_xp += xp
+                reward = {"type": "xp", "xp": xp}
+            else:
+                coins = random.randint(*config["coin_range"])
+                total_coins += coins
+                reward = {"type": "coins", "coins": coins}
+            reward["chest_tier"] = chest_tier
+            reward["chest_item_id"] = chest.item_id
+            rewards.append(reward)
+
+        pet = PetService.get_pet_by_user(user_id) or PetService.create_pet(user_id)
+        evolution = PetService.add_xp(pet, total_xp)
+        UserService.add_coins(user, total_coins)
+        ItemOwnershipDAO.add_quantities(user_id, pet.id, item_counts)
+
+        if remaining <= 0:
+            ItemOwnershipDAO.delete_if_empty(owned)
+            remaining = 0
+        StateVersionService.touch(user_id)
+        db.session.flush()
+
+        return {
+            "rewards": rewards,
+            "opened": count,
+            "totals": {
+                "xp": total_xp,
+                "coins": total_coins,
+                "items": [{"item_id": item_id, "quantity": qty} for item_id, qty in item_counts.items()],
+            },
+            "evolved": evolution["evolved"],
+            "levels_gained": evolution["levels_gained"],
+            "remaining_quantity": remaining,
+            "pet": PetService.pet_payload(pet),
+            "coins_balance": user.coins,
+        }
+
     @classmethod
     def open_chest(cls, *, user, pet, chest) -> dict:
         chest_tier = (chest.tier or "common").strip().lower()
@@ -148,21 +260,10 @@ class ChestService:
 
     @classmethod
     def _pick_chest(cls, tier: str | None = None):
-        if tier:
-            candidates = ChestDAO.list_chests_by_tier(tier)
-            if candidates:
-                return random.choice(candidates)
-
-        candidates = ChestDAO.list_chests()
-        if not candidates:
+        chest_item_id = LootTableService.current().pick_chest_id(tier)
+        if chest_item_id is None:
             return None
-
-        weights = []
-        for chest in candidates:
-            chest_tier = (chest.tier or "common").strip().lower()
-            weight = cls.CHEST_TIER_WEIGHTS.get(chest_tier, 1.0)
-            weights.append(max(weight, 0.05))
-        return random.choices(candidates, weights=weights, k=1)[0]
+        return ChestDAO.get_by_item_id(chest_item_id)
 
     @classmethod
     def _resolve_chest_config(cls, chest, tier: str) -> dict:
@@ -220,6 +321,7 @@ class ChestService:
                 "xp": xp,
                 "pet": PetService.pet_payload(evolution["pet"]),
                 "evolved": evolution["evolved"],
+                "levels_gained": evolution["levels_gained"],
             }
         coins = random.randint(coin_range[0], coin_range[1])
         UserService.add_coins(user, coins)
@@ -227,44 +329,16 @@ class ChestService:
 
     @classmethod
     def _award_item(cls, *, user_id: int, tier: str | None = None, max_item_rarity: str | None = None) -> dict | None:
-        items = ItemsDAO.list_items()
-        if not items:
-            return None
-        chest_item_ids = {chest.item_id for chest in ChestDAO.list_chests() if chest.item_id}
-        chest_items = [
-            item
-            for item in items
-            if item.id not in chest_item_ids
-            if (item.default_source or "").strip().lower() == "chest"
-        ]
-        if chest_items:
-            pool = chest_items
-        else:
-            pool = [item for item in items if item.id not in chest_item_ids]
+        chest_tier = (tier or "common").strip().lower()
+        pool = LootTableService.current().item_pool(chest_tier, max_item_rarity)
         if not pool:
             return None
-        owned = ItemOwnershipDAO.get_items_owned_by_user(user_id)
-        owned_qty = {entry.item_id: (entry.quantity or 0) for entry in owned}
-        eligible = []
-        max_rank = cls._rarity_rank(max_item_rarity) if max_item_rarity else None
-        for item in pool:
-            if max_rank is not None and cls._rarity_rank(item.rarity) > max_rank:
-                continue
-            max_qty = item.max_quantity
-            if max_qty is not None and owned_qty.get(item.id, 0) >= max_qty:
-                continue
-            eligible.append(item)
-        if not eligible:
+        # Only capped items need the user's inventory; everything else is settled by the cached table.
+        owned_qty = ItemOwnershipDAO.owned_quantities(user_id, pool.capped_item_ids)
+        picked = pool.sample(owned_qty)
+        if not picked:
             return None
 
-        chest_tier = (tier or "common").strip().lower()
-        weights = []
-        rarity_weights = cls.RARITY_WEIGHTS.get(chest_tier, {})
-        for item in eligible:
-            rarity = (item.rarity or "").strip().lower()
-            weight = rarity_weights.get(rarity, 1.0)
-            weights.append(max(weight, 0.05))
-        picked = random.choices(eligible, weights=weights, k=1)[0]
         existing = ItemOwnershipDAO.get_item_from_inventory(user_id, picked.id)
         if existing:
             existing.quantity = (existing.quantity or 0) + 1
@@ -275,15 +349,7 @@ class ChestService:
                 pet = PetService.create_pet(user_id)
             ItemOwnershipDAO.create_item_ownership(user_id, picked.id, pet.id, 1)
 
-        return {
-            "id": picked.id,
-            "name": picked.name,
-            "type": picked.type.value if picked.type else None,
-            "rarity": picked.rarity,
-            "asset_path": picked.asset_path,
-            "trigger": picked.trigger,
-            "trigger_value": picked.trigger_value,
-        }
+        return picked.to_reward()
 
     @staticmethod
     def _chest_payload(chest, owned) -> dict:
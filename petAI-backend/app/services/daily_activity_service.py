@@ -2,17 +2,29 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta, timezone
 
+from sqlalchemy import event, func, update
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
 from ..dao.activity_typeDAO import ActivityTypeDAO
 from ..dao.daily_activityDAO import DailyActivityDAO
 from ..dao.goalDAO import GoalDAO
 from ..dao.areaDAO import AreaDAO
+from ..dao.userDAO import UserDAO
+from ..models.activity_type import ActivityType
+from ..models.areas import Area
 from ..models.daily_activity import DailyActivity
+from ..models.user import User
 from ..services.activity_service import ActivityService
+from ..services.gameplay_state import GameplayStateService
 from ..services.pet_service import PetService
+from ..services.recurrence import RecurrenceService
 
 
 class DailyActivityService:
     _DAY_KEYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+    MAX_CALENDAR_DAYS = 93
 
     @classmethod
     def _today(cls) -> date:
@@ -29,6 +41,30 @@ class DailyActivityService:
 
     @classmethod
     def ensure_goal(cls, user_id: int, activity_type_id: int, *, title: str | None, amount: float | None, unit: str | None):
+        if amount is None or not (unit or "").strip():
+            return None
+        return cls._resolve_goal(
+            user_id,
+            activity_type_id,
+            title=title,
+            amount=amount,
+            unit=unit,
+            existing=GoalDAO.latest_active(user_id, activity_type_id),
+        )
+
+    @classmethod
+    def _resolve_goal(
+        cls,
+        user_id: int,
+        activity_type_id: int,
+        *,
+        title: str | None,
+        amount,
+        unit: str | None,
+        existing,
+        create: bool = True,
+    ):
+        """ensure_goal with the latest active goal already looked up; create=False never inserts."""
         if amount is None:
             return None
         try:
@@ -40,7 +76,6 @@ class DailyActivityService:
         normalized_unit = (unit or "").strip() or None
         if normalized_unit is None:
             return None
-        existing = GoalDAO.latest_active(user_id, activity_type_id)
         if existing and existing.amount and existing.amount > 0 and existing.unit:
             matches = (
                 abs(float(existing.amount) - normalized_amount) <= 0.0001
@@ -50,6 +85,8 @@ class DailyActivityService:
                 if existing.redeemed_at:
                     return None
                 return existing
+        if not create:
+            return None
         expires_at = datetime.now(timezone.utc) + timedelta(days=7)
         return GoalDAO.create(
             user_id,
@@ -116,83 +153,263 @@ class DailyActivityService:
         return f"{value:.2f}".rstrip("0").rstrip(".")
 
     @classmethod
-    def ensure_for_date(cls, user_id: int, target_date: date) -> list[DailyActivity]:
-        day_key = cls._day_key(target_date)
-        interests = AreaDAO.list_for_user(user_id)
-        existing_for_day = DailyActivityDAO.list_for_user_on_date(user_id, target_date)
-        for interest in interests:
-            activity_types = ActivityTypeDAO.list_for_interest(user_id, interest.id)
+    def _load_plans(cls, user_ids: list[int]) -> dict[int, list[dict]]:
+        """Resolve every area/activity type into a generation template in a fixed number of queries.
+
+        Goals are only looked up here; _template_goal_id resolves one when its template first emits a row.
+        """
+        types_by_interest: dict[int, list] = {}
+        for activity_type in ActivityTypeDAO.list_for_users(user_ids):
+            types_by_interest.setdefault(activity_type.interest_id, []).append(activity_type)
+        latest_goals = GoalDAO.latest_active_by_type(user_ids)
+
+        plans: dict[int, list[dict]] = {user_id: [] for user_id in user_ids}
+        for interest in AreaDAO.list_for_users(user_ids):
+            user_id = interest.user_id
+            activity_types = types_by_interest.get(interest.id)
             if not activity_types:
                 activity_types = [ActivityTypeDAO.get_or_create(user_id, interest.id, interest.name)]
 
             for activity_type in activity_types:
-                plan = cls._plan_details(activity_type) if activity_type else None
-                days = plan["days"] if plan else []
-                if days and day_key not in days:
-                    continue
-
-                title_base = (activity_type.goal or "").strip() if activity_type else ""
-                if not title_base:
-                    title_base = (activity_type.name or "").strip() if activity_type else ""
-                if not title_base:
-                    title_base = interest.name
-
-                per_day_title = title_base
-                if plan and plan.get("per_day"):
-                    amount_text = cls._format_amount(plan["per_day"])
-                    if amount_text:
-                        unit = (plan.get("unit") or "").strip()
-                        day_label = cls._day_label(day_key)
-                        parts = [title_base, "for", amount_text]
-                        if unit:
-                            parts.append(unit)
-                        if day_label:
-                            parts.append(day_label)
-                        per_day_title = " ".join(parts)
-
-                activity_type_id = activity_type.id if activity_type else cls.ensure_activity_type(user_id, interest.id, interest.name)
-                amount = plan.get("weekly_value") if plan else None
-                unit = plan.get("unit") if plan else None
-                if plan is None and activity_type:
-                    amount = activity_type.weekly_goal_value
-                    unit = activity_type.weekly_goal_unit
-                unit = (unit or "").strip() or None
-                goal = None
-                if amount is not None and unit:
-                    goal = cls.ensure_goal(
-                        user_id,
-                        activity_type_id,
-                        title=title_base,
-                        amount=amount,
-                        unit=unit,
-                    )
-                # avoid duplicates
-                existing = [
-                    a
-                    for a in existing_for_day
-                    if a.activity_type_id == activity_type_id and a.title == per_day_title
-                ]
-                if existing:
-                    continue
-                existing_for_day.append(
-                    DailyActivityDAO.create(
-                        user_id=user_id,
-                        interest_id=interest.id,
-                        activity_type_id=activity_type_id,
-                        goal_id=goal.id if goal else None,
-                        title=per_day_title,
-                        scheduled_for=target_date,
-                        todo_date=target_date,
-                    )
+                plan = cls._plan_details(activity_type)
+                title_base = (activity_type.goal or "").strip() or (activity_type.name or "").strip() or interest.name
+                amount = plan.get("weekly_value") if plan else activity_type.weekly_goal_value
+                unit = plan.get("unit") if plan else activity_type.weekly_goal_unit
+                plans[user_id].append(
+                    {
+                        "interest_id": interest.id,
+                        "activity_type_id": activity_type.id,
+                        "goal_amount": amount,
+                        "goal_unit": (unit or "").strip() or None,
+                        "existing_goal": latest_goals.get(activity_type.id),
+                        "title_base": title_base,
+                        "plan": plan,
+                        "rrule": (activity_type.rrule or "").strip() or None,
+                        "rrule_start": RecurrenceService.anchor(activity_type) if activity_type.rrule else None,
+                    }
                 )
+        return plans
+
+    @classmethod
+    def _expand_recurrences(cls, templates: list[dict], start_date: date, end_date: date) -> None:
+        """Attach the set of dates each RRULE template fires on within the window."""
+        for template in templates:
+            if not template["rrule"]:
+                continue
+            try:
+                template["occurs_on"] = set(
+                    RecurrenceService.occurrences(template["rrule"], template["rrule_start"], start_date, end_date)
+                )
+            except ValueError:
+                template["occurs_on"] = set()
+
+    @classmethod
+    def _template_goal_id(cls, user_id: int, template: dict, *, create: bool = True) -> int | None:
+        """The weekly goal for a template's rows, resolved (and created if needed) once per template."""
+        if "goal_id" in template:
+            return template["goal_id"]
+        goal = None
+        if template["goal_amount"] is not None and template["goal_unit"]:
+            goal = cls._resolve_goal(
+                user_id,
+                template["activity_type_id"],
+                title=template["title_base"],
+                amount=template["goal_amount"],
+                unit=template["goal_unit"],
+                existing=template["existing_goal"],
+                create=create,
+            )
+        if not create:
+            return goal.id if goal else None
+        template["goal_id"] = goal.id if goal else None
+        return template["goal_id"]
+
+    @classmethod
+    def _planned_rows(
+        cls, user_id: int, templates: list[dict], target_date: date, seen: set, *, create_goals: bool = True
+    ) -> list[dict]:
+        """Rows the plan calls for on target_date whose (date, activity type, title) is not in seen yet.
+
+        Like the original per-day generation, a goal is only ensured for a template that emits a row.
+        """
+        day_key = cls._day_key(target_date)
+        rows: list[dict] = []
+        for template in templates:
+            if template["rrule"] and target_date not in template.get("occurs_on", ()):
+                continue
+            title = cls._title_for_day(template, day_key)
+            if title is None:
+                continue
+            key = (target_date, template["activity_type_id"], title)
+            if key in seen:
+                continue
+            seen.add(key)
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "interest_id": template["interest_id"],
+                    "activity_type_id": template["activity_type_id"],
+                    "goal_id": cls._template_goal_id(user_id, template, create=create_goals),
+                    "title": title,
+                    "scheduled_for": target_date,
+                    "todo_date": target_date,
+                }
+            )
+        return rows
+
+    @classmethod
+    def _title_for_day(cls, template: dict, day_key: str) -> str | None:
+        """Task title for day_key, or None when the plan skips that weekday."""
+        plan = template["plan"]
+        # A recurrence rule, when present, decides the days instead of the weekly schedule.
+        if plan and plan["days"] and day_key not in plan["days"] and not template["rrule"]:
+            return None
+        title_base = template["title_base"]
+        if not (plan and plan.get("per_day")):
+            return title_base
+        amount_text = cls._format_amount(plan["per_day"])
+        if not amount_text:
+            return title_base
+        parts = [title_base, "for", amount_text]
+        unit = (plan.get("unit") or "").strip()
+        if unit:
+            parts.append(unit)
+        day_label = cls._day_label(day_key)
+        if day_label:
+            parts.append(day_label)
+        return " ".join(parts)
+
+    @classmethod
+    def _materialize(cls, user_id: int, start_date: date, end_date: date) -> tuple[list[DailyActivity], int]:
+        """Diff the planned tasks for [start_date, end_date] against one range read and bulk-insert the gap.
+
+        Returns the rows that already existed and the number inserted.
+        """
+        templates = cls._load_plans([user_id])[user_id]
+        cls._expand_recurrences(templates, start_date, end_date)
+        existing = DailyActivityDAO.list_for_user_between(user_id, start_date, end_date)
+        seen = {(row.todo_date, row.activity_type_id, row.title) for row in existing}
+
+        missing: list[dict] = []
+        target_date = start_date
+        while target_date <= end_date:
+            missing.extend(cls._planned_rows(user_id, templates, target_date, seen))
+            target_date += timedelta(days=1)
+        return existing, DailyActivityDAO.bulk_insert(missing)
+
+    @classmethod
+    def materialize_for_users(cls, targets: dict[int, date], *, from_date: date | None = None) -> int:
+        """Generate each user's days up to a target date (user_id -> local date) for a whole batch at once.
+
+        Every day between the user's marker (or from_date, the UTC day, when that is later) and the
+        target is generated, so moving the marker never skips a day the read path still serves.
+        Plans and goals are read with one query each for the batch, the planned rows are
+        bulk-inserted with duplicates ignored and the users' markers advanced set-wise. Returns the number of rows inserted.
+        """
+        if not targets:
+            return 0
+        from_date = from_date or cls._today()
+        user_ids = sorted(targets)
+        plans = cls._load_plans(user_ids)
+        throughs = UserDAO.daily_materialized_through_many(user_ids)
+        missing: list[dict] = []
+        for user_id in user_ids:
+            through = throughs.get(user_id)
+            start = max(from_date, through + timedelta(days=1)) if through else from_date
+            end = targets[user_id]
+            if start > end:
+                continue
+            cls._expand_recurrences(plans[user_id], start, end)
+            seen: set = set()
+            day = start
+            while day <= end:
+                missing.extend(cls._planned_rows(user_id, plans[user_id], day, seen))
+                day += timedelta(days=1)
+        # Rows the user already has are skipped by the unique constraint rather than read first.
+        inserted = DailyActivityDAO.bulk_insert(missing)
+
+        by_date: dict[date, list[int]] = {}
+        for user_id, target_date in targets.items():
+            by_date.setdefault(target_date, []).append(user_id)
+        for target_date, ids in by_date.items():
+            UserDAO.mark_daily_materialized_many(ids, target_date)
+        return inserted
+
+    @classmethod
+    def ensure_range(cls, user_id: int, start_date: date, *, days: int = 7) -> int:
+        """Generate any missing tasks for days starting at start_date; returns how many were created."""
+        if days <= 0:
+            return 0
+        end_date = start_date + timedelta(days=days - 1)
+        _, inserted = cls._materialize(user_id, start_date, end_date)
+        user = UserDAO.get_by_id(user_id)
+        if user:
+            UserDAO.mark_daily_materialized(user, end_date)
+        return inserted
+
+    @classmethod
+    def ensure_for_date(cls, user_id: int, target_date: date, *, force: bool = False) -> list[DailyActivity]:
+        """Generate the day's tasks unless users.daily_materialized_through already covers it."""
+        user = UserDAO.get_by_id(user_id)
+        through = user.daily_materialized_through if user else None
+        if not force and through is not None and through >= target_date:
+            return DailyActivityDAO.list_for_user_on_date(user_id, target_date)
+
+        existing, inserted = cls._materialize(user_id, target_date, target_date)
+        if user:
+            UserDAO.mark_daily_materialized(user, target_date)
+        if not inserted:
+            return existing
         return DailyActivityDAO.list_for_user_on_date(user_id, target_date)
 
     @classmethod
     def ensure_week(cls, user_id: int, start_date: date | None = None, *, days: int = 7) -> None:
-        start = start_date or cls._today()
-        for offset in range(days):
-            target_date = start + timedelta(days=offset)
-            cls.ensure_for_date(user_id, target_date)
+        """Regenerate a window of days regardless of the marker; callers use it right after plan changes."""
+        cls.ensure_range(user_id, start_date or cls._today(), days=days)
+
+    @classmethod
+    def calendar(cls, user_id: int, start_date: date, end_date: date) -> list[dict]:
+        """Per-day view of [start_date, end_date]: stored tasks plus the ones the plans would still create.
+
+        Reads the window once and expands recurrence rules over it without materializing anything.
+        """
+        if end_date < start_date:
+            raise ValueError("end must not be before start")
+        if (end_date - start_date).days >= cls.MAX_CALENDAR_DAYS:
+            raise ValueError(f"calendar window cannot exceed {cls.MAX_CALENDAR_DAYS} days")
+        if not UserDAO.get_by_id(user_id):
+            raise LookupError("User not found")
+
+        templates = cls._load_plans([user_id])[user_id]
+        cls._expand_recurrences(templates, start_date, end_date)
+        existing = DailyActivityDAO.list_for_user_between(user_id, start_date, end_date)
+        seen = {(row.todo_date, row.activity_type_id, row.title) for row in existing}
+        by_date: dict[date, list[DailyActivity]] = {}
+        for row in existing:
+            by_date.setdefault(row.todo_date, []).append(row)
+
+        days: list[dict] = []
+        target_date = start_date
+        while target_date <= end_date:
+            # A preview: reuse a matching goal but never create one.
+            planned = cls._planned_rows(user_id, templates, target_date, seen, create_goals=False)
+            days.append(
+                {
+                    "date": target_date.isoformat(),
+                    "activities": [row.to_dict() for row in by_date.get(target_date, [])],
+                    "planned": [
+                        {
+                            "interest_id": row["interest_id"],
+                            "activity_type_id": row["activity_type_id"],
+                            "goal_id": row["goal_id"],
+                            "title": row["title"],
+                        }
+                        for row in planned
+                    ],
+                }
+            )
+            target_date += timedelta(days=1)
+        return days
 
     @classmethod
     def list_today(cls, user_id: int) -> list[DailyActivity]:
@@ -207,14 +424,16 @@ class DailyActivityService:
         *,
         logged_value: float | None = None,
         unit: str | None = None,
+        completed_at: datetime | None = None,
     ) -> dict:
         activity = DailyActivityDAO.get_by_id(activity_id)
         if not activity or activity.user_id != user_id:
             raise LookupError("Daily activity not found")
+        state = GameplayStateService.load(user_id)
         if activity.status == "completed":
             raise ValueError("Activity already completed")
 
-        interest = activity.interest
+        interest = state.area_by_id(activity.interest_id)
         activity_type = activity.activity_type
         if not interest:
             raise LookupError("Interest not found for activity")
@@ -239,12 +458,14 @@ class DailyActivityService:
             target_value=per_day_target,
             effort_unit=normalized_unit,
             increment_goal=False,
+            state=state,
+            completed_at=completed_at,
         )
-        DailyActivityDAO.mark_completed(activity, xp_awarded=result.get("xp_awarded"))
+        DailyActivityDAO.mark_completed(activity, xp_awarded=result.get("xp_awarded"), completed_at=completed_at)
         goal_progress = 0.0
         goal = activity.goal
         if goal is None and activity_type and (activity_type.weekly_goal_value or 0) > 0:
-            goal = GoalDAO.latest_active(user_id, activity_type.id, include_redeemed=False)
+            goal = state.latest_active_goal(activity_type.id, include_redeemed=False)
         if goal and not goal.redeemed_at:
             increment: float | None = None
             if logged_amount is not None and logged_amount > 0:
@@ -278,6 +499,7 @@ class DailyActivityService:
                 "streak_best": result.get("streak_best"),
                 "xp_multiplier": result.get("xp_multiplier"),
                 "evolved": result.get("evolved"),
+                "levels_gained": result.get("levels_gained", 0),
                 "effort_value": result.get("effort_value"),
                 "effort_target": result.get("effort_target"),
                 "effort_unit": result.get("effort_unit"),
@@ -288,3 +510,28 @@ class DailyActivityService:
             "daily_activity": activity.to_dict(),
             "goal_progress_increment": goal_progress,
         }
+
+
+def _invalidate_daily_materialization(mapper, connection, target) -> None:  # noqa: ARG001
+    """Areas and activity types drive generation, so any write to them re-opens the user's days.
+
+    The same UPDATE bumps state_version, since those writes also change the daily and hub reads.
+    """
+    user_id = target.user_id
+    if user_id is None:
+        return
+    users = User.__table__
+    connection.execute(
+        update(users)
+        .where(users.c.id == user_id)
+        .values(daily_materialized_through=None, state_version=func.coalesce(users.c.state_version, 0) + 1)
+    )
+    session = object_session(target)
+    user = session.identity_map.get(identity_key(User, user_id)) if session else None
+    if user is not None:
+        set_committed_value(user, "daily_materialized_through", None)
+
+
+for _model in (Area, ActivityType):
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _invalidate_daily_materialization)
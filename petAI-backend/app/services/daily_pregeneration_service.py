@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import and_, func, or_, select
+
+from ..models import JobRun, db
+from ..models.user import User
+from .daily_activity_service import DailyActivityService
+from .job_run_service import JobRunService
+
+
+class DailyPregenerationService:
+    """Pre-materialize tomorrow's daily tasks for users whose local midnight is coming up.
+
+    Users are bucketed by utc_offset_minutes; each job pins a target local date per offset when it
+    is created, so a resumed job finishes the same cohorts even after midnight has passed.
+    """
+
+    KIND = "daily_pregeneration"
+    DEFAULT_LEAD_MINUTES = 120
+    DEFAULT_ACTIVE_WITHIN_DAYS = 30
+    DEFAULT_CHUNK_SIZE = 500
+
+    @staticmethod
+    def _parse_run_at(value) -> datetime:
+        if not value:
+            return datetime.now(timezone.utc)
+        try:
+            parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError("run_at must be an ISO-8601 string")
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(timezone.utc)
+
+    @staticmethod
+    def _optional_int(params: dict, key: str, default: int | None) -> int | None:
+        value = params.get(key, default)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{key} must be an integer")
+
+    @classmethod
+    def targets_for(cls, run_at: datetime, offsets, *, lead_minutes: int, all_offsets: bool = False) -> dict[str, str]:
+        """Map each offset whose local midnight is within lead_minutes of run_at to its next local date."""
+        targets: dict[str, str] = {}
+        for offset in offsets:
+            local = run_at + timedelta(minutes=offset)
+            minutes_to_midnight = 24 * 60 - (local.hour * 60 + local.minute)
+            if all_offsets or minutes_to_midnight <= lead_minutes:
+                targets[str(offset)] = (local.date() + timedelta(days=1)).isoformat()
+        return targets
+
+    @classmethod
+    def validate(cls, params: dict) -> dict:
+        run_at = cls._parse_run_at(params.get("run_at"))
+        lead_minutes = cls._optional_int(params, "lead_minutes", cls.DEFAULT_LEAD_MINUTES)
+        if lead_minutes is None or not 0 < lead_minutes <= 24 * 60:
+            raise ValueError("lead_minutes must be between 1 and 1440")
+        active_within_days = cls._optional_int(params, "active_within_days", cls.DEFAULT_ACTIVE_WITHIN_DAYS)
+        if active_within_days is not None and active_within_days <= 0:
+            raise ValueError("active_within_days must be greater than zero")
+        chunk_size = cls._optional_int(params, "chunk_size", cls.DEFAULT_CHUNK_SIZE)
+        if chunk_size is None or chunk_size <= 0:
+            raise ValueError("chunk_size must be greater than zero")
+
+        normalized = {
+            "run_at": run_at.isoformat(),
+            "lead_minutes": lead_minutes,
+            "active_within_days": active_within_days,
+            "chunk_size": chunk_size,
+        }
+        offsets = db.session.execute(select(User.utc_offset_minutes).where(*cls._base_criteria(normalized)).distinct())
+        normalized["targets"] = cls.targets_for(
+            run_at,
+            sorted(offset for (offset,) in offsets),
+            lead_minutes=lead_minutes,
+            all_offsets=bool(params.get("all_offsets")),
+        )
+        return normalized
+
+    @staticmethod
+    def _base_criteria(params: dict) -> list:
+        criteria = [User.is_active.is_(True)]
+        if params.get("active_within_days"):
+            since = datetime.fromisoformat(params["run_at"]) - timedelta(days=params["active_within_days"])
+            criteria.append(User.last_activity_at >= since)
+        return criteria
+
+    @classmethod
+    def _criteria(cls, params: dict) -> list:
+        targets = params.get("targets") or {}
+        if not targets:
+            return [False]
+        # Skip users a request or an earlier run already materialized.
+        buckets = [
+            and_(
+                User.utc_offset_minutes == int(offset),
+                or_(
+                    User.daily_materialized_through.is_(None),
+                    User.daily_materialized_through < date.fromisoformat(target),
+                ),
+            )
+            for offset, target in targets.items()
+        ]
+        return [*cls._base_criteria(params), or_(*buckets)]
+
+    @classmethod
+    def count(cls, params: dict) -> int:
+        return int(db.session.execute(select(func.count(User.id)).where(*cls._criteria(params))).scalar() or 0)
+
+    @classmethod
+    def run_chunk(cls, params: dict, after_id: int, limit: int) -> tuple[int | None, int, int]:
+        rows = db.session.execute(
+            select(User.id, User.utc_offset_minutes)
+            .where(User.id > after_id, *cls._criteria(params))
+            .order_by(User.id.asc())
+            .limit(limit)
+        ).all()
+        if not rows:
+            return None, 0, 0
+        targets = {user_id: date.fromisoformat(params["targets"][str(offset)]) for user_id, offset in rows}
+        # Start from the run's UTC day: read paths still serve UTC dates, so a user ahead of UTC
+        # must get today generated too before the marker moves past it.
+        run_day = datetime.fromisoformat(params["run_at"]).date()
+        inserted = DailyActivityService.materialize_for_users(targets, from_date=run_day)
+        return rows[-1][0], len(rows), inserted
+
+    @classmethod
+    def create_job(cls, params: dict | None = None, *, created_by: str | None = None) -> JobRun:
+        return JobRunService.create(cls.KIND, params or {}, created_by=created_by)
+
+    @classmethod
+    def latest_unfinished(cls) -> JobRun | None:
+        return (
+            JobRun.query.filter(JobRun.kind == cls.KIND, JobRun.status != JobRun.STATUS_COMPLETED)
+            .order_by(JobRun.id.desc())
+            .first()
+        )
+
+
+JobRunService.register(DailyPregenerationService.KIND, DailyPregenerationService)
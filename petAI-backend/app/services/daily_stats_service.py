@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+from ..config import COMPLETION_MIN_COINS
+from ..dao.user_daily_statDAO import UserDailyStatDAO
+from ..models import db
+from ..models.user import User
+
+
+class DailyStatsService:
+    """Reads and maintenance for the user_daily_stats rollup; days are UTC calendar days."""
+
+    @staticmethod
+    def day_for(moment: datetime) -> date:
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc)
+        return moment.date()
+
+    @classmethod
+    def record_completion(cls, user_id: int, completed_at: datetime, *, xp: int, coins: int) -> None:
+        """Fold one completion into its day's row; runs in the caller's transaction."""
+        UserDailyStatDAO.record(user_id, cls.day_for(completed_at), xp=xp, coins=coins)
+
+    @staticmethod
+    def by_day(user_id: int, start_day: date, end_day: date) -> dict[date, dict]:
+        return {
+            row.day: {"xp": row.xp, "count": row.count, "coins": row.coins}
+            for row in UserDailyStatDAO.list_between(user_id, start_day, end_day)
+        }
+
+    @staticmethod
+    def totals(days: dict[date, dict], start_day: date, end_day: date) -> dict:
+        selected = [value for day, value in days.items() if start_day <= day <= end_day]
+        return {
+            "xp": sum(value["xp"] for value in selected),
+            "count": sum(value["count"] for value in selected),
+            "coins": sum(value["coins"] for value in selected),
+        }
+
+    @staticmethod
+    def count_between(user_id: int, start_day: date, end_day: date) -> int:
+        return UserDailyStatDAO.count_between(user_id, start_day, end_day)
+
+    @staticmethod
+    def rebuild(*, batch_size: int = 1000) -> dict:
+        """Recompute the rollup from activity_logs in user id ranges, committing per range."""
+        user_ids = [row[0] for row in db.session.query(User.id).order_by(User.id.asc()).all()]
+        rows = 0
+        for start in range(0, len(user_ids), batch_size):
+            chunk = user_ids[start : start + batch_size]
+            rows += UserDailyStatDAO.rebuild_users(chunk[0], chunk[-1], min_coins=COMPLETION_MIN_COINS)
+            db.session.commit()
+        return {"users": len(user_ids), "rows": rows}
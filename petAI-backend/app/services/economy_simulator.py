@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from ..config import COMPLETION_MIN_COINS, INTEREST_LEVEL_XP
+from ..dao.chestDAO import ChestDAO
+from .chest_service import ChestService
+from .hub_service import HubService
+from .level_curve import LevelCurveService
+from .loot_table import LootTableService
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise RuntimeError("The economy simulator needs NumPy; install it with `pip install numpy`.") from exc
+    return np
+
+
+@dataclass
+class ChestSpec:
+    item_id: int
+    tier: str
+    item_chance: float
+    xp_range: tuple[int, int]
+    coin_range: tuple[int, int]
+    pool: int | None  # index into SimulationInputs.pools
+
+
+@dataclass
+class SimulationInputs:
+    """Plain-data snapshot of everything the simulator reads, taken once from the live tables."""
+
+    chests: list[ChestSpec]
+    chest_weights: list[float]
+    item_ids: list[int]
+    item_max_quantity: list[int | None]
+    pools: list[tuple[list[int], list[float]]]  # (indices into item_ids, weights)
+    thresholds: list[int]
+    bonus_chest_chance: float = ChestService.BONUS_CHEST_CHANCE
+    chest_interval: int = ChestService.CHEST_INTERVAL
+    milestone_rewards: dict[str, tuple[int, int]] = field(default_factory=lambda: dict(HubService._MILESTONE_REWARDS))
+
+    @classmethod
+    def from_app(cls) -> "SimulationInputs":
+        tables = LootTableService.current()
+        index_by_id = {item.id: index for index, item in enumerate(tables.base_items)}
+        pools: list[tuple[list[int], list[float]]] = []
+        pool_index: dict[tuple[str, str | None], int | None] = {}
+        chests: list[ChestSpec] = []
+        weights: list[float] = []
+        for chest in ChestDAO.list_chests():
+            if not chest.item_id:
+                continue
+            tier = (chest.tier or "common").strip().lower()
+            config = ChestService._resolve_chest_config(chest, tier)
+            key = (tier, (config.get("max_item_rarity") or "").strip().lower() or None)
+            if key not in pool_index:
+                pool = tables.item_pool(*key)
+                if pool is None:
+                    pool_index[key] = None
+                else:
+                    pools.append(([index_by_id[item.id] for item in pool.items], list(pool.weights)))
+                    pool_index[key] = len(pools) - 1
+            chests.append(
+                ChestSpec(
+                    item_id=chest.item_id,
+                    tier=tier,
+                    item_chance=config["item_chance"],
+                    xp_range=config["xp_range"],
+                    coin_range=config["coin_range"],
+                    pool=pool_index[key],
+                )
+            )
+            weights.append(max(ChestService.CHEST_TIER_WEIGHTS.get(tier, 1.0), 0.05))
+        return cls(
+            chests=chests,
+            chest_weights=weights,
+            item_ids=[item.id for item in tables.base_items],
+            item_max_quantity=[item.max_quantity for item in tables.base_items],
+            pools=pools,
+            thresholds=list(LevelCurveService.current().thresholds),
+        )
+
+
+class EconomySimulator:
+    """Vectorized Monte Carlo over chest opens and user activity, mirroring ActivityService and ChestService.
+
+    Every roll is a NumPy array operation over all users or all opens at once; nothing touches
+    the ORM after SimulationInputs is built.
+    """
+
+    MAX_REJECTION_ROUNDS = 16
+
+    def __init__(self, inputs: SimulationInputs, *, seed: int | None = None):
+        if not inputs.chests:
+            raise ValueError("No chests configured")
+        self.np = _numpy()
+        self.inputs = inputs
+        self.rng = self.np.random.default_rng(seed)
+        np = self.np
+        self._item_chance = np.array([c.item_chance for c in inputs.chests], dtype=float)
+        self._xp_low = np.array([c.xp_range[0] for c in inputs.chests], dtype=np.int64)
+        self._xp_high = np.array([c.xp_range[1] for c in inputs.chests], dtype=np.int64)
+        self._coin_low = np.array([c.coin_range[0] for c in inputs.chests], dtype=np.int64)
+        self._coin_high = np.array([c.coin_range[1] for c in inputs.chests], dtype=np.int64)
+        self._chest_pool = np.array([-1 if c.pool is None else c.pool for c in inputs.chests], dtype=np.int64)
+        chest_weights = np.array(inputs.chest_weights, dtype=float)
+        self._chest_p = chest_weights / chest_weights.sum()
+        self._pools = [
+            (np.array(indices, dtype=np.int64), np.array(weights, dtype=float) / float(sum(weights)))
+            for indices, weights in inputs.pools
+        ]
+        caps = [cap if cap is not None else -1 for cap in inputs.item_max_quantity]
+        self._item_cap = np.array(caps, dtype=np.int64)
+        self._thresholds = np.array(inputs.thresholds, dtype=np.int64)
+
+    # --- chest opens ---
+    def _roll_chests(self, chest_idx, owner=None, owned=None) -> dict:
+        """Roll one reward per entry of chest_idx; owner/owned enable max_quantity checks per user."""
+        np, rng = self.np, self.rng
+        n = chest_idx.size
+        item = np.full(n, -1, dtype=np.int64)
+        wants_item = rng.random(n) < self._item_chance[chest_idx]
+        for pool_id, (indices, p) in enumerate(self._pools):
+            pending = np.flatnonzero(wants_item & (self._chest_pool[chest_idx] == pool_id))
+            for _ in range(self.MAX_REJECTION_ROUNDS):
+                if pending.size == 0:
+                    break
+                drawn = indices[rng.choice(indices.size, size=pending.size, p=p)]
+                if owned is None:
+                    item[pending] = drawn
+                    break
+                accepted = self._within_cap(owner[pending], drawn, owned)
+                item[pending[accepted]] = drawn[accepted]
+                np.add.at(owned, (owner[pending[accepted]], drawn[accepted]), 1)
+                pending = pending[~accepted]
+            # Whatever is still pending found only maxed-out items and falls back to currency, as in
+            # ChestService (the live filtered fallback draw is not modelled).
+
+        currency = item < 0
+        is_xp = currency & (rng.random(n) < 0.5)
+        is_coins = currency & ~is_xp
+        xp = np.where(is_xp, rng.integers(self._xp_low[chest_idx], self._xp_high[chest_idx] + 1), 0)
+        coins = np.where(is_coins, rng.integers(self._coin_low[chest_idx], self._coin_high[chest_idx] + 1), 0)
+        return {"item": item, "xp": xp, "coins": coins}
+
+    def _within_cap(self, users, items, owned):
+        """Accept draws that stay within max_quantity, counting duplicates inside the same batch."""
+        np = self.np
+        caps = self._item_cap[items]
+        if not (caps >= 0).any():
+            return np.ones(items.size, dtype=bool)
+        keys = users * self._item_cap.size + items
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        positions = np.arange(sorted_keys.size)
+        starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        rank_sorted = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+        rank = np.empty_like(rank_sorted)
+        rank[order] = rank_sorted
+        return (caps < 0) | (owned[users, items] + rank < caps)
+
+    def simulate_chest_opens(self, n_opens: int, *, tier: str | None = None) -> dict:
+        """Expected value of a chest open, ignoring max_quantity (a fresh inventory every time)."""
+        np = self.np
+        if tier:
+            candidates = np.array([i for i, c in enumerate(self.inputs.chests) if c.tier == tier], dtype=np.int64)
+            if candidates.size == 0:
+                raise ValueError(f"No {tier} chests configured")
+            chest_idx = candidates[self.rng.integers(0, candidates.size, size=n_opens)]
+        else:
+            chest_idx = self.rng.choice(self._chest_p.size, size=n_opens, p=self._chest_p)
+        rolled = self._roll_chests(chest_idx)
+
+        by_tier = {}
+        tiers = np.array([c.tier for c in self.inputs.chests])[chest_idx]
+        for name in sorted(set(tiers.tolist())):
+            mask = tiers == name
+            count = int(mask.sum())
+            by_tier[name] = {
+                "opens": count,
+                "mean_xp": float(rolled["xp"][mask].mean()),
+                "mean_coins": float(rolled["coins"][mask].mean()),
+                "item_rate": float((rolled["item"][mask] >= 0).mean()),
+            }
+        drops = np.bincount(rolled["item"][rolled["item"] >= 0], minlength=len(self.inputs.item_ids))
+        return {
+            "opens": n_opens,
+            "mean_xp": float(rolled["xp"].mean()),
+            "mean_coins": float(rolled["coins"].mean()),
+            "item_rate": float((rolled["item"] >= 0).mean()),
+            "by_tier": by_tier,
+            "item_drop_share": {
+                str(item_id): float(drops[i] / max(drops.sum(), 1))
+                for i, item_id in enumerate(self.inputs.item_ids)
+                if drops[i]
+            },
+        }
+
+    # --- user trajectories ---
+    def _streak_multiplier(self, streak):
+        np = self.np
+        capped = np.clip(streak, 0, 10)
+        return np.where(capped <= 1, 1.0, np.round(1.0 + (capped - 1) / 9.0, 2))
+
+    def simulate_users(
+        self,
+        n_users: int,
+        days: int,
+        *,
+        activities_per_day: float = 2.0,
+        skip_day_probability: float = 0.3,
+        interest_level: str = "sometimes",
+    ) -> dict:
+        """Play n_users through days of activity, opening every chest as soon as it is earned."""
+        np, rng = self.np, self.rng
+        base_xp = INTEREST_LEVEL_XP.get(interest_level)
+        if not base_xp:
+            raise ValueError(f"Unknown interest level: {interest_level}")
+
+        n_items = len(self.inputs.item_ids)
+        max_level = self._thresholds.size
+        streak = np.zeros(n_users, dtype=np.int64)
+        last_active = np.full(n_users, -2, dtype=np.int64)
+        activity_count = np.zeros(n_users, dtype=np.int64)
+        pet_xp = np.zeros(n_users, dtype=np.int64)
+        coins_total = np.zeros(n_users, dtype=np.int64)
+        owned = np.zeros((n_users, n_items), dtype=np.int64)
+        level_day = np.full((n_users, max_level + 1), -1, dtype=np.int64)
+        level_day[:, 1] = 0
+        streak_milestone = np.zeros(n_users, dtype=bool)
+        level_milestone = np.zeros(n_users, dtype=bool)
+        week_milestone = np.zeros(n_users, dtype=bool)
+        week_count = np.zeros(n_users, dtype=np.int64)
+        daily_xp = np.zeros(days)
+        daily_coins = np.zeros(days)
+        daily_chests = np.zeros(days)
+        streak_xp, streak_coins = self.inputs.milestone_rewards.get("streak-3", (0, 0))
+        week_xp, week_coins = self.inputs.milestone_rewards.get("week-5", (0, 0))
+        level_xp, level_coins = self.inputs.milestone_rewards.get("level-5", (0, 0))
+
+        for day in range(days):
+            if day % 7 == 0:
+                week_count[:] = 0
+            count = np.where(rng.random(n_users) >= skip_day_probability, rng.poisson(activities_per_day, n_users), 0)
+            active = count > 0
+            streak = np.where(active, np.where(last_active == day - 1, streak + 1, 1), streak)
+            last_active = np.where(active, day, last_active)
+            week_count += count
+
+            xp_each = np.maximum(1, np.round(base_xp * self._streak_multiplier(streak))).astype(np.int64)
+            day_xp = xp_each * count
+            day_coins = np.maximum(COMPLETION_MIN_COINS, xp_each) * count
+
+            interval = self.inputs.chest_interval
+            due = (activity_count + count) // interval - activity_count // interval
+            bonus = rng.binomial(count, self.inputs.bonus_chest_chance)
+            activity_count += count
+            chests = due + bonus
+            owners = np.repeat(np.arange(n_users), chests)
+            if owners.size:
+                chest_idx = rng.choice(self._chest_p.size, size=owners.size, p=self._chest_p)
+                rolled = self._roll_chests(chest_idx, owners, owned)
+                day_xp += np.bincount(owners, weights=rolled["xp"], minlength=n_users).astype(np.int64)
+                day_coins += np.bincount(owners, weights=rolled["coins"], minlength=n_users).astype(np.int64)
+
+            # One-off HubService milestones, assumed redeemed the day they are reached.
+            hit = ~streak_milestone & (streak >= 3)
+            streak_milestone |= hit
+            day_xp += hit * streak_xp
+            day_coins += hit * streak_coins
+            hit = ~week_milestone & (week_count >= 5)
+            week_milestone |= hit
+            day_xp += hit * week_xp
+            day_coins += hit * week_coins
+
+            pet_xp += day_xp
+            level = np.searchsorted(self._thresholds, pet_xp, side="right")
+            hit = ~level_milestone & (level >= 5)
+            level_milestone |= hit
+            pet_xp += hit * level_xp
+            day_xp += hit * level_xp
+            day_coins += hit * level_coins
+            level = np.searchsorted(self._thresholds, pet_xp, side="right")
+            for target in range(2, max_level + 1):
+                newly = (level_day[:, target] < 0) & (level >= target)
+                level_day[newly, target] = day + 1
+
+            coins_total += day_coins
+            daily_xp[day] = day_xp.mean()
+            daily_coins[day] = day_coins.mean()
+            daily_chests[day] = chests.mean()
+
+        return {
+            "users": n_users,
+            "days": days,
+            "xp_per_day": {"mean": float(daily_xp.mean()), "last_week": float(daily_xp[-7:].mean())},
+            "coins_per_day": {"mean": float(daily_coins.mean()), "last_week": float(daily_coins[-7:].mean())},
+            "chests_per_day": float(daily_chests.mean()),
+            "final_coins": self._percentiles(coins_total),
+            "final_level": self._percentiles(np.searchsorted(self._thresholds, pet_xp, side="right")),
+            "time_to_level": self._time_to_level(level_day),
+            "item_saturation": self._saturation(owned),
+        }
+
+    def _percentiles(self, values) -> dict:
+        np = self.np
+        p50, p90 = np.percentile(values, [50, 90])
+        return {"mean": float(values.mean()), "p50": float(p50), "p90": float(p90)}
+
+    def _time_to_level(self, level_day) -> list[dict]:
+        np = self.np
+        rows = []
+        for target in range(2, level_day.shape[1]):
+            reached = level_day[:, target]
+            reached = reached[reached >= 0]
+            entry = {"level": target, "reached_share": float(reached.size / level_day.shape[0])}
+            if reached.size:
+                p50, p90 = np.percentile(reached, [50, 90])
+                entry.update({"median_days": float(p50), "p90_days": float(p90)})
+            rows.append(entry)
+        return rows
+
+    def _saturation(self, owned) -> list[dict]:
+        rows = []
+        for index, item_id in enumerate(self.inputs.item_ids):
+            cap = int(self._item_cap[index])
+            column = owned[:, index]
+            rows.append(
+                {
+                    "item_id": item_id,
+                    "max_quantity": cap if cap >= 0 else None,
+                    "mean_owned": float(column.mean()),
+                    "maxed_share": float((column >= cap).mean()) if cap >= 0 else None,
+                }
+            )
+        return rows
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import current_app, has_app_context, has_request_context, request
+
+from ..models import UserEntitlement, db
+from ..models.user import User
+
+
+class EntitlementService:
+    """Resolve trial/subscription/access-code state once per request and cache it per user."""
+
+    _DEFAULT_TTL_SECONDS = 60
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _cache() -> dict[int, tuple[float, dict]]:
+        # Scoped to the app so separate app instances (tests, workers) never share entries.
+        return current_app.extensions.setdefault("entitlement_cache", {})
+
+    @classmethod
+    def _ttl_seconds(cls) -> int:
+        ttl = current_app.config.get("ENTITLEMENT_CACHE_TTL_SECONDS", cls._DEFAULT_TTL_SECONDS)
+        try:
+            return max(0, int(ttl))
+        except (TypeError, ValueError):
+            return cls._DEFAULT_TTL_SECONDS
+
+    @staticmethod
+    def _request_memo() -> dict[int, dict]:
+        memo = getattr(request, "_entitlements", None)
+        if memo is None:
+            memo = {}
+            setattr(request, "_entitlements", memo)
+        return memo
+
+    @classmethod
+    def _cache_deadline(cls, subscription: dict, now: float) -> float:
+        deadline = now + cls._ttl_seconds()
+        # Never serve an "active" payload past the moment it expires.
+        expires_at = subscription.get("expires_at") if subscription.get("active") else None
+        if expires_at:
+            try:
+                parsed = datetime.fromisoformat(expires_at)
+            except ValueError:
+                return now
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            deadline = min(deadline, parsed.timestamp())
+        return deadline
+
+    @classmethod
+    def subscription_for_user(cls, user_id: int) -> dict:
+        """Return the subscription payload for a user, served from the cache when fresh."""
+        memo = cls._request_memo() if has_request_context() else None
+        if memo is not None and user_id in memo:
+            return memo[user_id]["subscription"]
+
+        now = time.time()
+        cache = cls._cache()
+        with cls._lock:
+            cached = cache.get(user_id)
+        if cached and cached[0] > now:
+            return dict(cached[1])
+
+        from ..services.subscription_service import SubscriptionService  # local import to avoid cycle
+
+        subscription = SubscriptionService.subscription_payload(user_id)
+        if cls._ttl_seconds() > 0:
+            with cls._lock:
+                cache[user_id] = (cls._cache_deadline(subscription, now), dict(subscription))
+        return subscription
+
+    @classmethod
+    def resolve(cls, user: User) -> dict:
+        """Compute trial days left / subscription active / access-code active for a user."""
+        memo = cls._request_memo() if has_request_context() else None
+        if memo is not None and user.id in memo:
+            return memo[user.id]
+
+        from ..services.user_service import UserService  # local import to avoid cycle
+
+        subscription = cls.subscription_for_user(user.id)
+        trial_days_left = UserService._trial_days_left(user)
+        subscription_active = bool(subscription.get("active", False))
+        entitlement = {
+            "user_id": user.id,
+            "trial_days_left": trial_days_left,
+            "subscription": subscription,
+            "subscription_active": subscription_active,
+            "access_code_active": subscription_active and subscription.get("provider") == "access_code",
+            "has_access": trial_days_left > 0 or subscription_active,
+        }
+        if memo is not None:
+            memo[user.id] = entitlement
+        return entitlement
+
+    @classmethod
+    def refresh(cls, user_id: int) -> dict:
+        """Recompute the user_entitlements row in the caller's transaction and drop cached copies.
+
+        Call after any Subscription, AccessCode or AccessCodeRedemption change for the user.
+        """
+        from ..services.subscription_service import SubscriptionService  # local import to avoid cycle
+
+        payload = SubscriptionService.compute_payload(user_id)
+        row = db.session.get(UserEntitlement, user_id)
+        if row is None:
+            row = UserEntitlement(user_id=user_id)
+            db.session.add(row)
+        row.active = bool(payload.get("active"))
+        row.status = payload.get("status") or "none"
+        row.provider = payload.get("provider")
+        row.product_id = payload.get("product_id")
+        row.is_trial = bool(payload.get("is_trial"))
+        row.expires_at = cls._parse_timestamp(payload.get("expires_at"))
+        row.started_at = cls._parse_timestamp(payload.get("started_at"))
+        cls.invalidate(user_id)
+        return payload
+
+    @classmethod
+    def rebuild(cls, *, stale_only: bool = False, batch_size: int = 500) -> int:
+        """Recompute user_entitlements for every user (or only expired active rows), committing per batch."""
+        if stale_only:
+            now = datetime.now(timezone.utc)
+            query = db.session.query(UserEntitlement.user_id).filter(
+                UserEntitlement.active.is_(True),
+                UserEntitlement.expires_at.isnot(None),
+                UserEntitlement.expires_at <= now,
+            )
+        else:
+            query = db.session.query(User.id)
+        user_ids = [row[0] for row in query.all()]
+
+        for start in range(0, len(user_ids), batch_size):
+            for user_id in user_ids[start : start + batch_size]:
+                cls.refresh(user_id)
+            db.session.commit()
+        return len(user_ids)
+
+    @staticmethod
+    def _parse_timestamp(value: str | None) -> datetime | None:
+        return datetime.fromisoformat(value) if value else None
+
+    @classmethod
+    def invalidate(cls, user_id: int | None) -> None:
+        if user_id is None or not has_app_context():
+            return
+        with cls._lock:
+            cls._cache().pop(user_id, None)
+        if has_request_context():
+            cls._request_memo().pop(user_id, None)
+
+    @classmethod
+    def invalidate_all(cls) -> None:
+        if not has_app_context():
+            return
+        with cls._lock:
+            cls._cache().clear()
+        if has_request_context():
+            cls._request_memo().clear()
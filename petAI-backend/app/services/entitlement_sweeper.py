@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask
+from sqlalchemy import and_, exists, func, not_, or_, select, update
+from sqlalchemy.orm import aliased
+
+from ..models import AccessCode, AccessCodeRedemption, Subscription, db
+from ..models.user import User
+from .entitlement_service import EntitlementService
+
+
+logger = logging.getLogger(__name__)
+
+
+class EntitlementSweeper:
+    """Keep users.is_active in sync with trial age and paid access using set-based UPDATEs."""
+
+    TRIAL_LENGTH_DAYS = 3
+    DEFAULT_BATCH_SIZE = 5000
+
+    @staticmethod
+    def _subscription_active(now: datetime):
+        """The user's latest subscription, in SubscriptionService.latest_for_user order, is active."""
+        newer = aliased(Subscription)
+        same_expiry = or_(
+            newer.expires_at == Subscription.expires_at,
+            and_(newer.expires_at.is_(None), Subscription.expires_at.is_(None)),
+        )
+        sorts_first = or_(
+            and_(Subscription.expires_at.is_(None), newer.expires_at.is_not(None)),
+            newer.expires_at > Subscription.expires_at,
+            and_(same_expiry, newer.created_at > Subscription.created_at),
+            and_(same_expiry, newer.created_at == Subscription.created_at, newer.id > Subscription.id),
+        )
+        return exists().where(
+            and_(
+                Subscription.user_id == User.id,
+                Subscription.status.in_(("active", "trialing")),
+                or_(Subscription.expires_at.is_(None), Subscription.expires_at > now),
+                ~exists().where(and_(newer.user_id == Subscription.user_id, sorts_first)),
+            )
+        )
+
+    @staticmethod
+    def _access_code_active(now: datetime):
+        """The user's latest redemption of an active code, as AccessCodeService picks it, grants full access."""
+        newer = aliased(AccessCodeRedemption)
+        newer_code = aliased(AccessCode)
+        return exists().where(
+            and_(
+                AccessCodeRedemption.user_id == User.id,
+                AccessCode.id == AccessCodeRedemption.access_code_id,
+                AccessCode.active.is_(True),
+                AccessCode.percent_off >= 100,
+                or_(AccessCode.expires_at.is_(None), AccessCode.expires_at > now),
+                ~exists().where(
+                    and_(
+                        newer.user_id == AccessCodeRedemption.user_id,
+                        newer_code.id == newer.access_code_id,
+                        newer_code.active.is_(True),
+                        or_(
+                            newer.redeemed_at > AccessCodeRedemption.redeemed_at,
+                            and_(
+                                newer.redeemed_at == AccessCodeRedemption.redeemed_at,
+                                newer.id > AccessCodeRedemption.id,
+                            ),
+                        ),
+                    )
+                ),
+            )
+        )
+
+    @classmethod
+    def sweep(cls, *, now: datetime | None = None, batch_size: int | None = None) -> dict:
+        """Deactivate expired trials without paid access and reactivate users who regained it.
+
+        Runs one UPDATE per id range and commits after each so row locks stay short.
+        """
+        now = now or datetime.now(timezone.utc)
+        batch_size = max(1, batch_size or cls.DEFAULT_BATCH_SIZE)
+        # Mirrors UserService._trial_days_left: the trial is over once 3 whole days have elapsed.
+        trial_cutoff = now - timedelta(days=cls.TRIAL_LENGTH_DAYS)
+        paid_access = or_(cls._subscription_active(now), cls._access_code_active(now))
+
+        min_id, max_id = db.session.execute(select(func.min(User.id), func.max(User.id))).one()
+        deactivated = 0
+        reactivated = 0
+        if min_id is None:
+            return {"deactivated": 0, "reactivated": 0}
+
+        for low in range(min_id, max_id + 1, batch_size):
+            in_range = User.id.between(low, low + batch_size - 1)
+            deactivated += db.session.execute(
+                update(User)
+                .where(in_range, User.is_active.is_(True), User.created_at <= trial_cutoff, not_(paid_access))
+                .values(is_active=False)
+                .execution_options(synchronize_session=False)
+            ).rowcount or 0
+            reactivated += db.session.execute(
+                update(User)
+                .where(in_range, User.is_active.is_(False), paid_access)
+                .values(is_active=True)
+                .execution_options(synchronize_session=False)
+            ).rowcount or 0
+            db.session.commit()
+
+        return {"deactivated": deactivated, "reactivated": reactivated}
+
+    @classmethod
+    def start_background(cls, app: Flask, interval_seconds: int) -> threading.Thread:
+        """Run the sweep every interval_seconds on a daemon thread of this process."""
+        stop = threading.Event()
+
+        def _loop() -> None:
+            while not stop.wait(interval_seconds):
+                with app.app_context():
+                    try:
+                        EntitlementService.rebuild(stale_only=True)
+                        result = cls.sweep()
+                        if result["deactivated"] or result["reactivated"]:
+                            logger.info("Entitlement sweep: %s", result)
+                    except Exception:
+                        db.session.rollback()
+                        logger.exception("Entitlement sweep failed")
+                    finally:
+                        db.session.remove()
+
+        thread = threading.Thread(target=_loop, name="entitlement-sweeper", daemon=True)
+        thread.stop_event = stop  # type: ignore[attr-defined]
+        thread.start()
+        return thread
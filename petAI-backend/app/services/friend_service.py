@@ -4,41 +4,14 @@ from datetime import datetime, timezone
 
 from sqlalchemy import and_, or_
 
-from ..dao.itemsDAO import ItemsDAO
 from ..dao.userDAO import UserDAO
 from ..models import db
 from ..models.friend_request import FriendRequest
-from ..models.petStyle import PetStyle
-from ..services.pet_service import PetService
+from ..services.profile_card_service import ProfileCardService
+from ..services.state_version_service import StateVersionService
 
 
 class FriendService:
-    @staticmethod
-    def _style_triggers_for_pet(pet_id: int | None) -> list[dict]:
-        if not pet_id:
-            return []
-        pet_style = PetStyle.query.filter_by(pet_id=pet_id).first()
-        if not pet_style:
-            pet_style = PetStyle(pet_id=pet_id)
-            db.session.add(pet_style)
-            db.session.flush()
-
-        triggers: list[dict] = []
-        for item_id in (pet_style.hat_id, pet_style.sunglasses_id, pet_style.color_id, pet_style.background_id):
-            if not item_id:
-                continue
-            item = ItemsDAO.get_item_by_id(item_id)
-            trigger = (item.trigger if item else None) or ""
-            trigger = str(trigger).strip()
-            if trigger:
-                triggers.append(
-                    {
-                        "trigger": trigger,
-                        "trigger_value": item.trigger_value if item else None,
-                    }
-                )
-        return triggers
-
     @staticmethod
     def send_request(user_id: int, target_username: str) -> FriendRequest:
         target = UserDAO.get_by_username(target_username.strip())
@@ -56,6 +29,7 @@ class FriendService:
                 existing.status = "accepted"
                 existing.responded_at = datetime.now(timezone.utc)
                 db.session.add(existing)
+                StateVersionService.touch(user_id, target.id)
                 return existing
             raise ValueError("A request is already pending between you")
 
@@ -65,6 +39,7 @@ class FriendService:
             status="pending",
         )
         db.session.add(request)
+        StateVersionService.touch(user_id, target.id)
         return request
 
     @staticmethod
@@ -77,59 +52,44 @@ class FriendService:
         request.status = "accepted"
         request.responded_at = datetime.now(timezone.utc)
         db.session.add(request)
+        StateVersionService.touch(request.requester_id, request.receiver_id)
         return request
 
     @staticmethod
     def friends_payload(user_id: int) -> dict:
-        accepted = FriendRequest.query.filter(
-            and_(
-                FriendRequest.status == "accepted",
-                or_(FriendRequest.requester_id == user_id, FriendRequest.receiver_id == user_id),
-            )
-        ).all()
-
-        friends = []
-        for fr in accepted:
-            other = fr.requester if fr.receiver_id == user_id else fr.receiver
-            if other is None:
-                continue
-            pet = PetService.get_pet_by_user(other.id) or PetService.create_pet(other.id)
-            db.session.flush()
-            friends.append(
-                {
-                    "id": other.id,
-                    "username": FriendService._display_name(other.username, other.id),
-                    "pet_stage": pet.stage,
-                    "pet_level": pet.level,
-                    "pet_xp": pet.xp,
-                    "pet_next_evolution_xp": pet.next_evolution_xp,
-                    "pet_type": pet.pet_type,
-                    "pet_current_sprite": pet.current_sprite,
-                    "pet_cosmetics": PetService.cosmetic_payload(pet.user_id),
-                    "pet_style_triggers": FriendService._style_triggers_for_pet(pet.id),
-                }
+        requests = (
+            FriendRequest.query.filter(
+                and_(
+                    FriendRequest.status.in_(("accepted", "pending")),
+                    or_(FriendRequest.requester_id == user_id, FriendRequest.receiver_id == user_id),
+                )
             )
-
-        incoming = FriendRequest.query.filter_by(receiver_id=user_id, status="pending").all()
-        outgoing = FriendRequest.query.filter_by(requester_id=user_id, status="pending").all()
-
+            .order_by(FriendRequest.id.asc())
+            .all()
+        )
+        other_ids = [fr.requester_id if fr.receiver_id == user_id else fr.receiver_id for fr in requests]
+        cards = ProfileCardService.cards_for(other_ids)
+
+        def _name(other_id: int) -> str:
+            card = cards.get(other_id)
+            return card.display_name if card else ProfileCardService.display_name(None, other_id)
+
+        friends = [
+            ProfileCardService.payload(cards[other_id])
+            for fr, other_id in zip(requests, other_ids)
+            if fr.status == "accepted" and other_id in cards
+        ]
         return {
             "friends": friends,
             "incoming": [
-                {
-                    "request_id": req.id,
-                    "from_username": FriendService._display_name(req.requester.username if req.requester else None, req.requester_id),
-                    "status": req.status,
-                }
-                for req in incoming
+                {"request_id": req.id, "from_username": _name(req.requester_id), "status": req.status}
+                for req in requests
+                if req.status == "pending" and req.receiver_id == user_id
             ],
             "outgoing": [
-                {
-                    "request_id": req.id,
-                    "to_username": FriendService._display_name(req.receiver.username if req.receiver else None, req.receiver_id),
-                    "status": req.status,
-                }
-                for req in outgoing
+                {"request_id": req.id, "to_username": _name(req.receiver_id), "status": req.status}
+                for req in requests
+                if req.status == "pending" and req.requester_id == user_id
             ],
         }
 
@@ -138,26 +98,9 @@ class FriendService:
         query = query.strip()
         if not query:
             return []
-        users = UserDAO.search_by_username(query, limit=limit)
-        matches = []
-        for user in users:
-            if user.id == user_id:
-                continue
-            pet = PetService.get_pet_by_user(user.id) or PetService.create_pet(user.id)
-            db.session.flush()
-            matches.append(
-                {
-                    "id": user.id,
-                    "username": FriendService._display_name(user.username, user.id),
-                    "pet_stage": pet.stage,
-                    "pet_level": pet.level,
-                    "pet_cosmetics": PetService.cosmetic_payload(user.id),
-                    "pet_type": pet.pet_type,
-                    "pet_current_sprite": pet.current_sprite,
-                    "pet_style_triggers": FriendService._style_triggers_for_pet(pet.id),
-                }
-            )
-        return matches
+        user_ids = [user.id for user in UserDAO.search_by_username(query, limit=limit) if user.id != user_id]
+        cards = ProfileCardService.cards_for(user_ids)
+        return [ProfileCardService.payload(cards[match_id]) for match_id in user_ids if match_id in cards]
 
     @staticmethod
     def _request_between(user_a: int, user_b: int) -> FriendRequest | None:
@@ -172,12 +115,6 @@ class FriendService:
             .first()
         )
 
-    @staticmethod
-    def _display_name(username: str | None, fallback_id: int | None) -> str:
-        if username:
-            return username
-        return f"Guest#{fallback_id or 0}"
-
     @staticmethod
     def remove_friend(user_id: int, friend_id: int) -> None:
         if user_id == friend_id:
@@ -186,3 +123,4 @@ class FriendService:
         if not existing or existing.status != "accepted":
             raise LookupError("Friendship not found")
         db.session.delete(existing)
+        StateVersionService.touch(user_id, friend_id)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from flask import has_request_context, request
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models import db
+from ..models.activity_type import ActivityType
+from ..models.areas import Area
+from ..models.goal import Goal
+from ..models.pet import Pet
+from ..models.user import User
+
+
+class GameplayState:
+    """Everything activity completion reads for one user, loaded up front in a fixed number of queries.
+
+    Objects live in the current session, so writes made through them are flushed as usual.
+    """
+
+    def __init__(self, user: User, pet: Pet | None, areas: list[Area], goals: list[Goal]):
+        self.user = user
+        self.pet = pet
+        self.areas = areas
+        self._goals = goals
+
+    @property
+    def user_id(self) -> int:
+        return self.user.id
+
+    def area_by_name(self, name: str) -> Area | None:
+        lowered = (name or "").strip().lower()
+        return next((area for area in self.areas if (area.name or "").lower() == lowered), None)
+
+    def area_by_id(self, area_id: int) -> Area | None:
+        return next((area for area in self.areas if area.id == area_id), None)
+
+    def primary_activity_type(self, area: Area) -> ActivityType | None:
+        activity_types = [t for t in area.activity_types if t.id is not None]
+        return min(activity_types, key=lambda t: t.id) if activity_types else None
+
+    def latest_active_goal(self, activity_type_id: int, *, include_redeemed: bool = True) -> Goal | None:
+        # Goals are loaded newest first, matching GoalDAO.latest_active.
+        for goal in self._goals:
+            if goal.activity_type_id != activity_type_id:
+                continue
+            if not include_redeemed and goal.redeemed_at is not None:
+                continue
+            return goal
+        return None
+
+
+class GameplayStateService:
+    @staticmethod
+    def load(user_id: int) -> GameplayState:
+        """Return the request's gameplay state for user_id, loading it on first use."""
+        memo = GameplayStateService._request_memo()
+        if memo is not None and user_id in memo:
+            return memo[user_id]
+
+        row = (
+            db.session.query(User, Pet)
+            .outerjoin(Pet, Pet.user_id == User.id)
+            .filter(User.id == user_id)
+            .first()
+        )
+        if row is None:
+            raise LookupError("User not found")
+        user, pet = row
+        set_committed_value(user, "pet", pet)
+
+        areas = (
+            Area.query.options(selectinload(Area.activity_types))
+            .filter(Area.user_id == user_id)
+            .order_by(Area.id.asc())
+            .all()
+        )
+        set_committed_value(user, "areas", areas)
+
+        goals = (
+            Goal.query.filter(Goal.user_id == user_id, Goal.expires_at >= datetime.now(timezone.utc))
+            .order_by(Goal.created_at.desc())
+            .all()
+        )
+
+        state = GameplayState(user, pet, areas, goals)
+        if memo is not None:
+            memo[user_id] = state
+        return state
+
+    @staticmethod
+    def discard(user_id: int | None = None) -> None:
+        """Forget memoized state, e.g. after a rollback expired the loaded objects."""
+        memo = GameplayStateService._request_memo()
+        if memo is None:
+            return
+        if user_id is None:
+            memo.clear()
+        else:
+            memo.pop(user_id, None)
+
+    @staticmethod
+    def _request_memo() -> dict[int, GameplayState] | None:
+        if not has_request_context():
+            return None
+        memo = getattr(request, "_gameplay_state", None)
+        if memo is None:
+            memo = {}
+            setattr(request, "_gameplay_state", memo)
+        return memo
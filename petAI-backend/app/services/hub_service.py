@@ -3,14 +3,15 @@ from __future__ import annotations
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
-from ..dao.activityDAO import ActivityDAO
 from ..dao.activity_typeDAO import ActivityTypeDAO
 from ..dao.goalDAO import GoalDAO
 from ..dao.milestone_redemptionDAO import MilestoneRedemptionDAO
 from ..dao.userDAO import UserDAO
+from ..services.daily_stats_service import DailyStatsService
 from ..services.interest_service import InterestService
 from ..services.pet_service import PetService
 from ..services.friend_service import FriendService
+from ..services.state_version_service import StateVersionService
 from ..services.user_service import UserService
 
 
@@ -107,6 +108,12 @@ class HubService:
         "week-5": (30, 40),
         "level-5": (50, 60),
     }
+    # (milestone id, label, metric, target); metrics come from _milestone_metrics.
+    _MILESTONES: tuple[tuple[str, str, str, int], ...] = (
+        ("streak-3", "Keep a 3 day streak", "streak_current", 3),
+        ("week-5", "Log 5 wins this week", "weekly_count", 5),
+        ("level-5", "Reach level 5", "pet_level", 5),
+    )
 
     _user_owned_items: defaultdict[int, set[str]] = defaultdict(set)
 
@@ -125,6 +132,7 @@ class HubService:
         owned = cls._user_owned_items[user_id]
         if (user.coins or 0) <= 0 and not owned:
             UserService.add_coins(user, baseline)
+            StateVersionService.touch(user_id)
         loadout = PetService.cosmetic_loadout(user_id)
         items = []
         for entry in cls._SHOP_ITEMS:
@@ -163,6 +171,7 @@ class HubService:
 
         # Tiny XP boost to keep purchases meaningful.
         PetService.add_xp(pet, 5)
+        StateVersionService.touch(user_id)
 
         return cls.shop_state(user_id)
 
@@ -176,6 +185,7 @@ class HubService:
         if amount is None:
             raise LookupError("Coin pack not found")
         UserService.add_coins(user, amount)
+        StateVersionService.touch(user_id)
         return {"balance": user.coins or 0, "pack_id": pack_id, "coins_added": amount}
 
     @staticmethod
@@ -201,39 +211,19 @@ class HubService:
         pet_level: int,
     ) -> list[dict]:
         redeemed_ids = MilestoneRedemptionDAO.redeemed_ids(user_id)
-        definitions = [
-            {
-                "id": "streak-3",
-                "label": "Keep a 3 day streak",
-                "progress": min(streak_current / 3, 1.0),
-                "achieved": streak_current >= 3,
-            },
-            {
-                "id": "week-5",
-                "label": "Log 5 wins this week",
-                "progress": min(weekly_count / 5, 1.0),
-                "achieved": weekly_count >= 5,
-            },
-            {
-                "id": "level-5",
-                "label": "Reach level 5",
-                "progress": min(pet_level / 5, 1.0),
-                "achieved": pet_level >= 5,
-            },
-        ]
+        metrics = {"streak_current": streak_current, "weekly_count": weekly_count, "pet_level": pet_level}
 
         entries: list[dict] = []
-        for definition in definitions:
-            milestone_id = definition["id"]
+        for milestone_id, label, metric, target in cls._MILESTONES:
             if milestone_id in redeemed_ids:
                 continue
             reward_xp, reward_coins = cls._MILESTONE_REWARDS.get(milestone_id, (0, 0))
             entries.append(
                 {
                     "id": milestone_id,
-                    "label": definition["label"],
-                    "progress": definition["progress"],
-                    "achieved": definition["achieved"],
+                    "label": label,
+                    "progress": min(metrics[metric] / target, 1.0),
+                    "achieved": metrics[metric] >= target,
                     "reward": cls._reward_label(reward_xp, reward_coins),
                     "reward_xp": reward_xp,
                     "reward_coins": reward_coins,
@@ -242,41 +232,74 @@ class HubService:
             )
         return entries
 
+    @staticmethod
+    def _weekly_count(user_id: int) -> int:
+        today = datetime.now(timezone.utc).date()
+        return DailyStatsService.count_between(user_id, today - timedelta(days=6), today)
+
+    @classmethod
+    def _achieved_milestones(cls, user, pet, milestone_ids: set[str]) -> set[str]:
+        """Which of milestone_ids are achieved; the weekly count is only read when one of them needs it."""
+        wanted = [milestone for milestone in cls._MILESTONES if milestone[0] in milestone_ids]
+        metrics = {"streak_current": user.streak_current or 0, "pet_level": pet.level}
+        if any(metric == "weekly_count" for _, _, metric, _ in wanted):
+            metrics["weekly_count"] = cls._weekly_count(user.id)
+        return {milestone_id for milestone_id, _, metric, target in wanted if metrics[metric] >= target}
+
+    @classmethod
+    def pending_rewards(cls, user_id: int, *, user=None, pet=None) -> int:
+        """The snapshot's pending_rewards from a goal COUNT and the open milestones, without building it."""
+        user = user or UserDAO.get_by_id(user_id)
+        if not user:
+            raise LookupError("User not found")
+        pet = pet or cls._ensure_pet(user_id)
+        redeemed_ids = MilestoneRedemptionDAO.redeemed_ids(user_id)
+        open_ids = {milestone_id for milestone_id, *_ in cls._MILESTONES if milestone_id not in redeemed_ids}
+        return GoalDAO.count_redeemable(user_id) + len(cls._achieved_milestones(user, pet, open_ids))
+
+    @staticmethod
+    def _as_utc(value: datetime) -> datetime:
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+    @classmethod
+    def _completed_goal_entry(cls, goal) -> dict:
+        activity_type = goal.activity_type
+        area = getattr(activity_type, "area", None) if activity_type else None
+        interest_name = area.name if area else ""
+        activity_name = activity_type.name if activity_type else None
+        title = (goal.title or "").strip() or None
+        return {
+            "goal_id": goal.id,
+            "interest": interest_name or (activity_name or ""),
+            "activity": activity_name,
+            "title": title,
+            "amount": float(goal.amount) if goal.amount is not None else None,
+            "unit": goal.unit,
+            "progress_value": float(goal.progress_value)
+            if goal.progress_value is not None
+            else None,
+            "completed_at": goal.completed_at.isoformat()
+            if goal.completed_at
+            else None,
+            "redeemed_at": goal.redeemed_at.isoformat()
+            if goal.redeemed_at
+            else None,
+        }
+
     @classmethod
     def _completed_goal_entries(
         cls,
         user_id: int,
-        start: datetime,
+        windows: dict[str, datetime],
         end: datetime,
-    ) -> list[dict]:
-        goals = GoalDAO.list_redeemed_between(user_id, start, end)
-        entries: list[dict] = []
-        for goal in goals:
-            activity_type = goal.activity_type
-            area = getattr(activity_type, "area", None) if activity_type else None
-            interest_name = area.name if area else ""
-            activity_name = activity_type.name if activity_type else None
-            title = (goal.title or "").strip() or None
-            entries.append(
-                {
-                    "goal_id": goal.id,
-                    "interest": interest_name or (activity_name or ""),
-                    "activity": activity_name,
-                    "title": title,
-                    "amount": float(goal.amount) if goal.amount is not None else None,
-                    "unit": goal.unit,
-                    "progress_value": float(goal.progress_value)
-                    if goal.progress_value is not None
-                    else None,
-                    "completed_at": goal.completed_at.isoformat()
-                    if goal.completed_at
-                    else None,
-                    "redeemed_at": goal.redeemed_at.isoformat()
-                    if goal.redeemed_at
-                    else None,
-                }
-            )
-        return entries
+    ) -> dict[str, list[dict]]:
+        """Redeemed goals per named window ending at end, from one query over the widest window."""
+        goals = GoalDAO.list_redeemed_between(user_id, min(windows.values()), end)
+        entries = [(cls._as_utc(goal.redeemed_at), cls._completed_goal_entry(goal)) for goal in goals]
+        return {
+            name: [entry for redeemed_at, entry in entries if redeemed_at >= start]
+            for name, start in windows.items()
+        }
 
     @classmethod
     def redeem_progression_reward(
@@ -312,12 +335,12 @@ class HubService:
             pet = cls._ensure_pet(user_id)
             PetService.add_xp(pet, reward_xp)
             UserService.add_coins(user, reward_coins)
+            StateVersionService.touch(user_id)
 
-            pending = cls.progression_snapshot(user_id).get("pending_rewards", 0)
             return {
                 "reward_xp": reward_xp,
                 "reward_coins": reward_coins,
-                "pending_rewards": pending,
+                "pending_rewards": cls.pending_rewards(user_id, user=user, pet=pet),
                 "pet": PetService.pet_payload(pet),
                 "goal_id": goal.id,
             }
@@ -334,36 +357,18 @@ class HubService:
                 raise ValueError("Milestone already redeemed")
 
             pet = cls._ensure_pet(user_id)
-            now = datetime.now(timezone.utc)
-            weekly_count = len(
-                ActivityDAO.list_for_user_between(
-                    user_id,
-                    now.replace(hour=0, minute=0, second=0, microsecond=0)
-                    - timedelta(days=6),
-                    now,
-                )
-            )
-            streak_current = user.streak_current or 0
-            pet_level = pet.level
-            milestones = cls._milestone_entries(
-                user_id=user_id,
-                streak_current=streak_current,
-                weekly_count=weekly_count,
-                pet_level=pet_level,
-            )
-            milestone = next((entry for entry in milestones if entry["id"] == milestone_id), None)
-            if not milestone or not milestone.get("achieved"):
+            if milestone_id not in cls._achieved_milestones(user, pet, {milestone_id}):
                 raise ValueError("Milestone not achieved yet")
 
             MilestoneRedemptionDAO.create(user_id, milestone_id)
             PetService.add_xp(pet, reward_xp)
             UserService.add_coins(user, reward_coins)
+            StateVersionService.touch(user_id)
 
-            pending = cls.progression_snapshot(user_id).get("pending_rewards", 0)
             return {
                 "reward_xp": reward_xp,
                 "reward_coins": reward_coins,
-                "pending_rewards": pending,
+                "pending_rewards": cls.pending_rewards(user_id, user=user, pet=pet),
                 "pet": PetService.pet_payload(pet),
                 "milestone_id": milestone_id,
             }
@@ -388,29 +393,22 @@ class HubService:
         start_week = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=6)
         start_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         start_year = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        weekly = ActivityDAO.list_for_user_between(user_id, start_week, now)
-        today_logs = ActivityDAO.list_for_user_today(user_id)
+        # At most ~372 rollup rows cover the week, month and year regardless of log history.
+        stats = DailyStatsService.by_day(user_id, min(start_week, start_year).date(), now.date())
+        weekly_count = sum(value["count"] for day, value in stats.items() if day >= start_week.date())
 
         daily_buckets: dict[str, dict[str, int]] = {}
         for offset in range(6, -1, -1):
-            day = (now - timedelta(days=offset)).date().isoformat()
-            daily_buckets[day] = {"xp": 0, "count": 0}
-
-        for log in weekly:
-            day = log.timestamp.date().isoformat() if log.timestamp else now.date().isoformat()
-            bucket = daily_buckets.get(day)
-            if bucket is None:
-                daily_buckets[day] = {"xp": 0, "count": 0}
-                bucket = daily_buckets[day]
-            bucket["xp"] += log.xp_earned
-            bucket["count"] += 1
+            day = (now - timedelta(days=offset)).date()
+            value = stats.get(day)
+            daily_buckets[day.isoformat()] = {"xp": value["xp"], "count": value["count"]} if value else {"xp": 0, "count": 0}
 
         streak_current = user.streak_current or 0
         streak_best = user.streak_best or 0
         milestones = cls._milestone_entries(
             user_id=user_id,
             streak_current=streak_current,
-            weekly_count=len(weekly),
+            weekly_count=weekly_count,
             pet_level=pet.level,
         )
 
@@ -422,12 +420,13 @@ class HubService:
             "streak_current": streak_current,
             "streak_best": streak_best,
             "interests": len(interests),
-            "activities": len(weekly),
+            "activities": weekly_count,
         }
 
+        today_stats = stats.get(now.date()) or {"xp": 0, "count": 0}
         today = {
-            "completed": len(today_logs),
-            "xp": sum(log.xp_earned for log in today_logs),
+            "completed": today_stats["count"],
+            "xp": today_stats["xp"],
         }
 
         weekly_payload = [
@@ -435,10 +434,15 @@ class HubService:
             for key, value in sorted(daily_buckets.items())
         ]
 
+        types_by_interest: dict[int, list] = defaultdict(list)
+        for activity_type in ActivityTypeDAO.list_for_users([user_id]):
+            types_by_interest[activity_type.interest_id].append(activity_type)
+        latest_goals = GoalDAO.latest_by_activity_type(user_id)
+
         weekly_goals: list[dict] = []
         for interest in interests:
             # Gather all activity types for this interest so we return every goal, not just the first.
-            activity_types = list(getattr(interest, "activity_types", []) or [])
+            activity_types = types_by_interest.get(interest.id) or []
             if not activity_types:
                 primary = ActivityTypeDAO.primary_for_area(user_id, interest.id) or ActivityTypeDAO.get_or_create(
                     user_id, interest.id, interest.name
@@ -447,13 +451,8 @@ class HubService:
 
             for activity_type in activity_types:
                 plan = activity_type._plan_dict() if activity_type else None
-                goal = (
-                    GoalDAO.latest_active(user_id, activity_type.id, include_redeemed=False)
-                    if activity_type
-                    else None
-                )
+                goal, latest_goal = latest_goals.get(activity_type.id, (None, None)) if activity_type else (None, None)
                 if goal is None and activity_type:
-                    latest_goal = GoalDAO.latest_for_activity(user_id, activity_type.id)
                     if latest_goal and latest_goal.redeemed_at:
                         continue
 
@@ -515,10 +514,15 @@ class HubService:
             "weekly_xp": weekly_payload,
             "milestones": milestones,
             "weekly_goals": weekly_goals,
-            "completed_goals": {
-                "week": cls._completed_goal_entries(user_id, start_week, now),
-                "month": cls._completed_goal_entries(user_id, start_month, now),
-                "year": cls._completed_goal_entries(user_id, start_year, now),
-            },
+            "completed_goals": cls._completed_goal_entries(
+                user_id,
+                {"week": start_week, "month": start_month, "year": start_year},
+                now,
+            ),
             "pending_rewards": pending_rewards,
+            "totals": {
+                "week": DailyStatsService.totals(stats, start_week.date(), now.date()),
+                "month": DailyStatsService.totals(stats, start_month.date(), now.date()),
+                "year": DailyStatsService.totals(stats, start_year.date(), now.date()),
+            },
         }
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from ..models import IdempotencyRecord, db
+
+
+class IdempotencyService:
+    MAX_KEY_LENGTH = 128
+
+    @staticmethod
+    def request_hash(method: str, path: str, body: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(method.upper().encode())
+        digest.update(b"\0")
+        digest.update(path.encode())
+        digest.update(b"\0")
+        digest.update(body or b"")
+        return digest.hexdigest()
+
+    @staticmethod
+    def _aware(value: datetime | None) -> datetime | None:
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+    @staticmethod
+    def get(user_id: int, key: str) -> IdempotencyRecord | None:
+        return IdempotencyRecord.query.filter_by(user_id=user_id, key=key).first()
+
+    @classmethod
+    def claim(cls, user_id: int, key: str, request_hash: str) -> tuple[str, IdempotencyRecord | None]:
+        """Reserve key for this request.
+
+        Returns ("claimed", record), ("replay", record), ("in_progress", None) or ("mismatch", None).
+        The claim is committed immediately so concurrent retries see it. complete() stores the
+        response in the same commit as the request's writes, so a claim still without a response
+        after IDEMPOTENCY_LOCK_SECONDS belongs to a request that never committed and may run again.
+        """
+        now = datetime.now(timezone.utc)
+        lock_cutoff = now - timedelta(seconds=int(current_app.config.get("IDEMPOTENCY_LOCK_SECONDS", 60)))
+        record = cls.get(user_id, key)
+        if record is not None:
+            expired = cls._aware(record.expires_at) <= now
+            abandoned = record.status_code is None and cls._aware(record.created_at) <= lock_cutoff
+            if not expired and not abandoned:
+                if record.request_hash != request_hash:
+                    return "mismatch", None
+                if record.status_code is None:
+                    return "in_progress", None
+                return "replay", record
+            # Take over only if the row is still expired or abandoned: the original request may
+            # have completed, or another retry taken it over, since it was read.
+            taken = db.session.execute(
+                delete(IdempotencyRecord)
+                .where(
+                    IdempotencyRecord.id == record.id,
+                    or_(
+                        IdempotencyRecord.expires_at <= now,
+                        and_(IdempotencyRecord.status_code.is_(None), IdempotencyRecord.created_at <= lock_cutoff),
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.expunge(record)
+            if not taken:
+                db.session.rollback()
+                return "in_progress", None
+
+        ttl = int(current_app.config.get("IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60))
+        record = IdempotencyRecord(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            created_at=now,
+            expires_at=now + timedelta(seconds=ttl),
+        )
+        db.session.add(record)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another retry claimed the same key between our lookup and insert.
+            db.session.rollback()
+            return "in_progress", None
+        return "claimed", record
+
+    @staticmethod
+    def complete(record_id: int, status_code: int, body: str) -> bool:
+        """Store the response and commit it together with whatever the request wrote.
+
+        Only a claim still waiting for its response is completed. If the request outlived
+        IDEMPOTENCY_LOCK_SECONDS and a retry took the key over, its writes are rolled back and
+        False is returned.
+        """
+        stored = db.session.execute(
+            update(IdempotencyRecord)
+            .where(IdempotencyRecord.id == record_id, IdempotencyRecord.status_code.is_(None))
+            .values(status_code=status_code, response_body=body)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not stored:
+            db.session.rollback()
+            return False
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def release(record_id: int) -> None:
+        """Drop a claim so the client can retry, used when the request failed server-side."""
+        db.session.rollback()
+        db.session.execute(delete(IdempotencyRecord).where(IdempotencyRecord.id == record_id))
+        db.session.commit()
+
+    @staticmethod
+    def prune_expired(batch_size: int = 1000) -> int:
+        now = datetime.now(timezone.utc)
+        deleted = 0
+        while True:
+            ids = db.session.execute(
+                select(IdempotencyRecord.id).where(IdempotencyRecord.expires_at <= now).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                return deleted
+            db.session.execute(delete(IdempotencyRecord).where(IdempotencyRecord.id.in_(ids)))
+            db.session.commit()
+            deleted += len(ids)
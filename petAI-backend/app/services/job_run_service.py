@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Protocol
+
+from ..models import JobRun, db
+
+
+class JobHandler(Protocol):
+    """Work for one JobRun kind, processed in ascending user id chunks."""
+
+    def validate(self, params: dict) -> dict: ...
+
+    def count(self, params: dict) -> int: ...
+
+    # Optional: handlers defining freeze(job_id, params) -> int snapshot their segment when the
+    # job is created; the job id is then passed to run_chunk as params["job_id"].
+
+    def run_chunk(self, params: dict, after_id: int, limit: int) -> tuple[int | None, int, int]:
+        """Process up to limit users with id > after_id.
+
+        Returns (last_user_id, users_processed, rows_affected); last_user_id is None once
+        nothing is left.
+        """
+        ...
+
+
+class JobRunService:
+    DEFAULT_CHUNK_SIZE = 1000
+    _handlers: dict[str, JobHandler] = {}
+
+    @classmethod
+    def register(cls, kind: str, handler: JobHandler) -> None:
+        cls._handlers[kind] = handler
+
+    @classmethod
+    def handler_for(cls, kind: str) -> JobHandler:
+        handler = cls._handlers.get(kind)
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {kind}")
+        return handler
+
+    @staticmethod
+    def get(job_id: int) -> JobRun | None:
+        return db.session.get(JobRun, job_id)
+
+    @staticmethod
+    def list_recent(kind: str | None = None, limit: int = 50) -> list[JobRun]:
+        query = JobRun.query
+        if kind:
+            query = query.filter(JobRun.kind == kind)
+        return query.order_by(JobRun.id.desc()).limit(limit).all()
+
+    @classmethod
+    def create(cls, kind: str, params: dict, *, created_by: str | None = None) -> JobRun:
+        """Validate params, snapshot the segment (or its size) and persist a pending job. Commits."""
+        handler = cls.handler_for(kind)
+        params = handler.validate(params or {})
+        freeze = getattr(handler, "freeze", None)
+        job = JobRun(
+            kind=kind,
+            status=JobRun.STATUS_PENDING,
+            params=params,
+            cursor=0,
+            total=None if freeze else handler.count(params),
+            processed=0,
+            affected=0,
+            created_by=created_by,
+        )
+        db.session.add(job)
+        if freeze:
+            db.session.flush()
+            job.params = {**params, "job_id": job.id}
+            job.total = freeze(job.id, params)
+        db.session.commit()
+        return job
+
+    @classmethod
+    def run(cls, job_id: int, *, chunk_size: int | None = None, max_chunks: int | None = None) -> JobRun:
+        """Advance a job chunk by chunk, committing each chunk together with its checkpoint.
+
+        A crash or max_chunks stop leaves the cursor at the last committed chunk, so calling
+        run again resumes without applying any user twice.
+        """
+        job = cls.get(job_id)
+        if not job:
+            raise LookupError("Job not found")
+        if job.is_finished:
+            return job
+        handler = cls.handler_for(job.kind)
+        chunk_size = max(1, int(chunk_size or job.params.get("chunk_size") or cls.DEFAULT_CHUNK_SIZE))
+
+        job.status = JobRun.STATUS_RUNNING
+        job.error = None
+        db.session.commit()
+
+        chunks = 0
+        while max_chunks is None or chunks < max_chunks:
+            try:
+                last_id, processed, affected = handler.run_chunk(job.params, job.cursor, chunk_size)
+                if last_id is None:
+                    job.status = JobRun.STATUS_COMPLETED
+                    job.finished_at = datetime.now(timezone.utc)
+                else:
+                    job.cursor = last_id
+                    job.processed = (job.processed or 0) + processed
+                    job.affected = (job.affected or 0) + affected
+                db.session.commit()
+            except Exception as exc:
+                db.session.rollback()
+                job = cls.get(job_id)
+                job.status = JobRun.STATUS_FAILED
+                job.error = str(exc)[:2000]
+                db.session.commit()
+                raise
+            if job.is_finished:
+                break
+            chunks += 1
+        return job
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+
+from flask import current_app
+
+from ..config import PET_EVOLUTIONS
+
+
+class LevelCurve:
+    """Precompiled pet progression: sorted XP thresholds with O(log n) level lookup."""
+
+    def __init__(self, levels: dict[int, dict], *, source: str = "config", version: float = 0.0):
+        if not levels:
+            raise ValueError("level curve must define at least one level")
+        ordered = sorted((int(level), data) for level, data in levels.items())
+        if ordered[0][0] != 1:
+            raise ValueError("level curve must start at level 1")
+        thresholds: list[int] = []
+        for index, (level, data) in enumerate(ordered):
+            if level != index + 1:
+                raise ValueError(f"level curve has a gap before level {level}")
+            xp_required = int(data["xp_required"])
+            if thresholds and xp_required < thresholds[-1]:
+                raise ValueError(f"xp_required for level {level} is lower than the previous level")
+            thresholds.append(xp_required)
+        self.thresholds = thresholds
+        self.stages = [str(data["stage"]) for _, data in ordered]
+        self.source = source
+        self.version = version
+
+    @classmethod
+    def from_json(cls, raw: dict | list, *, source: str, version: float) -> "LevelCurve":
+        """Accept either {"levels": [{level, stage, xp_required}, ...]} or {"<level>": {stage, xp_required}}."""
+        entries = raw.get("levels") if isinstance(raw, dict) and "levels" in raw else raw
+        if isinstance(entries, list):
+            levels = {int(entry["level"]): entry for entry in entries}
+        elif isinstance(entries, dict):
+            levels = {int(level): data for level, data in entries.items()}
+        else:
+            raise ValueError("level curve JSON must be a list or mapping")
+        return cls(levels, source=source, version=version)
+
+    @property
+    def max_level(self) -> int:
+        return len(self.thresholds)
+
+    def level_for_xp(self, xp: int) -> int:
+        return max(1, bisect_right(self.thresholds, max(0, xp or 0)))
+
+    def stage_for_level(self, level: int) -> str:
+        return self.stages[min(max(level, 1), self.max_level) - 1]
+
+    def next_threshold(self, level: int) -> int:
+        """XP needed for the level after this one; the cap's own threshold once maxed out."""
+        level = min(max(level, 1), self.max_level)
+        return self.thresholds[level] if level < self.max_level else self.thresholds[level - 1]
+
+    def evolution_for_xp(self, xp: int) -> tuple[int, str, int]:
+        level = self.level_for_xp(xp)
+        return level, self.stage_for_level(level), self.next_threshold(level)
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "version": self.version,
+            "max_level": self.max_level,
+            "levels": [
+                {"level": index + 1, "stage": stage, "xp_required": xp}
+                for index, (stage, xp) in enumerate(zip(self.stages, self.thresholds))
+            ],
+        }
+
+
+class LevelCurveService:
+    """Serve the active LevelCurve per app, reloading it when PET_LEVEL_CURVE_PATH changes on disk."""
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _state() -> dict:
+        return current_app.extensions.setdefault("level_curve", {"curve": None, "checked_at": 0.0})
+
+    @staticmethod
+    def _load() -> LevelCurve:
+        path = current_app.config.get("PET_LEVEL_CURVE_PATH")
+        if not path:
+            return LevelCurve(PET_EVOLUTIONS, source="config")
+        mtime = os.path.getmtime(path)
+        with open(path, encoding="utf-8") as handle:
+            return LevelCurve.from_json(json.load(handle), source=path, version=mtime)
+
+    @classmethod
+    def current(cls) -> LevelCurve:
+        state = cls._state()
+        curve = state["curve"]
+        now = time.monotonic()
+        interval = float(current_app.config.get("PET_LEVEL_CURVE_CHECK_SECONDS", 5))
+        if curve is not None and now - state["checked_at"] < interval:
+            return curve
+        with cls._lock:
+            state["checked_at"] = now
+            path = current_app.config.get("PET_LEVEL_CURVE_PATH")
+            stale = curve is None or (curve.source != "config" if not path else curve.source != path)
+            if not stale and path:
+                try:
+                    stale = os.path.getmtime(path) != curve.version
+                except OSError:
+                    stale = False
+            if stale:
+                try:
+                    state["curve"] = cls._load()
+                except (OSError, ValueError, KeyError, TypeError):
+                    if curve is None:
+                        raise
+                    current_app.logger.exception("Keeping previous level curve; reload failed")
+            return state["curve"]
+
+    @classmethod
+    def reload(cls) -> LevelCurve:
+        """Force a reload, raising ValueError if the configured curve is invalid."""
+        try:
+            curve = cls._load()
+        except (OSError, KeyError, TypeError) as exc:
+            raise ValueError(f"Could not load level curve: {exc}") from exc
+        with cls._lock:
+            state = cls._state()
+            state["curve"] = curve
+            state["checked_at"] = time.monotonic()
+        return curve
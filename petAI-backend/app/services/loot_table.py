@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+from flask import current_app
+from sqlalchemy import event, insert, select, update
+
+from ..dao.chestDAO import ChestDAO
+from ..dao.itemsDAO import ItemsDAO
+from ..models import db
+from ..models.cache_version import CacheVersion
+from ..models.chest import Chest
+from ..models.item import Item
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) build, O(1) weighted sampling."""
+
+    __slots__ = ("_prob", "_alias")
+
+    def __init__(self, weights: list[float]):
+        n = len(weights)
+        if n == 0:
+            raise ValueError("alias table needs at least one weight")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("alias table weights must sum to a positive value")
+        scaled = [w * n / total for w in weights]
+        prob = [0.0] * n
+        alias = list(range(n))
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            prob[i] = 1.0
+        self._prob = prob
+        self._alias = alias
+
+    def __len__(self) -> int:
+        return len(self._prob)
+
+    def sample(self, rng=random) -> int:
+        column = int(rng.random() * len(self._prob))
+        return column if rng.random() < self._prob[column] else self._alias[column]
+
+
+@dataclass(frozen=True)
+class LootItem:
+    """Detached snapshot of the Item columns a chest reward needs."""
+
+    id: int
+    name: str
+    type: str | None
+    rarity: str | None
+    asset_path: str | None
+    trigger: str | None
+    trigger_value: int | None
+    max_quantity: int | None
+
+    def to_reward(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": self.type,
+            "rarity": self.rarity,
+            "asset_path": self.asset_path,
+            "trigger": self.trigger,
+            "trigger_value": self.trigger_value,
+        }
+
+
+@dataclass
+class LootPool:
+    items: list[LootItem]
+    weights: list[float]
+    table: AliasTable
+    capped_item_ids: frozenset[int]
+
+    def sample(self, owned_qty: dict[int, int], rng=random, max_attempts: int = 16) -> LootItem | None:
+        """Draw an item the user may still receive; rejection keeps the distribution exact."""
+        for _ in range(max_attempts):
+            item = self.items[self.table.sample(rng)]
+            if item.max_quantity is None or owned_qty.get(item.id, 0) < item.max_quantity:
+                return item
+        # Most of the pool's mass is maxed out for this user: fall back to an explicit filtered draw.
+        eligible = [
+            (item, weight)
+            for item, weight in zip(self.items, self.weights)
+            if item.max_quantity is None or owned_qty.get(item.id, 0) < item.max_quantity
+        ]
+        if not eligible:
+            return None
+        return rng.choices([e[0] for e in eligible], weights=[e[1] for e in eligible], k=1)[0]
+
+
+@dataclass
+class LootTables:
+    version: int
+    built_at: float
+    chest_ids: list[int]
+    chest_ids_by_tier: dict[str, list[int]]
+    chest_table: AliasTable | None
+    base_items: list[LootItem]
+    _pools: dict[tuple[str, str | None], LootPool | None] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def pick_chest_id(self, tier: str | None = None, rng=random) -> int | None:
+        if tier:
+            candidates = self.chest_ids_by_tier.get(tier.strip().lower())
+            if candidates:
+                return rng.choice(candidates)
+        if not self.chest_table:
+            return None
+        return self.chest_ids[self.chest_table.sample(rng)]
+
+    def item_pool(self, tier: str, max_item_rarity: str | None) -> LootPool | None:
+        """Pool for one (chest tier, rarity cap) pair, built on first use and kept for this version."""
+        key = (tier, (max_item_rarity or "").strip().lower() or None)
+        if key in self._pools:
+            return self._pools[key]
+        with self._lock:
+            if key not in self._pools:
+                self._pools[key] = self._build_pool(*key)
+            return self._pools[key]
+
+    def _build_pool(self, tier: str, max_item_rarity: str | None) -> LootPool | None:
+        from .chest_service import ChestService  # local import to avoid cycle
+
+        max_rank = ChestService._rarity_rank(max_item_rarity) if max_item_rarity else None
+        rarity_weights = ChestService.RARITY_WEIGHTS.get(tier, {})
+        items: list[LootItem] = []
+        weights: list[float] = []
+        for item in self.base_items:
+            if max_rank is not None and ChestService._rarity_rank(item.rarity) > max_rank:
+                continue
+            rarity = (item.rarity or "").strip().lower()
+            items.append(item)
+            weights.append(max(rarity_weights.get(rarity, 1.0), 0.05))
+        if not items:
+            return None
+        capped = frozenset(item.id for item in items if item.max_quantity is not None)
+        return LootPool(items=items, weights=weights, table=AliasTable(weights), capped_item_ids=capped)
+
+
+class LootTableService:
+    """Per-process cache of chest and item loot tables, validated against a shared version.
+
+    ORM writes to Item or Chest bump the cache_versions row inside their own transaction, so every
+    worker sees the change once it commits and none see it if it rolls back. The TTL only bounds
+    staleness for raw SQL edits that skip the ORM.
+    """
+
+    VERSION_NAME = "loot_tables"
+
+    @classmethod
+    def stored_version(cls) -> int:
+        return int(
+            db.session.execute(select(CacheVersion.version).where(CacheVersion.name == cls.VERSION_NAME)).scalar()
+            or 0
+        )
+
+    @classmethod
+    def current(cls) -> LootTables:
+        cache = current_app.extensions.setdefault("loot_tables", {})
+        tables: LootTables | None = cache.get("tables")
+        ttl = float(current_app.config.get("LOOT_TABLE_TTL_SECONDS", 300))
+        # Read the version before the rows: a change committed in between leaves the tables
+        # stamped with the older version, so they are rebuilt on the next call.
+        version = cls.stored_version()
+        if tables is not None and tables.version == version and time.monotonic() - tables.built_at < ttl:
+            return tables
+        tables = cls._build(version)
+        cache["tables"] = tables
+        return tables
+
+    @classmethod
+    def _build(cls, version: int) -> LootTables:
+        from .chest_service import ChestService  # local import to avoid cycle
+
+        chests = [chest for chest in ChestDAO.list_chests() if chest.item_id]
+        chest_ids = [chest.item_id for chest in chests]
+        by_tier: dict[str, list[int]] = {}
+        weights = []
+        for chest in chests:
+            chest_tier = (chest.tier or "common").strip().lower()
+            by_tier.setdefault(chest_tier, []).append(chest.item_id)
+            weights.append(max(ChestService.CHEST_TIER_WEIGHTS.get(chest_tier, 1.0), 0.05))
+
+        chest_id_set = set(chest_ids)
+        items = [item for item in ItemsDAO.list_items() if item.id not in chest_id_set]
+        chest_sourced = [item for item in items if (item.default_source or "").strip().lower() == "chest"]
+        base = chest_sourced or items
+        snapshots = [
+            LootItem(
+                id=item.id,
+                name=item.name,
+                type=item.type.value if item.type else None,
+                rarity=item.rarity,
+                asset_path=item.asset_path,
+                trigger=item.trigger,
+                trigger_value=item.trigger_value,
+                max_quantity=item.max_quantity,
+            )
+            for item in base
+        ]
+        return LootTables(
+            version=version,
+            built_at=time.monotonic(),
+            chest_ids=chest_ids,
+            chest_ids_by_tier=by_tier,
+            chest_table=AliasTable(weights) if weights else None,
+            base_items=snapshots,
+        )
+
+
+def _invalidate_loot_tables(mapper, connection, target) -> None:  # noqa: ARG001
+    """Bump the shared version on the writing connection, so it commits or rolls back with the change."""
+    versions = CacheVersion.__table__
+    bumped = connection.execute(
+        update(versions)
+        .where(versions.c.name == LootTableService.VERSION_NAME)
+        .values(version=versions.c.version + 1)
+    )
+    if not bumped.rowcount:
+        connection.execute(insert(versions).values(name=LootTableService.VERSION_NAME, version=1))
+
+
+for _model in (Item, Chest):
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _invalidate_loot_tables)
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from collections import defaultdict
 
-from ..config import PET_EVOLUTIONS
 from ..dao.petDAO import PetDAO
 from ..models import db
 from ..models.pet import Pet
 from ..models.petStyle import PetStyle
+from .level_curve import LevelCurveService
+from .state_version_service import StateVersionService
 
 
 class PetService:
@@ -40,38 +41,36 @@ class PetService:
     def get_pet_by_user(user_id: int) -> Pet | None:
         return PetDAO.get_by_user_id(user_id)
 
+    @staticmethod
+    def pet_for_state(state) -> Pet:
+        """Return the pet from a loaded GameplayState, creating it only when the user has none."""
+        if state.pet is None:
+            state.pet = PetService.create_pet(state.user_id)
+        return state.pet
+
     @staticmethod
     def add_xp(pet: Pet, amount: int) -> dict:
         if amount <= 0:
-            return {"pet": pet, "evolved": False}
+            return {"pet": pet, "evolved": False, "levels_gained": 0}
 
-        pet.xp = max(0, (pet.xp or 0) + amount)
-        pet_state = PetService.evolve_if_needed(pet)
-        PetDAO.save(pet)
-        return pet_state
+        # Evolution is driven by the xp value the database returned, not the stale Python copy.
+        previous_level = pet.level or 1
+        xp = PetDAO.increment_xp(pet, amount)
+        level, stage, next_evolution_xp = LevelCurveService.current().evolution_for_xp(xp)
+        evolved = False
+        if level > previous_level:
+            evolved = PetDAO.advance_level(pet, level, stage, next_evolution_xp)
+        return {"pet": pet, "evolved": evolved, "levels_gained": (pet.level or 1) - previous_level if evolved else 0}
 
     @staticmethod
     def evolve_if_needed(pet: Pet) -> dict:
-        sorted_levels = sorted(PET_EVOLUTIONS.items(), key=lambda item: item[0])
-        evolved = False
-        new_level = pet.level
-        new_stage = pet.stage
-
-        for level, data in sorted_levels:
-            if pet.xp >= data["xp_required"]:
-                if level != new_level:
-                    evolved = True
-                new_level = level
-                new_stage = data["stage"]
-
-        next_level = new_level + 1
-        next_config = PET_EVOLUTIONS.get(next_level)
+        new_level, new_stage, next_evolution_xp = LevelCurveService.current().evolution_for_xp(pet.xp or 0)
+        previous_level = pet.level or 1
+        evolved = new_level != previous_level
         pet.level = new_level
         pet.stage = new_stage
-        pet.next_evolution_xp = (
-            next_config["xp_required"] if next_config else PET_EVOLUTIONS[new_level]["xp_required"]
-        )
-        return {"pet": pet, "evolved": evolved}
+        pet.next_evolution_xp = next_evolution_xp
+        return {"pet": pet, "evolved": evolved, "levels_gained": max(0, new_level - previous_level)}
 
     @staticmethod
     def reset_pet(user_id: int) -> Pet | None:
@@ -79,12 +78,13 @@ class PetService:
         if not pet:
             return None
 
-        base_config = PET_EVOLUTIONS[1]
+        curve = LevelCurveService.current()
         pet.xp = 0
         pet.level = 1
-        pet.stage = base_config["stage"]
-        pet.next_evolution_xp = PET_EVOLUTIONS[2]["xp_required"]
+        pet.stage = curve.stage_for_level(1)
+        pet.next_evolution_xp = curve.next_threshold(1)
         PetDAO.save(pet)
+        StateVersionService.touch(user_id)
         return pet
 
     # --- Cosmetics helpers ---
@@ -112,11 +112,13 @@ class PetService:
             return cls.cosmetic_loadout(user_id)
         loadout = cls._cosmetic_loadouts[user_id]
         loadout[normalized_slot] = item_id
+        StateVersionService.touch(user_id)
         return cls.cosmetic_loadout(user_id)
 
     @classmethod
     def clear_cosmetics(cls, user_id: int) -> dict[str, str]:
         cls._cosmetic_loadouts.pop(user_id, None)
+        StateVersionService.touch(user_id)
         return {}
 
     @classmethod
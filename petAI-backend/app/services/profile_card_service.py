@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from flask import has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from ..dao.profile_cardDAO import ProfileCardDAO
+from ..models import db
+from ..models.item import Item
+from ..models.pet import Pet
+from ..models.petStyle import PetStyle
+from ..models.profile_card import ProfileCard
+from ..models.user import User
+from .pet_service import PetService
+
+
+class ProfileCardService:
+    """Serves friend lists and search from the profile_cards projection.
+
+    Pet, style and username writes queue their owner in session.info and the card is rewritten
+    just before that transaction commits, so reads only ever select cards.
+    """
+
+    _STYLE_SLOTS = ("hat_id", "sunglasses_id", "color_id", "background_id")
+    _PET_FIELDS = ("stage", "level", "xp", "next_evolution_xp", "pet_type", "current_sprite")
+    _PENDING_USERS = "pending_profile_cards"
+    _PENDING_PETS = "pending_profile_card_pets"
+
+    @staticmethod
+    def display_name(username: str | None, fallback_id: int | None) -> str:
+        if username:
+            return username
+        return f"Guest#{fallback_id or 0}"
+
+    @classmethod
+    def cards_for(cls, user_ids: list[int]) -> dict[int, ProfileCard]:
+        """Cards for user_ids in one read; users without a stored card get a transient one."""
+        ids = list(dict.fromkeys(user_ids))
+        cards = ProfileCardDAO.get_many(ids)
+        missing = [user_id for user_id in ids if user_id not in cards]
+        if missing:
+            # Only users written before the projection existed land here; `flask
+            # rebuild-profile-cards` backfills them. Friend lists have always given pet-less
+            # users a fresh pet, and that pet write queues the user's card.
+            rows = cls._rows(missing, create_pets=True)
+            cards.update({row["user_id"]: ProfileCard(**row) for row in rows})
+        return cards
+
+    @classmethod
+    def refresh(cls, user_ids: list[int]) -> int:
+        """Rewrite the cards of user_ids in four reads and one upsert; returns how many were written."""
+        rows = cls._rows(user_ids, create_pets=False)
+        ProfileCardDAO.upsert(rows)
+        return len(rows)
+
+    @classmethod
+    def _rows(cls, user_ids: list[int], *, create_pets: bool) -> list[dict]:
+        users = db.session.execute(select(User.id, User.username).where(User.id.in_(user_ids))).all()
+        if not users:
+            return []
+        pets = {pet.user_id: pet for pet in Pet.query.filter(Pet.user_id.in_([row.id for row in users]))}
+        if create_pets:
+            for row in users:
+                if row.id not in pets:
+                    pets[row.id] = PetService.create_pet(row.id)
+
+        styles: dict[int, PetStyle] = {}
+        pet_ids = [pet.id for pet in pets.values()]
+        for style in PetStyle.query.filter(PetStyle.pet_id.in_(pet_ids)).order_by(PetStyle.id.asc()):
+            styles.setdefault(style.pet_id, style)
+        item_ids = {
+            item_id
+            for style in styles.values()
+            for item_id in (getattr(style, slot) for slot in cls._STYLE_SLOTS)
+            if item_id
+        }
+        items = {item.id: item for item in Item.query.filter(Item.id.in_(item_ids))} if item_ids else {}
+
+        now = datetime.now(timezone.utc)
+        rows = []
+        for row in users:
+            pet = pets.get(row.id)
+            if pet is None:
+                # No pet yet: its creation queues the card.
+                continue
+            rows.append(
+                {
+                    "user_id": row.id,
+                    "display_name": cls.display_name(row.username, row.id),
+                    "pet_stage": pet.stage,
+                    "pet_level": pet.level,
+                    "pet_xp": pet.xp,
+                    "pet_next_evolution_xp": pet.next_evolution_xp,
+                    "pet_type": pet.pet_type,
+                    "pet_current_sprite": pet.current_sprite,
+                    "style_triggers": cls._style_triggers(styles.get(pet.id), items),
+                    "updated_at": now,
+                }
+            )
+        return rows
+
+    # --- write-path tracking ---
+    @classmethod
+    def _queue(cls, session: Session | None, key: str, value: int | None) -> None:
+        if session is not None and value is not None:
+            session.info.setdefault(key, set()).add(value)
+
+    @classmethod
+    def queue_user(cls, user_id: int | None) -> None:
+        """Queue user_id's card for writes that bypass the mapper events, such as Core UPDATEs."""
+        cls._queue(db.session(), cls._PENDING_USERS, user_id)
+
+    @staticmethod
+    def _changed(target, fields: tuple[str, ...]) -> bool:
+        state = inspect(target)
+        return any(state.attrs[field].history.has_changes() for field in fields)
+
+    @classmethod
+    def flush_pending(cls, session: Session) -> None:
+        """Rewrite the cards queued by this transaction's writes."""
+        session.flush()
+        user_ids = session.info.pop(cls._PENDING_USERS, set())
+        pet_ids = session.info.pop(cls._PENDING_PETS, set())
+        if pet_ids:
+            user_ids |= set(session.execute(select(Pet.user_id).where(Pet.id.in_(pet_ids))).scalars())
+        if user_ids:
+            cls.refresh(sorted(user_ids))
+
+    @classmethod
+    def _style_triggers(cls, style: PetStyle | None, items: dict[int, Item]) -> list[dict]:
+        if style is None:
+            return []
+        triggers: list[dict] = []
+        for slot in cls._STYLE_SLOTS:
+            item_id = getattr(style, slot)
+            if not item_id:
+                continue
+            item = items.get(item_id)
+            trigger = str((item.trigger if item else None) or "").strip()
+            if trigger:
+                triggers.append({"trigger": trigger, "trigger_value": item.trigger_value})
+        return triggers
+
+    @staticmethod
+    def payload(card: ProfileCard) -> dict:
+        entry = card.to_dict()
+        # Loadouts live in process memory, so they are read live rather than projected.
+        entry["pet_cosmetics"] = PetService.cosmetic_payload(card.user_id)
+        return entry
+
+    @classmethod
+    def rebuild(cls, *, batch_size: int = 500) -> int:
+        """Rebuild every card in id-ordered batches; returns how many were written."""
+        written = 0
+        after_id = 0
+        while True:
+            user_ids = (
+                db.session.execute(
+                    select(User.id).where(User.id > after_id).order_by(User.id.asc()).limit(batch_size)
+                )
+                .scalars()
+                .all()
+            )
+            if not user_ids:
+                return written
+            written += cls.refresh(user_ids)
+            db.session.commit()
+            after_id = user_ids[-1]
+
+
+def _queue_pet_card(mapper, connection, target) -> None:  # noqa: ARG001
+    if ProfileCardService._changed(target, ProfileCardService._PET_FIELDS):
+        ProfileCardService._queue(object_session(target), ProfileCardService._PENDING_USERS, target.user_id)
+
+
+def _queue_style_card(mapper, connection, target) -> None:  # noqa: ARG001
+    if ProfileCardService._changed(target, ProfileCardService._STYLE_SLOTS):
+        ProfileCardService._queue(object_session(target), ProfileCardService._PENDING_PETS, target.pet_id)
+
+
+def _queue_username_card(mapper, connection, target) -> None:  # noqa: ARG001
+    if ProfileCardService._changed(target, ("username",)):
+        ProfileCardService._queue(object_session(target), ProfileCardService._PENDING_USERS, target.id)
+
+
+for _model, _listener in ((Pet, _queue_pet_card), (PetStyle, _queue_style_card)):
+    for _event_name in ("after_insert", "after_update"):
+        event.listen(_model, _event_name, _listener)
+event.listen(User, "after_update", _queue_username_card)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_cards(session) -> None:
+    if has_app_context():
+        ProfileCardService.flush_pending(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_cards(session) -> None:
+    session.info.pop(ProfileCardService._PENDING_USERS, None)
+    session.info.pop(ProfileCardService._PENDING_PETS, None)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timezone
+from functools import lru_cache
+
+from dateutil.rrule import rrulestr
+
+
+@lru_cache(maxsize=2048)
+def _compile(rule_text: str, dtstart: datetime):
+    # cache=True lets dateutil memoize occurrences it already generated for this rule.
+    return rrulestr(rule_text, dtstart=dtstart, cache=True)
+
+
+class RecurrenceService:
+    """Compiled RRULE expansion for activity types; rules are cached by (text, dtstart)."""
+
+    MAX_WINDOW_DAYS = 400
+
+    @staticmethod
+    def anchor(activity_type) -> datetime:
+        """Stable dtstart for a type: UTC midnight of the day it was created."""
+        created_at = getattr(activity_type, "created_at", None)
+        day = created_at.date() if created_at else datetime.now(timezone.utc).date()
+        return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+    @staticmethod
+    def compile(rule_text: str, dtstart: datetime):
+        try:
+            return _compile(rule_text.strip(), dtstart)
+        except (ValueError, TypeError, AttributeError):
+            raise ValueError("Invalid recurrence rule")
+
+    @classmethod
+    def occurrences(cls, rule_text: str, dtstart: datetime, start_date: date, end_date: date) -> list[date]:
+        """Distinct dates in [start_date, end_date] on which the rule fires."""
+        if end_date < start_date:
+            return []
+        if (end_date - start_date).days >= cls.MAX_WINDOW_DAYS:
+            raise ValueError(f"recurrence window cannot exceed {cls.MAX_WINDOW_DAYS} days")
+        rule = cls.compile(rule_text, dtstart)
+        window_start = datetime.combine(start_date, time.min, tzinfo=timezone.utc)
+        window_end = datetime.combine(end_date, time.max, tzinfo=timezone.utc)
+        try:
+            fired = rule.between(window_start, window_end, inc=True)
+        except TypeError:
+            # Rules carrying their own naive DTSTART cannot be compared with aware bounds.
+            fired = rule.between(window_start.replace(tzinfo=None), window_end.replace(tzinfo=None), inc=True)
+        return sorted({occurrence.date() for occurrence in fired})
+
+    @staticmethod
+    def cache_info():
+        return _compile.cache_info()
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, delete, exists, func, insert, literal, select, update
+
+from ..models import db
+from ..models.chest import Chest
+from ..models.itemOwnership import ItemOwnership
+from ..models.job_run_member import JobRunMember
+from ..models.pet import Pet
+from ..models.user import PlanType, User
+from .job_run_service import JobRunService
+from .loot_table import LootTableService
+from .state_version_service import StateVersionService
+
+
+class SegmentGrantService:
+    """Grant coins or chests to every user matching a segment filter, in set-based chunks.
+
+    The segment is frozen into job_run_members when the job is created, so users who start or stop
+    matching while it runs (new signups, streak changes) neither join nor drop out halfway.
+    """
+
+    KIND = "segment_grant"
+    MAX_COINS = 1_000_000
+    MAX_CHESTS = 100
+
+    # --- params ---
+    @staticmethod
+    def _parse_datetime(value, field: str) -> str | None:
+        if value in (None, ""):
+            return None
+        if not isinstance(value, str):
+            raise ValueError(f"{field} must be an ISO-8601 string")
+        try:
+            parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"{field} must be an ISO-8601 string")
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.isoformat()
+
+    @staticmethod
+    def _parse_int(value, field: str) -> int | None:
+        if value in (None, ""):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be an integer")
+
+    @classmethod
+    def _normalize_filters(cls, raw: dict) -> dict:
+        if not isinstance(raw, dict):
+            raise ValueError("filters must be an object")
+        plans = raw.get("plan")
+        if isinstance(plans, str):
+            plans = [plans]
+        if plans is not None:
+            try:
+                plans = sorted({PlanType(str(plan).strip().upper()).value for plan in plans})
+            except ValueError:
+                raise ValueError("plan must be one of: " + ", ".join(p.value for p in PlanType))
+        filters = {
+            "plan": plans or None,
+            "created_from": cls._parse_datetime(raw.get("created_from"), "created_from"),
+            "created_to": cls._parse_datetime(raw.get("created_to"), "created_to"),
+            "last_activity_from": cls._parse_datetime(raw.get("last_activity_from"), "last_activity_from"),
+            "last_activity_to": cls._parse_datetime(raw.get("last_activity_to"), "last_activity_to"),
+            "min_streak": cls._parse_int(raw.get("min_streak"), "min_streak"),
+            "max_streak": cls._parse_int(raw.get("max_streak"), "max_streak"),
+        }
+        return {key: value for key, value in filters.items() if value is not None}
+
+    @classmethod
+    def _normalize_grant(cls, raw: dict) -> dict:
+        if not isinstance(raw, dict):
+            raise ValueError("grant must be an object")
+        grant_type = (raw.get("type") or "").strip().lower()
+        if grant_type == "coins":
+            amount = cls._parse_int(raw.get("amount"), "amount")
+            if not amount or amount <= 0 or amount > cls.MAX_COINS:
+                raise ValueError(f"amount must be between 1 and {cls.MAX_COINS}")
+            return {"type": "coins", "amount": amount}
+        if grant_type == "chests":
+            quantity = cls._parse_int(raw.get("quantity", 1), "quantity")
+            if not quantity or quantity <= 0 or quantity > cls.MAX_CHESTS:
+                raise ValueError(f"quantity must be between 1 and {cls.MAX_CHESTS}")
+            item_id = cls._parse_int(raw.get("item_id"), "item_id")
+            tier = (raw.get("tier") or "").strip().lower() or None
+            if item_id is None:
+                # Resolve the tier once so a resumed job keeps granting the same chest.
+                item_id = LootTableService.current().pick_chest_id(tier)
+            if item_id is None or not db.session.get(Chest, item_id):
+                raise LookupError("Chest not found")
+            return {"type": "chests", "item_id": item_id, "quantity": quantity}
+        raise ValueError("grant type must be 'coins' or 'chests'")
+
+    @classmethod
+    def validate(cls, params: dict) -> dict:
+        normalized = {
+            "filters": cls._normalize_filters(params.get("filters") or {}),
+            "grant": cls._normalize_grant(params.get("grant") or {}),
+        }
+        chunk_size = cls._parse_int(params.get("chunk_size"), "chunk_size")
+        if chunk_size is not None:
+            if chunk_size <= 0:
+                raise ValueError("chunk_size must be greater than zero")
+            normalized["chunk_size"] = chunk_size
+        return normalized
+
+    # --- segment ---
+    @staticmethod
+    def _criteria(filters: dict) -> list:
+        criteria = []
+        if filters.get("plan"):
+            criteria.append(User.plan.in_([PlanType(plan) for plan in filters["plan"]]))
+        if filters.get("created_from"):
+            criteria.append(User.created_at >= datetime.fromisoformat(filters["created_from"]))
+        if filters.get("created_to"):
+            criteria.append(User.created_at < datetime.fromisoformat(filters["created_to"]))
+        if filters.get("last_activity_from"):
+            criteria.append(User.last_activity_at >= datetime.fromisoformat(filters["last_activity_from"]))
+        if filters.get("last_activity_to"):
+            criteria.append(User.last_activity_at < datetime.fromisoformat(filters["last_activity_to"]))
+        if filters.get("min_streak") is not None:
+            criteria.append(User.streak_current >= filters["min_streak"])
+        if filters.get("max_streak") is not None:
+            criteria.append(User.streak_current <= filters["max_streak"])
+        return criteria
+
+    @classmethod
+    def count(cls, params: dict) -> int:
+        stmt = select(func.count(User.id)).where(*cls._criteria(params["filters"]))
+        return int(db.session.execute(stmt).scalar() or 0)
+
+    @classmethod
+    def freeze(cls, job_id: int, params: dict) -> int:
+        """Snapshot the matching user ids for job_id in one INSERT ... SELECT."""
+        matching = select(literal(job_id), User.id).where(*cls._criteria(params["filters"]))
+        result = db.session.execute(insert(JobRunMember).from_select(["job_id", "user_id"], matching))
+        return result.rowcount or 0
+
+    # --- grants ---
+    @classmethod
+    def run_chunk(cls, params: dict, after_id: int, limit: int) -> tuple[int | None, int, int]:
+        job_id = params["job_id"]
+        ids = (
+            db.session.execute(
+                select(JobRunMember.user_id)
+                .where(JobRunMember.job_id == job_id, JobRunMember.user_id > after_id)
+                .order_by(JobRunMember.user_id.asc())
+                .limit(limit)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            # The snapshot is only needed to resume; drop it with the final checkpoint.
+            db.session.execute(delete(JobRunMember).where(JobRunMember.job_id == job_id))
+            return None, 0, 0
+        grant = params["grant"]
+        if grant["type"] == "coins":
+            affected = cls._grant_coins(ids, grant["amount"])
+        else:
+            affected = cls._grant_chests(ids, grant["item_id"], grant["quantity"])
+        return ids[-1], len(ids), affected
+
+    @staticmethod
+    def _grant_coins(user_ids: list[int], amount: int) -> int:
+        result = db.session.execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(
+                coins=func.coalesce(User.coins, 0) + amount,
+                state_version=func.coalesce(User.state_version, 0) + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    @staticmethod
+    def _grant_chests(user_ids: list[int], chest_item_id: int, quantity: int) -> int:
+        # Top up each user's first existing stack, matching ItemOwnershipDAO.get_item_from_inventory.
+        first_stack = (
+            select(func.min(ItemOwnership.id))
+            .where(ItemOwnership.item_id == chest_item_id, ItemOwnership.user_id.in_(user_ids))
+            .group_by(ItemOwnership.user_id)
+        )
+        updated = db.session.execute(
+            update(ItemOwnership)
+            .where(ItemOwnership.id.in_(first_stack))
+            .values(quantity=func.coalesce(ItemOwnership.quantity, 0) + quantity)
+            .execution_options(synchronize_session=False)
+        ).rowcount or 0
+
+        owns = exists().where(ItemOwnership.user_id == User.id, ItemOwnership.item_id == chest_item_id)
+        missing = (
+            select(
+                User.id,
+                literal(chest_item_id),
+                select(Pet.id).where(Pet.user_id == User.id).scalar_subquery(),
+                func.now(),
+                literal(quantity),
+            )
+            .where(and_(User.id.in_(user_ids), ~owns))
+        )
+        inserted = db.session.execute(
+            insert(ItemOwnership).from_select(
+                ["user_id", "item_id", "pet_id", "acquired_at", "quantity"],
+                missing,
+            )
+        ).rowcount or 0
+        StateVersionService.touch(*user_ids)
+        return updated + inserted
+
+    # --- entry points ---
+    @classmethod
+    def create_job(cls, params: dict, *, created_by: str | None = None):
+        return JobRunService.create(cls.KIND, params, created_by=created_by)
+
+
+JobRunService.register(SegmentGrantService.KIND, SegmentGrantService)
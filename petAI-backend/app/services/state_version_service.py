@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import case, func, or_, select
+
+from ..dao.userDAO import UserDAO
+from ..models import db
+from ..models.friend_request import FriendRequest
+from ..models.user import User
+
+
+class StateVersionService:
+    """Per-user counter behind the ETags of the hub, daily and style reads.
+
+    Every write that changes what those reads return calls touch() inside its transaction, so
+    a rolled-back request never advances the version.
+    """
+
+    # Scopes whose payload also rolls over with the UTC day (today's tasks, weekly windows).
+    DATED_SCOPES = frozenset({"daily", "progression"})
+
+    @staticmethod
+    def touch(*user_ids: int | None) -> None:
+        ids = sorted({int(user_id) for user_id in user_ids if user_id})
+        if ids:
+            UserDAO.bump_state_version(ids)
+
+    @staticmethod
+    def current(user_id: int) -> int | None:
+        return UserDAO.get_state_version(user_id)
+
+    @staticmethod
+    def _friends_key(user_id: int) -> str:
+        """Fold the versions of everyone the user has a request with into one cheap aggregate."""
+        other_id = case(
+            (FriendRequest.requester_id == user_id, FriendRequest.receiver_id),
+            else_=FriendRequest.requester_id,
+        )
+        count, total = db.session.execute(
+            select(func.count(), func.coalesce(func.sum(User.state_version), 0))
+            .select_from(FriendRequest)
+            .join(User, User.id == other_id)
+            .where(or_(FriendRequest.requester_id == user_id, FriendRequest.receiver_id == user_id))
+        ).one()
+        return f"{count}-{total}"
+
+    @classmethod
+    def etag(cls, user_id: int, scope: str) -> str | None:
+        """Opaque tag for one user's view of a scope; None when the user does not exist."""
+        version = cls.current(user_id)
+        if version is None:
+            return None
+        parts = [scope, str(user_id), str(version)]
+        if scope in cls.DATED_SCOPES:
+            parts.append(datetime.now(timezone.utc).date().isoformat())
+        if scope == "friends":
+            parts.append(cls._friends_key(user_id))
+        return ".".join(parts)
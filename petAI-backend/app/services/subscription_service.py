@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 
-from ..models import db
+from ..models import UserEntitlement, db
 from ..services.access_code_service import AccessCodeService
+from ..services.entitlement_service import EntitlementService
 from ..models.subscription import Subscription
 
 
@@ -12,17 +13,30 @@ class SubscriptionService:
     def latest_for_user(user_id: int) -> Subscription | None:
         return (
             Subscription.query.filter_by(user_id=user_id)
-            .order_by(Subscription.expires_at.desc().nullslast(), Subscription.created_at.desc())
+            .order_by(
+                Subscription.expires_at.desc().nullslast(),
+                Subscription.created_at.desc(),
+                Subscription.id.desc(),
+            )
             .first()
         )
 
     @staticmethod
     def subscription_payload(user_id: int) -> dict:
+        """Read the materialized entitlement, falling back to the source tables if missing or expired."""
+        row = db.session.get(UserEntitlement, user_id)
+        if row is not None and not row.is_stale():
+            return row.to_payload()
+        return SubscriptionService.compute_payload(user_id)
+
+    @staticmethod
+    def compute_payload(user_id: int) -> dict:
         sub = SubscriptionService.latest_for_user(user_id)
         sub_payload: dict | None = None
         if sub:
             now = datetime.now(timezone.utc)
-            expires_at = sub.expires_at
+            expires_at = SubscriptionService._aware(sub.expires_at)
+            started_at = SubscriptionService._aware(sub.started_at)
             active = sub.status in ("active", "trialing") and (
                 expires_at is None or expires_at > now
             )
@@ -33,7 +47,7 @@ class SubscriptionService:
                 "provider": sub.provider,
                 "is_trial": sub.is_trial,
                 "expires_at": expires_at.isoformat() if expires_at else None,
-                "started_at": sub.started_at.isoformat() if sub.started_at else None,
+                "started_at": started_at.isoformat() if started_at else None,
             }
             if active:
                 return sub_payload
@@ -41,16 +55,16 @@ class SubscriptionService:
         access_redemption = AccessCodeService.active_access_for_user(user_id)
         if access_redemption:
             code = access_redemption.access_code
+            code_expires_at = SubscriptionService._aware(code.expires_at) if code else None
+            redeemed_at = SubscriptionService._aware(access_redemption.redeemed_at)
             return {
                 "active": True,
                 "status": "active",
                 "product_id": code.code if code else None,
                 "provider": "access_code",
                 "is_trial": False,
-                "expires_at": code.expires_at.isoformat() if code and code.expires_at else None,
-                "started_at": access_redemption.redeemed_at.isoformat()
-                if access_redemption.redeemed_at
-                else None,
+                "expires_at": code_expires_at.isoformat() if code_expires_at else None,
+                "started_at": redeemed_at.isoformat() if redeemed_at else None,
             }
 
         if sub_payload is not None:
@@ -58,6 +72,12 @@ class SubscriptionService:
 
         return {"active": False, "status": "none"}
 
+    @staticmethod
+    def _aware(value: datetime | None) -> datetime | None:
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
     @staticmethod
     def set_mock_subscription(user_id: int, active: bool) -> Subscription:
         now = datetime.now(timezone.utc)
@@ -82,4 +102,5 @@ class SubscriptionService:
             if not sub.started_at:
                 sub.started_at = now
         db.session.add(sub)
+        EntitlementService.refresh(user_id)
         return sub
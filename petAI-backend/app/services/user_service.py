@@ -8,9 +8,10 @@ from ..dao.userDAO import UserDAO
 from ..models import db
 from ..models.user import PlanType, User
 from ..services.auth_token_service import AuthTokenService
+from ..services.entitlement_service import EntitlementService
 from ..services.interest_service import InterestService
 from ..services.pet_service import PetService
-from ..services.subscription_service import SubscriptionService
+from ..services.state_version_service import StateVersionService
 
 
 class UserService:
@@ -66,7 +67,7 @@ class UserService:
             "need_interests_setup": user.needs_interest_setup(),
             "trial_days_left": trial_left,
             "streak_multiplier": streak_multiplier,
-            "subscription": SubscriptionService.subscription_payload(user.id),
+            "subscription": EntitlementService.subscription_for_user(user.id),
         }
         payload["user"]["trial_days_left"] = trial_left
         payload["user"]["streak_multiplier"] = streak_multiplier
@@ -88,7 +89,12 @@ class UserService:
         return get_current_user_id() or explicit_user_id
 
     @staticmethod
-    def update_profile(user_id: int, age: int | None = None, gender: str | None = None) -> dict:
+    def update_profile(
+        user_id: int,
+        age: int | None = None,
+        gender: str | None = None,
+        utc_offset_minutes: int | None = None,
+    ) -> dict:
         user = UserDAO.get_by_id(user_id)
         if not user:
             raise LookupError("User not found")
@@ -101,6 +107,11 @@ class UserService:
             gender = gender.strip()
             if gender:
                 user.gender = gender
+        if utc_offset_minutes is not None:
+            if not -12 * 60 <= utc_offset_minutes <= 14 * 60:
+                raise ValueError("utc_offset_minutes must be between -720 and 840")
+            user.utc_offset_minutes = utc_offset_minutes
+        StateVersionService.touch(user_id)
         db.session.flush()
         return user.to_dict()
 
@@ -124,9 +135,8 @@ class UserService:
             return False
         user.is_active = False
         if revoke_tokens:
-            # revoke all tokens for this user
-            for token in list(user.tokens):
-                db.session.delete(token)
+            # revoke all tokens for this user, signed ones included
+            AuthTokenService.revoke_all_for_user(user.id)
         db.session.commit()
         return True
 
@@ -151,20 +161,22 @@ class UserService:
     def add_coins(user: User, amount: int) -> User:
         if amount == 0:
             return user
-        user.coins = max(0, (user.coins or 0) + amount)
-        UserDAO.save(user)
+        UserDAO.increment_coins(user, amount)
         return user
 
     @staticmethod
     def spend_coins(user: User, amount: int) -> User:
         if amount <= 0:
             return user
-        if (user.coins or 0) < amount:
+        if UserDAO.spend_coins(user, amount) is None:
             raise ValueError("Not enough coins")
-        user.coins = max(0, (user.coins or 0) - amount)
-        UserDAO.save(user)
         return user
 
+    @staticmethod
+    def record_activity(user: User) -> int:
+        """Bump the lifetime activity counter and return the new value."""
+        return UserDAO.increment_activity_count(user)
+
     @staticmethod
     def streak_multiplier(streak: int, cap: int = 10) -> float:
         """Compute XP multiplier from streak (1x to 2x at cap)."""
@@ -0,0 +1,41 @@
+"""Add users.utc_offset_minutes
+
+Revision ID: a1d7e3c6b8f4
+Revises: f9c6d2b5a7e3
+Create Date: 2026-10-18 15:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a1d7e3c6b8f4"
+down_revision = "f9c6d2b5a7e3"
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(inspector, table_name: str, column_name: str) -> bool:
+    return any(col["name"] == column_name for col in inspector.get_columns(table_name))
+
+
+def _index_exists(inspector, table_name: str, index_name: str) -> bool:
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not _column_exists(inspector, "users", "utc_offset_minutes"):
+        with op.batch_alter_table("users", schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column("utc_offset_minutes", sa.Integer(), nullable=False, server_default="0")
+            )
+    if not _index_exists(inspector, "users", "ix_users_utc_offset_id"):
+        op.create_index("ix_users_utc_offset_id", "users", ["utc_offset_minutes", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_users_utc_offset_id", table_name="users")
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("utc_offset_minutes")
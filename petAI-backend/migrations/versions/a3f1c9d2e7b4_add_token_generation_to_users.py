@@ -0,0 +1,41 @@
+"""Add token generation to users
+
+Revision ID: a3f1c9d2e7b4
+Revises: d4c3b2a1908f, 7d2c9a5b1f2c
+Create Date: 2026-10-18 09:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a3f1c9d2e7b4"
+down_revision = ("d4c3b2a1908f", "7d2c9a5b1f2c")
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(inspector, table_name: str, column_name: str) -> bool:
+    return any(col["name"] == column_name for col in inspector.get_columns(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "users" not in inspector.get_table_names():
+        return
+    column_exists = _column_exists(inspector, "users", "token_generation")
+    if not column_exists:
+        with op.batch_alter_table("users", schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column("token_generation", sa.Integer(), nullable=False, server_default="0")
+            )
+        column_exists = True
+    if column_exists:
+        with op.batch_alter_table("users", schema=None) as batch_op:
+            batch_op.alter_column("token_generation", server_default=None)
+
+
+def downgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("token_generation")
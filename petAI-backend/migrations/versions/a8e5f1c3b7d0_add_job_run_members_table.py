@@ -0,0 +1,35 @@
+"""Add job_run_members table
+
+Revision ID: a8e5f1c3b7d0
+Revises: f7d4e0b2a6c9
+Create Date: 2026-10-18 21:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a8e5f1c3b7d0"
+down_revision = "f7d4e0b2a6c9"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(inspector, table_name: str) -> bool:
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if _table_exists(inspector, "job_run_members"):
+        return
+    op.create_table(
+        "job_run_members",
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("job_runs.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+    )
+
+
+def downgrade():
+    op.drop_table("job_run_members")
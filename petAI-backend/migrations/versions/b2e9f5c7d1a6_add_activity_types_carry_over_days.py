@@ -0,0 +1,39 @@
+"""Add activity_types.carry_over_days and a (user_id, todo_date) index
+
+Revision ID: b2e9f5c7d1a6
+Revises: a1d7e3c6b8f4
+Create Date: 2026-10-18 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b2e9f5c7d1a6"
+down_revision = "a1d7e3c6b8f4"
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(inspector, table_name: str, column_name: str) -> bool:
+    return any(col["name"] == column_name for col in inspector.get_columns(table_name))
+
+
+def _index_exists(inspector, table_name: str, index_name: str) -> bool:
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not _column_exists(inspector, "activity_types", "carry_over_days"):
+        with op.batch_alter_table("activity_types", schema=None) as batch_op:
+            batch_op.add_column(sa.Column("carry_over_days", sa.Integer(), nullable=False, server_default="0"))
+    if not _index_exists(inspector, "daily_activities", "ix_daily_activities_user_todo_date"):
+        op.create_index("ix_daily_activities_user_todo_date", "daily_activities", ["user_id", "todo_date"])
+
+
+def downgrade():
+    op.drop_index("ix_daily_activities_user_todo_date", table_name="daily_activities")
+    with op.batch_alter_table("activity_types", schema=None) as batch_op:
+        batch_op.drop_column("carry_over_days")
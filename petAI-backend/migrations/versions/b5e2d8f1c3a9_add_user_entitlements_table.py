@@ -0,0 +1,48 @@
+"""Add user_entitlements table
+
+Revision ID: b5e2d8f1c3a9
+Revises: a3f1c9d2e7b4
+Create Date: 2026-10-18 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b5e2d8f1c3a9"
+down_revision = "a3f1c9d2e7b4"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(inspector, table_name: str) -> bool:
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if _table_exists(inspector, "user_entitlements"):
+        return
+    op.create_table(
+        "user_entitlements",
+        sa.Column(
+            "user_id",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="none"),
+        sa.Column("provider", sa.String(length=32)),
+        sa.Column("product_id", sa.String(length=120)),
+        sa.Column("is_trial", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("expires_at", sa.DateTime(timezone=True)),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    # Rows are backfilled with `flask rebuild-entitlements`; missing rows fall back to the source tables.
+
+
+def downgrade():
+    op.drop_table("user_entitlements")
@@ -0,0 +1,36 @@
+"""Drop profile_cards.state_version
+
+Revision ID: b9f6a2d4c8e1
+Revises: a8e5f1c3b7d0
+Create Date: 2026-10-18 22:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b9f6a2d4c8e1"
+down_revision = "a8e5f1c3b7d0"
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(inspector, table_name: str, column_name: str) -> bool:
+    return column_name in {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Cards are now written by the pet, style and username writes themselves.
+    if _column_exists(inspector, "profile_cards", "state_version"):
+        with op.batch_alter_table("profile_cards") as batch_op:
+            batch_op.drop_column("state_version")
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not _column_exists(inspector, "profile_cards", "state_version"):
+        with op.batch_alter_table("profile_cards") as batch_op:
+            batch_op.add_column(sa.Column("state_version", sa.Integer(), nullable=False, server_default="0"))
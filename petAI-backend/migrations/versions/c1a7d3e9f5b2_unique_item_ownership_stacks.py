@@ -0,0 +1,50 @@
+"""Make itemsOwnership one stack per user and item
+
+Revision ID: c1a7d3e9f5b2
+Revises: b9f6a2d4c8e1
+Create Date: 2026-10-18 23:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c1a7d3e9f5b2"
+down_revision = "b9f6a2d4c8e1"
+branch_labels = None
+depends_on = None
+
+
+def _index_exists(inspector, table_name: str, index_name: str) -> bool:
+    return index_name in {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if _index_exists(inspector, "itemsOwnership", "uq_itemsOwnership_user_item"):
+        return
+    # Fold duplicate stacks into the oldest one, which is the stack the app always read.
+    op.execute(
+        """
+        UPDATE "itemsOwnership"
+        SET quantity = (
+            SELECT SUM(other.quantity) FROM "itemsOwnership" AS other
+            WHERE other.user_id = "itemsOwnership".user_id AND other.item_id = "itemsOwnership".item_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM "itemsOwnership" GROUP BY user_id, item_id HAVING COUNT(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM "itemsOwnership"
+        WHERE id NOT IN (SELECT MIN(id) FROM "itemsOwnership" GROUP BY user_id, item_id)
+        """
+    )
+    op.create_index("uq_itemsOwnership_user_item", "itemsOwnership", ["user_id", "item_id"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_itemsOwnership_user_item", table_name="itemsOwnership")
@@ -0,0 +1,40 @@
+"""Add user_daily_stats table
+
+Revision ID: c4a1b7e9d3f8
+Revises: b2e9f5c7d1a6
+Create Date: 2026-10-18 17:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c4a1b7e9d3f8"
+down_revision = "b2e9f5c7d1a6"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(inspector, table_name: str) -> bool:
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if _table_exists(inspector, "user_daily_stats"):
+        return
+    # Backfill with `flask rebuild-daily-stats` after upgrading.
+    op.create_table(
+        "user_daily_stats",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("xp", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("coins", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("user_daily_stats")
@@ -0,0 +1,44 @@
+"""Add device_id and pruning indexes to auth_tokens
+
+Revision ID: c6f3a9e2d4b8
+Revises: b5e2d8f1c3a9
+Create Date: 2026-10-18 11:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c6f3a9e2d4b8"
+down_revision = "b5e2d8f1c3a9"
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(inspector, table_name: str, column_name: str) -> bool:
+    return any(col["name"] == column_name for col in inspector.get_columns(table_name))
+
+
+def _index_exists(inspector, table_name: str, index_name: str) -> bool:
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "auth_tokens" not in inspector.get_table_names():
+        return
+    if not _column_exists(inspector, "auth_tokens", "device_id"):
+        with op.batch_alter_table("auth_tokens", schema=None) as batch_op:
+            batch_op.add_column(sa.Column("device_id", sa.String(length=64), nullable=True))
+    if not _index_exists(inspector, "auth_tokens", "ix_auth_tokens_expires_at"):
+        op.create_index("ix_auth_tokens_expires_at", "auth_tokens", ["expires_at"])
+    if not _index_exists(inspector, "auth_tokens", "ix_auth_tokens_user_device"):
+        op.create_index("ix_auth_tokens_user_device", "auth_tokens", ["user_id", "device_id"])
+
+
+def downgrade():
+    op.drop_index("ix_auth_tokens_user_device", table_name="auth_tokens")
+    op.drop_index("ix_auth_tokens_expires_at", table_name="auth_tokens")
+    with op.batch_alter_table("auth_tokens", schema=None) as batch_op:
+        batch_op.drop_column("device_id")
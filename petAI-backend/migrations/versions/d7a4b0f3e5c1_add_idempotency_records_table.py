@@ -0,0 +1,44 @@
+"""Add idempotency_records table
+
+Revision ID: d7a4b0f3e5c1
+Revises: c6f3a9e2d4b8
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d7a4b0f3e5c1"
+down_revision = "c6f3a9e2d4b8"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(inspector, table_name: str) -> bool:
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if _table_exists(inspector, "idempotency_records"):
+        return
+    op.create_table(
+        "idempotency_records",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("key", sa.String(length=128), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("status_code", sa.Integer()),
+        sa.Column("response_body", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("user_id", "key", name="uq_idempotency_user_key"),
+    )
+    op.create_index("ix_idempotency_records_expires_at", "idempotency_records", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_idempotency_records_expires_at", table_name="idempotency_records")
+    op.drop_table("idempotency_records")
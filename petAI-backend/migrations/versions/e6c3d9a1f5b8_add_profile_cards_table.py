@@ -0,0 +1,45 @@
+"""Add profile_cards table
+
+Revision ID: e6c3d9a1f5b8
+Revises: d5b2c8f0e4a7
+Create Date: 2026-10-18 19:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e6c3d9a1f5b8"
+down_revision = "d5b2c8f0e4a7"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(inspector, table_name: str) -> bool:
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if _table_exists(inspector, "profile_cards"):
+        return
+    # Cards are built lazily on first read; `flask rebuild-profile-cards` fills them up front.
+    op.create_table(
+        "profile_cards",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("state_version", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("display_name", sa.String(length=50), nullable=False),
+        sa.Column("pet_stage", sa.String(length=50)),
+        sa.Column("pet_level", sa.Integer()),
+        sa.Column("pet_xp", sa.Integer()),
+        sa.Column("pet_next_evolution_xp", sa.Integer()),
+        sa.Column("pet_type", sa.String(length=50)),
+        sa.Column("pet_current_sprite", sa.String(length=255)),
+        sa.Column("style_triggers", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("profile_cards")
@@ -0,0 +1,48 @@
+"""Add job_runs table
+
+Revision ID: e8b5c1a4f6d2
+Revises: d7a4b0f3e5c1
+Create Date: 2026-10-18 13:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e8b5c1a4f6d2"
+down_revision = "d7a4b0f3e5c1"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(inspector, table_name: str) -> bool:
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if _table_exists(inspector, "job_runs"):
+        return
+    op.create_table(
+        "job_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("params", sa.JSON(), nullable=False),
+        sa.Column("cursor", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total", sa.Integer()),
+        sa.Column("processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("affected", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text()),
+        sa.Column("created_by", sa.String(length=120)),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_job_runs_kind", "job_runs", ["kind"])
+
+
+def downgrade():
+    op.drop_index("ix_job_runs_kind", table_name="job_runs")
+    op.drop_table("job_runs")
@@ -0,0 +1,37 @@
+"""Add cache_versions table
+
+Revision ID: f7d4e0b2a6c9
+Revises: e6c3d9a1f5b8
+Create Date: 2026-10-18 20:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f7d4e0b2a6c9"
+down_revision = "e6c3d9a1f5b8"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(inspector, table_name: str) -> bool:
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if _table_exists(inspector, "cache_versions"):
+        return
+    cache_versions = op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Seed the row so concurrent first writers only ever UPDATE it.
+    op.bulk_insert(cache_versions, [{"name": "loot_tables", "version": 0}])
+
+
+def downgrade():
+    op.drop_table("cache_versions")
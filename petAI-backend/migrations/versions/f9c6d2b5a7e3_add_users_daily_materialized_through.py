@@ -0,0 +1,33 @@
+"""Add users.daily_materialized_through
+
+Revision ID: f9c6d2b5a7e3
+Revises: e8b5c1a4f6d2
+Create Date: 2026-10-18 14:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f9c6d2b5a7e3"
+down_revision = "e8b5c1a4f6d2"
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(inspector, table_name: str, column_name: str) -> bool:
+    return any(col["name"] == column_name for col in inspector.get_columns(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if _column_exists(inspector, "users", "daily_materialized_through"):
+        return
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("daily_materialized_through", sa.Date(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("daily_materialized_through")
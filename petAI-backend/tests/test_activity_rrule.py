@@ -56,3 +56,50 @@ def test_rrule_creates_daily_tasks(ctx):
     assert len(tomorrow_entries) == 1
     assert today_entries[0].title == "Study Calculus"
     assert tomorrow_entries[0].title == "Study Calculus"
+
+
+def test_rrule_types_expand_through_generation_and_calendar(ctx):
+    from app.dao.activity_typeDAO import ActivityTypeDAO
+    from app.services.daily_activity_service import DailyActivityService
+    from app.services.recurrence import RecurrenceService
+
+    user = UserService.create_guest_user()
+    db.session.commit()
+    InterestService.save_user_interests(user.id, [{"name": "Study", "level": "sometimes"}])
+    db.session.commit()
+    result = ActivityService.create_activity(
+        user_id=user.id,
+        activity_name="Piano",
+        interest_name="Study",
+        rrule="FREQ=WEEKLY;BYDAY=MO,TH",
+    )
+    db.session.commit()
+    activity_type = ActivityTypeDAO.get_by_id(result["activity_type"]["id"])
+
+    start = datetime.now(timezone.utc).date() + timedelta(days=7)
+    DailyActivityService.ensure_range(user.id, start, days=14)
+    db.session.commit()
+    rows = DailyActivityDAO.list_for_user_between(user.id, start, start + timedelta(days=13))
+    piano_days = {row.todo_date.weekday() for row in rows if row.activity_type_id == activity_type.id}
+    assert piano_days == {0, 3}
+
+    hits = RecurrenceService.cache_info().hits
+    days = DailyActivityService.calendar(user.id, start, start + timedelta(days=59))
+    assert RecurrenceService.cache_info().hits > hits
+    assert len(days) == 60
+    for day in days:
+        weekday = datetime.fromisoformat(day["date"]).weekday()
+        stored = [a for a in day["activities"] if a["activity_type_id"] == activity_type.id]
+        planned = [p for p in day["planned"] if p["activity_type_id"] == activity_type.id]
+        assert len(stored) + len(planned) == (1 if weekday in (0, 3) else 0)
+    # The first two weeks were materialized above; later weeks are only planned.
+    assert all(not day["planned"] for day in days[:14])
+
+    with pytest.raises(ValueError):
+        ActivityService.update_activity_type(
+            user_id=user.id,
+            activity_type_id=activity_type.id,
+            activity_name="Piano",
+            interest_id=activity_type.interest_id,
+            rrule="FREQ=SOMETIMES",
+        )
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.dao.activityDAO import ActivityDAO
+from app.dao.userDAO import UserDAO
+from app.models import db
+from app.services.auth_token_service import AuthTokenService
+from app.services.chest_service import ChestService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _user_with_running(app) -> tuple[int, str]:
+    with app.app_context():
+        user = UserService.create_guest_user()
+        db.session.commit()
+        UserService.save_user_interests(user.id, [{"name": "Running", "level": "sometimes"}])
+        token_value = AuthTokenService.issue_token(user.id)
+        db.session.commit()
+        return user.id, token_value
+
+
+def test_sync_applies_completions_in_timestamp_order(app):
+    user_id, token_value = _user_with_running(app)
+    now = datetime.now(timezone.utc)
+    completions = [
+        {"client_id": "c", "area": "Running", "client_timestamp": now.isoformat()},
+        {"client_id": "a", "area": "Running", "client_timestamp": (now - timedelta(days=2)).isoformat()},
+        {"client_id": "bad", "area": "Knitting", "client_timestamp": (now - timedelta(days=1, hours=1)).isoformat()},
+        {"client_id": "b", "area": "running", "client_timestamp": (now - timedelta(days=1)).isoformat()},
+        {"client_id": "no-ts", "area": "Running"},
+    ]
+
+    client = app.test_client()
+    with patch.object(ChestService, "should_grant_bonus_chest", return_value=False):
+        resp = client.post(
+            "/activities/sync",
+            json={"completions": completions},
+            headers={"Authorization": f"Bearer {token_value}"},
+        )
+    assert resp.status_code == 200
+    data = resp.get_json()["data"]
+
+    results = data["results"]
+    assert [r["client_id"] for r in results] == ["c", "a", "bad", "b", "no-ts"]
+    assert [r["status"] for r in results] == ["ok", "ok", "error", "ok", "error"]
+    # Streaks were computed in client-timestamp order: a (day 1), b (day 2), c (day 3).
+    assert results[1]["result"]["streak_current"] == 1
+    assert results[3]["result"]["streak_current"] == 2
+    assert results[0]["result"]["streak_current"] == 3
+    assert data["applied"] == 3 and data["failed"] == 2
+    assert data["streak_current"] == 3
+
+    with app.app_context():
+        logs = ActivityDAO.list_for_user(user_id)
+        assert len(logs) == 3
+        assert UserDAO.get_by_id(user_id).activity_count == 3
+
+
+def test_sync_rejects_empty_batch(app):
+    _, token_value = _user_with_running(app)
+    resp = app.test_client().post(
+        "/activities/sync",
+        json={"completions": []},
+        headers={"Authorization": f"Bearer {token_value}"},
+    )
+    assert resp.status_code == 400
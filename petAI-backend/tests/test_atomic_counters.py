@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import update
+
+from app import create_app
+from app.config import Config
+from app.dao.itemsDAO import ItemOwnershipDAO
+from app.models import Item, StoreListing, db
+from app.models.pet import Pet
+from app.models.user import User
+from app.services.auth_token_service import AuthTokenService
+from app.services.pet_service import PetService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(params=[True, False], ids=["returning", "update-then-select"])
+def ctx(app, request, monkeypatch):
+    monkeypatch.setattr(db.engine.dialect, "update_returning", request.param)
+    yield
+
+
+def _concurrent_write(stmt) -> None:
+    # A second connection stands in for another request updating the same row.
+    with db.engine.begin() as conn:
+        conn.execute(stmt)
+
+
+def test_coin_increments_are_not_lost(app, ctx):
+    user = UserService.create_guest_user()
+    db.session.commit()
+    start = user.coins or 0
+
+    UserService.add_coins(user, 10)
+    db.session.commit()
+    _concurrent_write(update(User).where(User.id == user.id).values(coins=User.coins + 100))
+    # The in-memory copy is now stale; the increment must still apply on top of the other write.
+    UserService.add_coins(user, 5)
+    db.session.commit()
+
+    assert user.coins == start + 115
+    db.session.expire_all()
+    assert db.session.get(User, user.id).coins == start + 115
+
+    with pytest.raises(ValueError):
+        UserService.spend_coins(user, start + 116)
+    UserService.spend_coins(user, 15)
+    assert user.coins == start + 100
+    assert UserService.record_activity(user) == 1
+    assert UserService.record_activity(user) == 2
+
+
+def test_pet_evolution_uses_returned_xp(app, ctx):
+    user = UserService.create_guest_user()
+    db.session.commit()
+    pet = PetService.get_pet_by_user(user.id)
+    assert pet.level == 1
+
+    _concurrent_write(update(Pet).where(Pet.id == pet.id).values(xp=90))
+    result = PetService.add_xp(pet, 20)
+    db.session.commit()
+
+    assert pet.xp == 110
+    assert result["evolved"] is True
+    assert (pet.level, pet.stage) == (2, "sprout")
+    assert PetService.add_xp(pet, 1)["evolved"] is False
+
+
+def test_store_purchase_keeps_concurrent_coin_writes(app):
+    user = UserService.create_guest_user()
+    user.coins = 100
+    item = Item(name="Scarf", default_source="store")
+    db.session.add(item)
+    db.session.flush()
+    listing = StoreListing(item_id=item.id, price=30)
+    db.session.add(listing)
+    token_value = AuthTokenService.issue_token(user.id)
+    db.session.commit()
+    headers = {"Authorization": f"Bearer {token_value}"}
+    inventory = ItemOwnershipDAO.get_item_from_inventory
+
+    def _reward_lands_mid_purchase(*args):
+        _concurrent_write(update(User).where(User.id == user.id).values(coins=User.coins + 50))
+        return inventory(*args)
+
+    client = app.test_client()
+    with patch.object(ItemOwnershipDAO, "get_item_from_inventory", side_effect=_reward_lands_mid_purchase):
+        resp = client.post(f"/store/buy/{listing.id}", json={}, headers=headers)
+    assert resp.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(User, user.id).coins == 120
+
+    db.session.get(User, user.id).coins = 10
+    db.session.commit()
+    resp = client.post(f"/store/buy/{listing.id}", json={}, headers=headers)
+    assert (resp.status_code, resp.get_json()["error"]) == (400, "Insufficient coins")
@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.dao.activity_typeDAO import ActivityTypeDAO
+from app.dao.areaDAO import AreaDAO
+from app.dao.daily_activityDAO import DailyActivityDAO
+from app.models import JobRun, db
+from app.services.activity_service import ActivityService
+from app.services.carry_over_service import CarryOverService
+from app.services.job_run_service import JobRunService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_carry_over_moves_newest_pending_task_within_policy(app):
+    target = date(2030, 1, 10)
+    user = UserService.create_guest_user()
+    db.session.flush()
+    area = AreaDAO.create(user_id=user.id, name="Music")
+    db.session.flush()
+    carried = ActivityTypeDAO.get_or_create(user.id, area.id, "Piano", carry_over_days=2)
+    no_policy = ActivityTypeDAO.get_or_create(user.id, area.id, "Guitar")
+    has_today = ActivityTypeDAO.get_or_create(user.id, area.id, "Drums", carry_over_days=1)
+    too_old = ActivityTypeDAO.get_or_create(user.id, area.id, "Violin", carry_over_days=1)
+
+    def row(activity_type, scheduled_for):
+        return {
+            "user_id": user.id,
+            "interest_id": area.id,
+            "activity_type_id": activity_type.id,
+            "title": activity_type.name,
+            "scheduled_for": scheduled_for,
+        }
+
+    DailyActivityDAO.bulk_insert(
+        [
+            row(carried, target - timedelta(days=1)),
+            row(carried, target - timedelta(days=2)),
+            row(no_policy, target - timedelta(days=1)),
+            row(has_today, target - timedelta(days=1)),
+            row(has_today, target),
+            row(too_old, target - timedelta(days=3)),
+        ]
+    )
+    db.session.commit()
+
+    job = CarryOverService.create_job({"target_date": target.isoformat(), "chunk_size": 10})
+    assert job.total == 1
+    job = JobRunService.run(job.id)
+    assert job.status == JobRun.STATUS_COMPLETED
+    assert job.affected == 1
+
+    today = DailyActivityDAO.list_for_user_on_date(user.id, target)
+    assert sorted((r.title, r.scheduled_for) for r in today) == [
+        ("Drums", target),
+        ("Piano", target - timedelta(days=1)),
+    ]
+    assert [r.title for r in DailyActivityDAO.list_for_user_on_date(user.id, target - timedelta(days=2))] == ["Piano"]
+
+    # Re-running for the same day is a no-op.
+    rerun = JobRunService.run(CarryOverService.create_job({"target_date": target.isoformat()}).id)
+    assert rerun.affected == 0
+
+
+def test_carry_over_days_is_validated(app):
+    user = UserService.create_guest_user()
+    db.session.commit()
+    with pytest.raises(ValueError):
+        ActivityService.create_activity(
+            user_id=user.id, activity_name="Piano", interest_name="Music", carry_over_days=30
+        )
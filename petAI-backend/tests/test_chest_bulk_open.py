@@ -0,0 +1,105 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import update
+
+from app import create_app
+from app.config import Config
+from app.dao.itemsDAO import ItemOwnershipDAO
+from app.dao.userDAO import UserDAO
+from app.models import ItemOwnership, db
+from app.models.chest import Chest
+from app.models.item import Item
+from app.services.auth_token_service import AuthTokenService
+from app.services.pet_service import PetService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def setup(app):
+    user = UserService.create_guest_user()
+    badge = Item(name="Badge", default_source="chest", rarity="common", max_quantity=2)
+    chest_item = Item(name="Loot chest", default_source="chest")
+    db.session.add_all([badge, chest_item])
+    db.session.flush()
+    # Every open rolls an item until the badge is capped, then falls back to currency.
+    db.session.add(Chest(item_id=chest_item.id, tier="common", item_drop_rate=1.0, xp_min=10, xp_max=10, coin_min=5, coin_max=5))
+    pet = PetService.get_pet_by_user(user.id)
+    ItemOwnershipDAO.create_item_ownership(user.id, chest_item.id, pet.id, 10)
+    token_value = AuthTokenService.issue_token(user.id)
+    db.session.commit()
+    return user.id, chest_item.id, badge.id, {"Authorization": f"Bearer {token_value}"}
+
+
+def test_bulk_open_aggregates_rewards(app, setup):
+    user_id, chest_id, badge_id, headers = setup
+    coins_before = UserDAO.get_by_id(user_id).coins or 0
+    xp_before = PetService.get_pet_by_user(user_id).xp or 0
+
+    response = app.test_client().post(f"/chests/open/{chest_id}/bulk", json={"count": 6}, headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    rewards = data["rewards"]
+    assert data["opened"] == 6 and len(rewards) == 6
+    assert data["remaining_quantity"] == 4
+    assert [r["type"] for r in rewards[:2]] == ["item", "item"]
+    assert all(r["type"] in ("xp", "coins") for r in rewards[2:])
+    assert data["totals"]["items"] == [{"item_id": badge_id, "quantity": 2}]
+    assert data["totals"]["xp"] == 10 * sum(r["type"] == "xp" for r in rewards)
+    assert data["totals"]["coins"] == 5 * sum(r["type"] == "coins" for r in rewards)
+
+    db.session.expire_all()
+    assert UserDAO.get_by_id(user_id).coins == coins_before + data["totals"]["coins"]
+    assert PetService.get_pet_by_user(user_id).xp == xp_before + data["totals"]["xp"]
+    assert ItemOwnershipDAO.get_item_from_inventory(user_id, badge_id).quantity == 2
+
+
+def test_bulk_open_rejects_more_than_owned(app, setup):
+    user_id, chest_id, _, headers = setup
+    response = app.test_client().post(f"/chests/open/{chest_id}/bulk", json={"count": 11}, headers=headers)
+    assert response.status_code == 400
+    db.session.expire_all()
+    assert ItemOwnershipDAO.get_item_from_inventory(user_id, chest_id).quantity == 10
+
+
+def test_bulk_open_upserts_stacks_and_keeps_a_concurrent_grant(app, setup):
+    user_id, chest_id, badge_id, headers = setup
+    pet = PetService.get_pet_by_user(user_id)
+    ItemOwnershipDAO.create_item_ownership(user_id, badge_id, pet.id, 1)
+    db.session.commit()
+    owned_quantities = ItemOwnershipDAO.owned_quantities
+
+    def _grant_lands_mid_open(*args):
+        # Another request grants three chests after this one consumed the whole stack.
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(ItemOwnership)
+                .where(ItemOwnership.user_id == user_id, ItemOwnership.item_id == chest_id)
+                .values(quantity=ItemOwnership.quantity + 3)
+            )
+        return owned_quantities(*args)
+
+    with patch.object(ItemOwnershipDAO, "owned_quantities", side_effect=_grant_lands_mid_open):
+        response = app.test_client().post(f"/chests/open/{chest_id}/bulk", json={"count": 10}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["data"]["totals"]["items"] == [{"item_id": badge_id, "quantity": 1}]
+
+    db.session.expire_all()
+    assert ItemOwnership.query.filter_by(user_id=user_id, item_id=badge_id).count() == 1
+    assert ItemOwnershipDAO.get_item_from_inventory(user_id, badge_id).quantity == 2
+    assert ItemOwnershipDAO.get_item_from_inventory(user_id, chest_id).quantity == 3
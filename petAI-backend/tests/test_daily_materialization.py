@@ -0,0 +1,177 @@
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.config import Config
+from app.dao.activity_typeDAO import ActivityTypeDAO
+from app.dao.daily_activityDAO import DailyActivityDAO
+from app.models import db
+from app.models.user import User
+from app.services.activity_service import ActivityService
+from app.services.daily_activity_service import DailyActivityService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@contextmanager
+def _count_selects():
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+
+
+def test_daily_tasks_materialize_once_until_plans_change(app):
+    user = UserService.create_guest_user()
+    db.session.commit()
+    UserService.save_user_interests(user.id, [{"name": "Running", "level": "sometimes"}])
+    db.session.commit()
+
+    first = DailyActivityService.list_today(user.id)
+    db.session.commit()
+    today = DailyActivityService._today()
+    assert first
+    assert db.session.get(User, user.id).daily_materialized_through >= today
+
+    user = db.session.get(User, user.id)
+    with _count_selects() as statements:
+        again = DailyActivityService.list_today(user.id)
+    assert [row.id for row in again] == [row.id for row in first]
+    assert len(statements) == 1
+
+    # A new activity type re-opens generation for the user.
+    area_id = first[0].interest_id
+    ActivityTypeDAO.get_or_create(user.id, area_id, "Sprints")
+    db.session.commit()
+    assert db.session.get(User, user.id).daily_materialized_through is None
+    titles = {row.title for row in DailyActivityService.list_today(user.id)}
+    assert "Sprints" in titles
+
+    # Editing a plan clears the marker mid-request, and the forced week rebuild sets it again.
+    activity_type = next(t for t in ActivityTypeDAO.list_for_interest(user.id, area_id) if t.name == "Sprints")
+    ActivityService.update_activity_type(
+        user_id=user.id, activity_type_id=activity_type.id, activity_name="Intervals", interest_id=area_id
+    )
+    db.session.commit()
+    titles = {row.title for row in DailyActivityService.list_today(user.id)}
+    assert "Intervals" in titles
+
+
+def test_week_generation_diffs_and_bulk_inserts(app):
+    user = UserService.create_guest_user()
+    db.session.commit()
+    UserService.save_user_interests(
+        user.id,
+        [
+            {
+                "name": "Running",
+                "level": "sometimes",
+                "plan": {"weekly_goal_value": 4, "weekly_goal_unit": "km", "days": ["mon", "wed"]},
+            },
+            {"name": "Study", "level": "always"},
+        ],
+    )
+    db.session.commit()
+
+    start = DailyActivityService._today()
+    inserted = DailyActivityService.ensure_range(user.id, start, days=14)
+    db.session.commit()
+    # Rows already created by the interest save are diffed out rather than duplicated.
+    assert DailyActivityService.ensure_range(user.id, start, days=14) == 0
+
+    rows = DailyActivityDAO.list_for_user_between(user.id, start, start + timedelta(days=13))
+    keys = [(row.todo_date, row.activity_type_id, row.title) for row in rows]
+    assert len(keys) == len(set(keys))
+    assert inserted <= len(rows)
+    running = [row for row in rows if row.title.startswith("Run for 2 km")]
+    assert sorted({row.todo_date.weekday() for row in running}) == [0, 2]
+    assert len({row.todo_date for row in rows if row.title == "Learn something new"}) == 14
+    assert db.session.get(User, user.id).daily_materialized_through == start + timedelta(days=13)
+
+    with _count_selects() as statements:
+        DailyActivityService.ensure_range(user.id, start, days=14)
+    # Areas, activity types, goals and the existing range: no per-day or per-type reads.
+    assert len(statements) <= 5
+
+
+def test_bulk_insert_skips_rows_that_already_exist(app):
+    user = UserService.create_guest_user()
+    db.session.commit()
+    UserService.save_user_interests(user.id, [{"name": "Study", "level": "always"}])
+    db.session.commit()
+
+    day = DailyActivityService._today() + timedelta(days=30)
+    template = DailyActivityDAO.list_for_user_on_date(user.id, DailyActivityService._today())[0]
+    row = {
+        "user_id": user.id,
+        "interest_id": template.interest_id,
+        "activity_type_id": template.activity_type_id,
+        "goal_id": None,
+        "title": "Read",
+        "scheduled_for": day,
+    }
+    other_day = {**row, "scheduled_for": day + timedelta(days=1)}
+    assert DailyActivityDAO.bulk_insert([row, row]) == 1
+    db.session.commit()
+    # A second generator racing on the same day neither raises nor duplicates.
+    assert DailyActivityDAO.bulk_insert([row, other_day]) == 1
+    db.session.commit()
+    assert len(DailyActivityDAO.list_for_user_between(user.id, day, day + timedelta(days=1))) == 2
+
+
+def test_goals_are_only_ensured_for_days_that_emit_a_row(app):
+    from app.models import DailyActivity, Goal
+
+    user = UserService.create_guest_user()
+    db.session.commit()
+    UserService.save_user_interests(
+        user.id,
+        [
+            {
+                "name": "Running",
+                "level": "sometimes",
+                "plan": {"weekly_goal_value": 4, "weekly_goal_unit": "km", "days": ["mon"]},
+            }
+        ],
+    )
+    DailyActivity.query.filter_by(user_id=user.id).delete()
+    Goal.query.filter_by(user_id=user.id).delete()
+    db.session.commit()
+
+    today = DailyActivityService._today()
+    monday = today + timedelta(days=(7 - today.weekday()) % 7)
+    tuesday = monday + timedelta(days=1)
+    DailyActivityService.ensure_for_date(user.id, tuesday, force=True)
+    DailyActivityService.calendar(user.id, monday, monday + timedelta(days=6))
+    db.session.commit()
+    assert Goal.query.filter_by(user_id=user.id).count() == 0
+
+    rows = DailyActivityService.ensure_for_date(user.id, monday, force=True)
+    (row,) = [row for row in rows if row.title.startswith("Run for 4 km")]
+    db.session.commit()
+    (goal,) = Goal.query.filter_by(user_id=user.id).all()
+    assert row.goal_id == goal.id
@@ -0,0 +1,109 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.dao.daily_activityDAO import DailyActivityDAO
+from app.models import DailyActivity, JobRun, db
+from app.models.user import User
+from app.services.daily_pregeneration_service import DailyPregenerationService
+from app.services.job_run_service import JobRunService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _user_with_plan(offset: int, *, last_active: datetime) -> User:
+    user = UserService.create_guest_user()
+    db.session.commit()
+    UserService.save_user_interests(user.id, [{"name": "Study", "level": "always"}])
+    user = db.session.get(User, user.id)
+    user.utc_offset_minutes = offset
+    user.last_activity_at = last_active
+    user.daily_materialized_through = None
+    db.session.commit()
+    return user
+
+
+def test_offsets_are_bucketed_by_distance_to_local_midnight():
+    run_at = datetime(2026, 3, 10, 22, 30, tzinfo=timezone.utc)
+    targets = DailyPregenerationService.targets_for(run_at, [-300, 0, 60, 90], lead_minutes=120)
+    # UTC is 90 minutes from midnight, +60 is 30 minutes away, +90 has already rolled over, -300 is hours away.
+    assert targets == {"0": "2026-03-11", "60": "2026-03-11"}
+    everyone = DailyPregenerationService.targets_for(run_at, [-300, 90], lead_minutes=120, all_offsets=True)
+    assert everyone == {"-300": "2026-03-11", "90": "2026-03-12"}
+
+
+def test_job_materializes_next_local_day_in_resumable_chunks(app):
+    run_at = datetime(2026, 3, 10, 22, 30, tzinfo=timezone.utc)
+    recent = run_at - timedelta(days=1)
+    due = [_user_with_plan(0, last_active=recent) for _ in range(3)]
+    later = _user_with_plan(-300, last_active=recent)
+    dormant = _user_with_plan(0, last_active=run_at - timedelta(days=90))
+    tomorrow = date(2026, 3, 11)
+
+    job = DailyPregenerationService.create_job({"run_at": run_at.isoformat(), "chunk_size": 2})
+    assert job.params["targets"] == {"0": "2026-03-11"}
+    assert job.total == 3
+
+    job = JobRunService.run(job.id, max_chunks=1)
+    assert job.status == JobRun.STATUS_RUNNING
+    assert job.processed == 2
+    assert job.cursor == due[1].id
+
+    assert DailyPregenerationService.latest_unfinished().id == job.id
+    job = JobRunService.run(job.id)
+    assert job.status == JobRun.STATUS_COMPLETED
+    assert job.processed == 3
+
+    created = 0
+    for user in due:
+        rows = DailyActivityDAO.list_for_user_between(user.id, tomorrow, tomorrow)
+        assert "Learn something new" in {row.title for row in rows}
+        # The run's UTC day is generated too, since the marker moves past it.
+        created += len(DailyActivityDAO.list_for_user_between(user.id, run_at.date(), tomorrow))
+        assert db.session.get(User, user.id).daily_materialized_through == tomorrow
+    for user in (later, dormant):
+        assert DailyActivityDAO.list_for_user_between(user.id, tomorrow, tomorrow) == []
+    assert job.affected == created
+
+    # Already-covered users drop out of the next pass.
+    rerun = DailyPregenerationService.create_job({"run_at": run_at.isoformat()})
+    assert rerun.total == 0
+
+
+def test_job_ahead_of_utc_still_generates_the_utc_day_it_marks(app):
+    from app.services.daily_activity_service import DailyActivityService
+
+    # UTC+10 reaches local midnight at 14:00 UTC, so a 13:00 run targets the next UTC date.
+    today = datetime.now(timezone.utc).date()
+    run_at = datetime(today.year, today.month, today.day, 13, 0, tzinfo=timezone.utc)
+    user = _user_with_plan(600, last_active=run_at - timedelta(days=1))
+    # Nothing generated yet: the job runs before the user's first GET of the day.
+    DailyActivity.query.filter_by(user_id=user.id).delete()
+    db.session.commit()
+    tomorrow = today + timedelta(days=1)
+
+    job = DailyPregenerationService.create_job({"run_at": run_at.isoformat()})
+    assert job.params["targets"] == {"600": tomorrow.isoformat()}
+    JobRunService.run(job.id)
+    assert db.session.get(User, user.id).daily_materialized_through == tomorrow
+
+    # The first GET of the day serves the UTC date the marker already covers.
+    todays = DailyActivityService.list_today(user.id)
+    assert todays
+    assert len(todays) == len(DailyActivityDAO.list_for_user_between(user.id, tomorrow, tomorrow))
@@ -0,0 +1,63 @@
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.models import db
+from app.models.chest import Chest
+from app.models.item import Item
+from app.services.economy_simulator import EconomySimulator, SimulationInputs
+
+np = pytest.importorskip("numpy")
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def inputs(app):
+    hat = Item(name="Hat", default_source="chest", rarity="common", max_quantity=1)
+    cape = Item(name="Cape", default_source="chest", rarity="epic")
+    common_chest = Item(name="Common chest")
+    epic_chest = Item(name="Epic chest")
+    db.session.add_all([hat, cape, common_chest, epic_chest])
+    db.session.flush()
+    db.session.add_all(
+        [
+            Chest(item_id=common_chest.id, tier="common", item_drop_rate=0.5, xp_min=10, xp_max=10, coin_min=20, coin_max=20),
+            Chest(item_id=epic_chest.id, tier="epic", item_drop_rate=0.0, xp_min=100, xp_max=100, coin_min=200, coin_max=200),
+        ]
+    )
+    db.session.commit()
+    return SimulationInputs.from_app()
+
+
+def test_chest_expected_values_follow_config(inputs):
+    report = EconomySimulator(inputs, seed=1).simulate_chest_opens(200_000)
+    common, epic = report["by_tier"]["common"], report["by_tier"]["epic"]
+    assert abs(common["opens"] / 200_000 - 0.7 / 0.77) < 0.01
+    assert abs(common["item_rate"] - 0.5) < 0.01
+    assert abs(common["mean_xp"] - 2.5) < 0.2
+    assert epic["item_rate"] == 0.0
+    assert abs(epic["mean_coins"] - 100) < 3
+
+
+def test_trajectories_respect_max_quantity_and_levels(inputs):
+    report = EconomySimulator(inputs, seed=2).simulate_users(2_000, 60, activities_per_day=3, skip_day_probability=0.0)
+    hat = next(row for row in report["item_saturation"] if row["max_quantity"] == 1)
+    assert hat["mean_owned"] <= 1.0
+    assert hat["maxed_share"] > 0.9
+    assert report["xp_per_day"]["mean"] > 0
+    days_to_level = [row.get("median_days") for row in report["time_to_level"] if row["reached_share"] == 1.0]
+    assert days_to_level == sorted(days_to_level)
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.auth.token_auth import premium_required, token_required
+from app.models import AccessCode, AccessCodeRedemption, User, UserEntitlement, db
+from app.models.subscription import Subscription
+from app.services.auth_token_service import AuthTokenService
+from app.services.entitlement_service import EntitlementService
+from app.services.entitlement_sweeper import EntitlementSweeper
+from app.services.subscription_service import SubscriptionService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+    ENTITLEMENT_CACHE_TTL_SECONDS = 300
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _expired_trial_user(app) -> tuple[int, str]:
+    with app.app_context():
+        user = UserService.create_guest_user()
+        user.created_at = datetime.now(timezone.utc) - timedelta(days=5)
+        db.session.commit()
+        token_value = AuthTokenService.issue_token(user.id)
+        db.session.commit()
+        return user.id, token_value
+
+
+def _register_premium_route(app):
+    @app.route("/premium")
+    @token_required  # type: ignore[misc]
+    @premium_required  # type: ignore[misc]
+    def premium():  # pragma: no cover - minimal route for testing
+        return "ok"
+
+
+def test_entitlement_cached_until_invalidated(app):
+    user_id, token_value = _expired_trial_user(app)
+    _register_premium_route(app)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token_value}"}
+
+    assert client.get("/premium", headers=headers).status_code == 403
+
+    with app.app_context():
+        # Written behind the service's back: the cached entitlement stays in effect.
+        now = datetime.now(timezone.utc)
+        db.session.add(
+            Subscription(
+                user_id=user_id,
+                provider="app_store",
+                product_id="premium",
+                status="active",
+                started_at=now,
+                expires_at=now + timedelta(days=30),
+            )
+        )
+        db.session.commit()
+
+    assert client.get("/premium", headers=headers).status_code == 403
+
+    with app.app_context():
+        EntitlementService.invalidate(user_id)
+
+    assert client.get("/premium", headers=headers).status_code == 200
+
+
+def test_mock_subscription_invalidates_cache(app):
+    user_id, token_value = _expired_trial_user(app)
+    _register_premium_route(app)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token_value}"}
+
+    assert client.get("/premium", headers=headers).status_code == 403
+
+    with app.app_context():
+        SubscriptionService.set_mock_subscription(user_id, active=True)
+        db.session.commit()
+
+    assert client.get("/premium", headers=headers).status_code == 200
+
+    with app.app_context():
+        entitlement = EntitlementService.subscription_for_user(user_id)
+        assert entitlement["active"] is True
+        assert entitlement["provider"] == "mock"
+
+
+def test_refresh_materializes_entitlement_row(app):
+    user_id, _ = _expired_trial_user(app)
+    with app.app_context():
+        assert db.session.get(UserEntitlement, user_id) is None
+        assert EntitlementService.rebuild() == 1
+        row = db.session.get(UserEntitlement, user_id)
+        assert row is not None and row.active is False and row.status == "none"
+
+        SubscriptionService.set_mock_subscription(user_id, active=True)
+        db.session.commit()
+        row = db.session.get(UserEntitlement, user_id)
+        assert row.active is True and row.provider == "mock"
+        assert SubscriptionService.subscription_payload(user_id) == SubscriptionService.compute_payload(user_id)
+
+        # Once the stored expiry passes, the row is bypassed and then repaired by the stale rebuild.
+        sub = Subscription.query.filter_by(user_id=user_id).one()
+        sub.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        row.expires_at = sub.expires_at
+        db.session.commit()
+        assert SubscriptionService.subscription_payload(user_id)["active"] is False
+        assert EntitlementService.rebuild(stale_only=True) == 1
+        row = db.session.get(UserEntitlement, user_id)
+        assert row.active is False and row.status == "active"
+        assert EntitlementService.rebuild(stale_only=True) == 0
+
+
+def test_sweeper_judges_only_the_latest_subscription_and_redemption(app):
+    now = datetime.now(timezone.utc)
+    sub_user_id, _ = _expired_trial_user(app)
+    code_user_id, _ = _expired_trial_user(app)
+    # An open-ended active row sorts after a dated one, so the canceled row is the latest.
+    db.session.add_all(
+        [
+            Subscription(user_id=sub_user_id, product_id="old", status="active", expires_at=None),
+            Subscription(
+                user_id=sub_user_id, product_id="new", status="canceled", expires_at=now - timedelta(days=1)
+            ),
+        ]
+    )
+    full = AccessCode(code="FULL", percent_off=100)
+    half = AccessCode(code="HALF", percent_off=50)
+    db.session.add_all([full, half])
+    db.session.flush()
+    db.session.add_all(
+        [
+            AccessCodeRedemption(access_code_id=full.id, user_id=code_user_id, redeemed_at=now - timedelta(days=2)),
+            AccessCodeRedemption(access_code_id=half.id, user_id=code_user_id, redeemed_at=now - timedelta(days=1)),
+        ]
+    )
+    db.session.commit()
+
+    EntitlementSweeper.sweep()
+    db.session.expire_all()
+    for user_id in (sub_user_id, code_user_id):
+        assert SubscriptionService.compute_payload(user_id)["active"] is False
+        assert db.session.get(User, user_id).is_active is False
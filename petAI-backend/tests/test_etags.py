@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.models import db
+from app.services.auth_token_service import AuthTokenService
+from app.services.chest_service import ChestService
+from app.services.friend_service import FriendService
+from app.services.state_version_service import StateVersionService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _session(app, username: str | None = None):
+    with app.app_context():
+        user = UserService.create_guest_user()
+        if username:
+            user.username = username
+        db.session.commit()
+        UserService.save_user_interests(user.id, [{"name": "Running", "level": "sometimes"}])
+        token_value = AuthTokenService.issue_token(user.id)
+        db.session.commit()
+        return user.id, {"Authorization": f"Bearer {token_value}"}
+
+
+@pytest.mark.parametrize(
+    "path", ["/hub/progression", "/hub/shop", "/hub/friends", "/daily/activities", "/style", "/style/equipped"]
+)
+def test_reads_answer_matching_if_none_match_with_304(app, path):
+    _, headers = _session(app)
+    client = app.test_client()
+
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers.get("ETag")
+    assert etag and etag.startswith('W/"')
+    assert first.headers.get("Cache-Control") == "private, no-cache"
+
+    second = client.get(path, headers={**headers, "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.get_data() == b""
+    assert second.headers.get("ETag") == etag
+
+
+def test_completion_changes_the_tag(app):
+    user_id, headers = _session(app)
+    client = app.test_client()
+    etag = client.get("/hub/progression", headers=headers).headers["ETag"]
+
+    with patch.object(ChestService, "should_grant_bonus_chest", return_value=False):
+        assert client.post("/activities/complete", json={"area": "Running"}, headers=headers).status_code == 201
+
+    refreshed = client.get("/hub/progression", headers={**headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
+
+
+def test_failed_write_does_not_advance_the_version(app):
+    user_id, headers = _session(app)
+    client = app.test_client()
+    with app.app_context():
+        before = StateVersionService.current(user_id)
+
+    response = client.post("/hub/shop/purchase", json={"item_id": "no-such-item"}, headers=headers)
+    assert response.status_code == 404
+
+    with app.app_context():
+        assert StateVersionService.current(user_id) == before
+
+
+def test_friend_activity_changes_the_friends_tag(app):
+    user_id, headers = _session(app, "alice")
+    friend_id, _ = _session(app, "bob")
+    client = app.test_client()
+
+    with app.app_context():
+        request = FriendService.send_request(user_id, "bob")
+        db.session.flush()
+        FriendService.accept_request(friend_id, request.id)
+        db.session.commit()
+
+    etag = client.get("/hub/friends", headers=headers).headers["ETag"]
+    assert client.get("/hub/friends", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    with app.app_context():
+        StateVersionService.touch(friend_id)
+        db.session.commit()
+
+    refreshed = client.get("/hub/friends", headers={**headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
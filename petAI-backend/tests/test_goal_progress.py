@@ -1,4 +1,7 @@
+from unittest.mock import patch
+
 import pytest
+from sqlalchemy import event
 
 from app import create_app
 from app.config import Config
@@ -7,7 +10,9 @@ from app.dao.areaDAO import AreaDAO
 from app.dao.goalDAO import GoalDAO
 from app.models import db
 from app.services.activity_service import ActivityService
+from app.services.chest_service import ChestService
 from app.services.daily_activity_service import DailyActivityService
+from app.services.gameplay_state import GameplayStateService
 from app.services.user_service import UserService
 
 
@@ -171,3 +176,36 @@ def test_daily_completion_falls_back_to_active_goal(ctx):
     goal = GoalDAO.latest_active(user.id, activity_type.id)
     assert goal is not None
     assert goal.progress_value == pytest.approx(5.0)
+
+
+def test_completion_reuses_loaded_gameplay_state(app):
+    with app.app_context():
+        user = UserService.create_guest_user()
+        db.session.commit()
+        user_id = user.id
+        _seed_running_goal(user_id)
+
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    with app.test_request_context("/activities/complete", method="POST"):
+        state = GameplayStateService.load(user_id)
+        assert GameplayStateService.load(user_id) is state
+        event.listen(db.engine, "before_cursor_execute", _count)
+        try:
+            with patch.object(ChestService, "should_grant_bonus_chest", return_value=False):
+                ActivityService.complete_activity(user_id, "running", effort_value=5)
+                ActivityService.complete_activity(user_id, "Running", effort_value=5)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _count)
+        db.session.commit()
+
+    # Area, activity type, goal, pet and user all come from the preloaded state.
+    assert statements == []
+    with app.app_context():
+        area = AreaDAO.get_by_user_and_name(user_id, "Running")
+        activity_type = ActivityTypeDAO.primary_for_area(user_id, area.id)
+        assert GoalDAO.latest_active(user_id, activity_type.id).progress_value == pytest.approx(10.0)
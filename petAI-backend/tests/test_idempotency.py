@@ -0,0 +1,123 @@
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.dao.userDAO import UserDAO
+from app.models import IdempotencyRecord, db
+from app.services.auth_token_service import AuthTokenService
+from app.services.chest_service import ChestService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def session(app):
+    with app.app_context():
+        user = UserService.create_guest_user()
+        db.session.commit()
+        UserService.save_user_interests(user.id, [{"name": "Running", "level": "sometimes"}])
+        token_value = AuthTokenService.issue_token(user.id)
+        db.session.commit()
+        return user.id, {"Authorization": f"Bearer {token_value}"}
+
+
+def _activity_count(app, user_id: int) -> int:
+    with app.app_context():
+        db.session.expire_all()
+        return UserDAO.get_by_id(user_id).activity_count
+
+
+def test_retry_with_same_key_replays_response(app, session):
+    user_id, headers = session
+    client = app.test_client()
+    keyed = {**headers, "Idempotency-Key": "retry-1"}
+
+    with patch.object(ChestService, "should_grant_bonus_chest", return_value=False):
+        first = client.post("/activities/complete", json={"area": "Running"}, headers=keyed)
+        second = client.post("/activities/complete", json={"area": "Running"}, headers=keyed)
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.headers.get("Idempotent-Replayed") == "true"
+    assert second.get_json() == first.get_json()
+    assert _activity_count(app, user_id) == 1
+
+    mismatch = client.post("/activities/complete", json={"area": "Study"}, headers=keyed)
+    assert mismatch.status_code == 422
+    assert _activity_count(app, user_id) == 1
+
+
+def test_requests_without_key_are_not_deduplicated(app, session):
+    user_id, headers = session
+    client = app.test_client()
+    with patch.object(ChestService, "should_grant_bonus_chest", return_value=False):
+        client.post("/activities/complete", json={"area": "Running"}, headers=headers)
+        client.post("/activities/complete", json={"area": "Running"}, headers=headers)
+    assert _activity_count(app, user_id) == 2
+    with app.app_context():
+        assert IdempotencyRecord.query.count() == 0
+
+
+def test_award_and_stored_response_commit_together(app, session):
+    from app.services.idempotency_service import IdempotencyService
+
+    user_id, headers = session
+    client = app.test_client()
+    keyed = {**headers, "Idempotency-Key": "crash-1"}
+
+    # The process dies while storing the response: the award must not outlive it.
+    with patch.object(ChestService, "should_grant_bonus_chest", return_value=False):
+        with patch.object(IdempotencyService, "complete", side_effect=RuntimeError("worker died")):
+            with pytest.raises(RuntimeError):
+                client.post("/activities/complete", json={"area": "Running"}, headers=keyed)
+        # The dead worker's open transaction goes with it.
+        db.session.rollback()
+        assert _activity_count(app, user_id) == 0
+
+        # The abandoned claim has no committed side effects, so the retry runs it exactly once.
+        app.config["IDEMPOTENCY_LOCK_SECONDS"] = 0
+        retry = client.post("/activities/complete", json={"area": "Running"}, headers=keyed)
+        replay = client.post("/activities/complete", json={"area": "Running"}, headers=keyed)
+    assert retry.status_code == 201
+    assert replay.headers.get("Idempotent-Replayed") == "true"
+    assert _activity_count(app, user_id) == 1
+
+
+def test_request_that_lost_its_claim_is_not_applied(app, session):
+    from sqlalchemy import delete
+
+    user_id, headers = session
+    client = app.test_client()
+    keyed = {**headers, "Idempotency-Key": "slow-1"}
+
+    def _retry_takes_over(*args, **kwargs):
+        # While this request is still running, a retry deletes its stale claim.
+        db.session.execute(delete(IdempotencyRecord).where(IdempotencyRecord.key == "slow-1"))
+        return False
+
+    with patch.object(ChestService, "should_grant_bonus_chest", side_effect=_retry_takes_over):
+        slow = client.post("/activities/complete", json={"area": "Running"}, headers=keyed)
+    assert slow.status_code == 409
+    assert _activity_count(app, user_id) == 0
+
+    app.config["IDEMPOTENCY_LOCK_SECONDS"] = 0
+    with patch.object(ChestService, "should_grant_bonus_chest", return_value=False):
+        retry = client.post("/activities/complete", json={"area": "Running"}, headers=keyed)
+    assert retry.status_code == 201
+    assert _activity_count(app, user_id) == 1
@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.models import db
+from app.services.level_curve import LevelCurve, LevelCurveService
+from app.services.pet_service import PetService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+    PET_LEVEL_CURVE_CHECK_SECONDS = 0
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _write_curve(path, levels: int, step: int) -> None:
+    path.write_text(
+        json.dumps(
+            {"levels": [{"level": n, "stage": f"stage-{(n - 1) // 10}", "xp_required": (n - 1) * step} for n in range(1, levels + 1)]}
+        )
+    )
+
+
+def test_curve_lookup_matches_thresholds():
+    curve = LevelCurve(
+        {1: {"stage": "egg", "xp_required": 0}, 2: {"stage": "sprout", "xp_required": 100}, 3: {"stage": "bud", "xp_required": 250}}
+    )
+    assert curve.evolution_for_xp(0) == (1, "egg", 100)
+    assert curve.evolution_for_xp(99) == (1, "egg", 100)
+    assert curve.evolution_for_xp(100) == (2, "sprout", 250)
+    assert curve.evolution_for_xp(10_000) == (3, "bud", 250)
+
+    with pytest.raises(ValueError):
+        LevelCurve({1: {"stage": "egg", "xp_required": 0}, 3: {"stage": "bud", "xp_required": 10}})
+    with pytest.raises(ValueError):
+        LevelCurve({1: {"stage": "egg", "xp_required": 50}, 2: {"stage": "bud", "xp_required": 10}})
+
+
+def test_file_curve_hot_reloads_and_reports_level_jumps(app, tmp_path):
+    path = tmp_path / "curve.json"
+    _write_curve(path, levels=300, step=10)
+    app.config["PET_LEVEL_CURVE_PATH"] = str(path)
+
+    user = UserService.create_guest_user()
+    db.session.commit()
+    pet = PetService.get_pet_by_user(user.id)
+
+    result = PetService.add_xp(pet, 95)
+    assert result["evolved"] is True
+    assert result["levels_gained"] == 9
+    assert (pet.level, pet.stage, pet.next_evolution_xp) == (10, "stage-0", 100)
+    assert LevelCurveService.current().max_level == 300
+
+    _write_curve(path, levels=50, step=1)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+    result = PetService.add_xp(pet, 1)
+    assert LevelCurveService.current().max_level == 50
+    assert result["levels_gained"] == 40
+    assert pet.level == 50
@@ -0,0 +1,97 @@
+import random
+from collections import Counter
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.dao.itemsDAO import ItemOwnershipDAO
+from app.models import db
+from app.models.chest import Chest
+from app.models.item import Item
+from app.services.chest_service import ChestService
+from app.services.loot_table import AliasTable, LootTableService
+from app.services.pet_service import PetService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_alias_table_matches_weights():
+    weights = [0.7, 0.23, 0.07]
+    table = AliasTable(weights)
+    rng = random.Random(7)
+    draws = 60_000
+    counts = Counter(table.sample(rng) for _ in range(draws))
+    for index, weight in enumerate(weights):
+        assert abs(counts[index] / draws - weight) < 0.01
+
+    with pytest.raises(ValueError):
+        AliasTable([])
+
+
+def test_award_item_respects_max_quantity_and_invalidates_on_item_change(app):
+    user = UserService.create_guest_user()
+    hat = Item(name="Hat", default_source="chest", rarity="common", max_quantity=1)
+    cape = Item(name="Cape", default_source="chest", rarity="legendary")
+    chest_item = Item(name="Common chest", default_source="chest")
+    db.session.add_all([hat, cape, chest_item])
+    db.session.flush()
+    db.session.add(Chest(item_id=chest_item.id, tier="common"))
+    pet = PetService.get_pet_by_user(user.id)
+    ItemOwnershipDAO.create_item_ownership(user.id, hat.id, pet.id, 1)
+    db.session.commit()
+
+    tables = LootTableService.current()
+    assert [item.id for item in tables.base_items] == [hat.id, cape.id]
+    assert tables.pick_chest_id("common") == chest_item.id
+    assert LootTableService.current() is tables
+
+    # The hat is maxed out, so every draw must land on the cape.
+    for _ in range(20):
+        reward = ChestService._award_item(user_id=user.id, tier="common")
+        assert reward["id"] == cape.id
+    assert ChestService._award_item(user_id=user.id, tier="common", max_item_rarity="rare") is None
+
+    hat.max_quantity = 5
+    db.session.commit()
+    refreshed = LootTableService.current()
+    assert refreshed is not tables
+    pool = refreshed.item_pool("common", "rare")
+    assert [item.id for item in pool.items] == [hat.id]
+    assert ChestService._award_item(user_id=user.id, tier="common", max_item_rarity="rare")["id"] == hat.id
+
+
+def test_loot_table_version_is_shared_and_follows_the_transaction(app):
+    hat = Item(name="Hat", default_source="chest", rarity="common")
+    db.session.add(hat)
+    db.session.commit()
+    tables = LootTableService.current()
+    version = LootTableService.stored_version()
+
+    # A rolled-back write never reaches the shared version, so the cache stays valid.
+    hat.rarity = "legendary"
+    db.session.flush()
+    db.session.rollback()
+    assert LootTableService.stored_version() == version
+    assert LootTableService.current() is tables
+
+    # A committed write is seen through the DB counter, not process state.
+    hat.rarity = "rare"
+    db.session.commit()
+    assert LootTableService.stored_version() > version
+    assert LootTableService.current().version == LootTableService.stored_version()
+    assert LootTableService.current() is not tables
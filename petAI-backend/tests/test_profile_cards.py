@@ -0,0 +1,146 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.config import Config
+from app.models import Item, PetStyle, ProfileCard, User, db
+from app.services.activity_service import ActivityService
+from app.services.friend_service import FriendService
+from app.services.pet_service import PetService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@contextmanager
+def _count_queries():
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+
+
+def _user_with_friends(username: str, count: int, hat: Item) -> tuple[int, list[int]]:
+    user = UserService.create_guest_user()
+    user.username = username
+    db.session.commit()
+    friend_ids = []
+    for index in range(count):
+        friend = UserService.create_guest_user()
+        friend.username = f"{username}-friend-{index}"
+        db.session.flush()
+        pet = PetService.create_pet(friend.id)
+        PetStyle.query.filter_by(pet_id=pet.id).first().hat_id = hat.id
+        request = FriendService.send_request(user.id, friend.username)
+        db.session.flush()
+        FriendService.accept_request(friend.id, request.id)
+        friend_ids.append(friend.id)
+    db.session.commit()
+    return user.id, friend_ids
+
+
+def test_friend_lists_read_cards_in_constant_queries(app):
+    hat = Item(name="Party hat", default_source="store", trigger="hat_party", trigger_value=2)
+    db.session.add(hat)
+    db.session.commit()
+    small_id, _ = _user_with_friends("small", 1, hat)
+    large_id, large_friends = _user_with_friends("large", 6, hat)
+
+    # The pet, style and username writes already wrote a card for every user.
+    assert ProfileCard.query.count() == 9
+
+    db.session.expire_all()
+    with _count_queries() as small_queries:
+        FriendService.friends_payload(small_id)
+    db.session.expire_all()
+    with _count_queries() as large_queries:
+        payload = FriendService.friends_payload(large_id)
+    assert len(large_queries) == len(small_queries) == 2
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in large_queries)
+
+    assert [friend["id"] for friend in payload["friends"]] == large_friends
+    first = payload["friends"][0]
+    assert first["username"] == "large-friend-0"
+    assert first["pet_style_triggers"] == [{"trigger": "hat_party", "trigger_value": 2}]
+    assert first["pet_cosmetics"] == {"equipped": {}}
+
+
+def test_cards_follow_pet_style_and_name_writes(app):
+    hat = Item(name="Party hat", default_source="store", trigger="hat_party", trigger_value=2)
+    db.session.add(hat)
+    db.session.commit()
+    user_id, (friend_id,) = _user_with_friends("owner", 1, hat)
+
+    # Unrelated writes, such as coins, leave the card alone.
+    before = db.session.get(ProfileCard, friend_id).updated_at
+    user = db.session.get(User, friend_id)
+    user.coins = (user.coins or 0) + 10
+    db.session.commit()
+    assert db.session.get(ProfileCard, friend_id).updated_at == before
+
+    pet = PetService.get_pet_by_user(friend_id)
+    pet.level = 4
+    db.session.flush()
+    db.session.rollback()
+    db.session.expire_all()
+    assert db.session.get(ProfileCard, friend_id).pet_level != 4
+
+    pet = PetService.get_pet_by_user(friend_id)
+    pet.level = 4
+    PetStyle.query.filter_by(pet_id=pet.id).first().hat_id = None
+    db.session.get(User, friend_id).username = "renamed"
+    db.session.commit()
+    db.session.expire_all()
+    card = db.session.get(ProfileCard, friend_id)
+    assert (card.pet_level, card.display_name, card.style_triggers) == (4, "renamed", [])
+
+    matches = FriendService.search_users(user_id, "renamed")
+    assert [match["pet_level"] for match in matches] == [4]
+
+
+def test_completion_xp_reaches_the_friend_card(app):
+    hat = Item(name="Party hat", default_source="store")
+    db.session.add(hat)
+    db.session.commit()
+    user_id, (friend_id,) = _user_with_friends("owner", 1, hat)
+    UserService.save_user_interests(friend_id, [{"name": "Running", "level": "sometimes"}])
+    db.session.commit()
+    assert db.session.get(ProfileCard, friend_id).pet_xp == 0
+
+    # XP and level are written with Core UPDATEs, which the Pet mapper events never see.
+    ActivityService.complete_activity(friend_id, "Running")
+    db.session.commit()
+    db.session.expire_all()
+    pet = PetService.get_pet_by_user(friend_id)
+    assert pet.xp > 0
+
+    (friend,) = FriendService.friends_payload(user_id)["friends"]
+    assert (friend["pet_xp"], friend["pet_level"], friend["pet_stage"]) == (pet.xp, pet.level, pet.stage)
+
+    PetService.add_xp(pet, 500)
+    db.session.commit()
+    db.session.expire_all()
+    card = db.session.get(ProfileCard, friend_id)
+    assert card.pet_level > 1
+    assert (card.pet_xp, card.pet_level, card.pet_stage) == (pet.xp, pet.level, pet.stage)
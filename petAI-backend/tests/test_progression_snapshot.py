@@ -0,0 +1,208 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.config import Config
+from app.dao.activity_typeDAO import ActivityTypeDAO
+from app.dao.areaDAO import AreaDAO
+from app.dao.user_daily_statDAO import UserDailyStatDAO
+from app.models import db
+from app.models.activity import ActivityLog
+from app.models.goal import Goal
+from app.services.daily_stats_service import DailyStatsService
+from app.services.hub_service import HubService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@contextmanager
+def _count_queries():
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+
+
+def _seed(user_id: int, now: datetime, types: int) -> None:
+    area = AreaDAO.create(user_id=user_id, name="Running")
+    db.session.flush()
+    for index in range(types):
+        activity_type = ActivityTypeDAO.get_or_create(
+            user_id, area.id, f"Run {index}", weekly_goal_value=3.0, weekly_goal_unit="km", weekly_schedule="mon,wed"
+        )
+        db.session.flush()
+        db.session.add_all(
+            [
+                # Older redeemed goal, then the open one the snapshot should pick.
+                Goal(
+                    user_id=user_id,
+                    activity_type_id=activity_type.id,
+                    title="Old",
+                    amount=3.0,
+                    unit="km",
+                    progress_value=3.0,
+                    created_at=now - timedelta(days=40),
+                    expires_at=now + timedelta(days=1),
+                    completed_at=now - timedelta(days=39),
+                    redeemed_at=now - timedelta(days=2),
+                ),
+                Goal(
+                    user_id=user_id,
+                    activity_type_id=activity_type.id,
+                    title="Current",
+                    amount=3.0,
+                    unit="km",
+                    progress_value=index,
+                    created_at=now - timedelta(days=1),
+                    expires_at=now + timedelta(days=6),
+                ),
+            ]
+        )
+    db.session.add_all(
+        [
+            ActivityLog(user_id=user_id, interest_id=area.id, xp_earned=10, timestamp=now - timedelta(minutes=1)),
+            ActivityLog(user_id=user_id, interest_id=area.id, xp_earned=5, timestamp=now - timedelta(days=2)),
+            ActivityLog(user_id=user_id, interest_id=area.id, xp_earned=7, timestamp=now - timedelta(days=20)),
+        ]
+    )
+    db.session.commit()
+
+
+def test_progression_snapshot_aggregates_in_constant_queries(app):
+    now = datetime.now(timezone.utc)
+    small = UserService.create_guest_user()
+    large = UserService.create_guest_user()
+    db.session.commit()
+    _seed(small.id, now, types=1)
+    _seed(large.id, now, types=6)
+    # Logs were inserted directly, so backfill the rollup the way an upgrade would.
+    assert DailyStatsService.rebuild(batch_size=1) == {"users": 2, "rows": 6}
+
+    HubService.progression_snapshot(small.id)
+    db.session.commit()
+    db.session.expire_all()
+    with _count_queries() as small_queries:
+        HubService.progression_snapshot(small.id)
+    db.session.expire_all()
+    with _count_queries() as large_queries:
+        snapshot = HubService.progression_snapshot(large.id)
+    assert len(large_queries) == len(small_queries)
+
+    assert snapshot["summary"]["activities"] == 2
+    assert len(snapshot["weekly_xp"]) == 7
+    assert sum(day["xp"] for day in snapshot["weekly_xp"]) == 15
+    assert snapshot["totals"]["week"] == {"xp": 15, "count": 2, "coins": 15}
+    if (now - timedelta(minutes=1)).date() == now.date():
+        assert snapshot["today"] == {"completed": 1, "xp": 10}
+    assert [goal["goal"] for goal in snapshot["weekly_goals"]] == ["Current"] * 6
+    assert [goal["progress_value"] for goal in snapshot["weekly_goals"]] == [float(i) for i in range(6)]
+    assert len(snapshot["completed_goals"]["week"]) == 6
+    same_year = (now - timedelta(days=2)).year == now.year
+    assert len(snapshot["completed_goals"]["year"]) == (6 if same_year else 0)
+
+
+def test_completions_maintain_the_daily_rollup(app):
+    from app.models.user_daily_stat import UserDailyStat
+    from app.services.activity_service import ActivityService
+
+    user = UserService.create_guest_user()
+    db.session.commit()
+    UserService.save_user_interests(user.id, [{"name": "Study", "level": "sometimes"}])
+    db.session.commit()
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    results = [
+        ActivityService.complete_activity(user.id, "Study"),
+        ActivityService.complete_activity(user.id, "Study"),
+        ActivityService.complete_activity(user.id, "Study", completed_at=yesterday),
+    ]
+    db.session.commit()
+
+    rows = {row.day: row for row in UserDailyStat.query.filter_by(user_id=user.id)}
+    today_row = rows[datetime.now(timezone.utc).date()]
+    assert today_row.count == 2
+    assert today_row.xp == results[0]["xp_awarded"] + results[1]["xp_awarded"]
+    assert today_row.coins == results[0]["coins_awarded"] + results[1]["coins_awarded"]
+    assert rows[yesterday.date()].count == 1
+
+    # A rebuild from activity_logs reproduces the incrementally maintained rows.
+    maintained = {day: (row.xp, row.count, row.coins) for day, row in rows.items()}
+    DailyStatsService.rebuild()
+    db.session.expire_all()
+    rebuilt = {row.day: (row.xp, row.count, row.coins) for row in UserDailyStat.query.filter_by(user_id=user.id)}
+    assert rebuilt == maintained
+
+
+def test_pending_rewards_matches_the_snapshot_without_building_it(app):
+    from app.dao.goalDAO import GoalDAO
+
+    now = datetime.now(timezone.utc)
+    user = UserService.create_guest_user()
+    db.session.commit()
+    _seed(user.id, now, types=3)
+    user.streak_current = 3
+    # An open goal without a plan or amount never shows up as a weekly goal.
+    area = AreaDAO.get_by_user_and_name(user.id, "Running")
+    loose = ActivityTypeDAO.get_or_create(user.id, area.id, "Loose")
+    db.session.flush()
+    db.session.add(
+        Goal(user_id=user.id, activity_type_id=loose.id, progress_value=1.0, expires_at=now + timedelta(days=3),
+             completed_at=now)
+    )
+    db.session.commit()
+
+    def _both() -> tuple[int, int]:
+        db.session.expire_all()
+        return HubService.pending_rewards(user.id), HubService.progression_snapshot(user.id)["pending_rewards"]
+
+    assert _both() == (1, 1)
+
+    current = {goal.activity_type_id: goal for goal in Goal.query.filter_by(user_id=user.id, title="Current")}
+    for goal in current.values():
+        GoalDAO.increment_progress(goal, 1.0)
+    db.session.commit()
+    # Progress 0+1, 1+1 and 2+1 against a target of 3 completes exactly one goal.
+    assert _both() == (2, 2)
+
+    finished = next(goal for goal in current.values() if goal.completed_at is not None)
+    with _count_queries() as queries:
+        result = HubService.redeem_progression_reward(user.id, reward_type="weekly_goal", goal_id=finished.id)
+    assert result["pending_rewards"] == 1
+    assert len(queries) <= 10
+    assert HubService.redeem_progression_reward(user.id, reward_type="milestone", milestone_id="streak-3")[
+        "pending_rewards"
+    ] == 0
+    db.session.commit()
+    assert _both() == (0, 0)
+
+
+def test_rebuild_buckets_days_in_utc_on_postgres(app, monkeypatch):
+    from sqlalchemy.dialects import postgresql
+
+    # The session TimeZone must not decide the day: the live path buckets by UTC.
+    monkeypatch.setattr(db.engine.dialect, "name", "postgresql")
+    day = UserDailyStatDAO.utc_day(ActivityLog.timestamp)
+    compiled = day.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    assert str(compiled) == "date(timezone('UTC', activity_logs.timestamp))"
@@ -0,0 +1,116 @@
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.dao.itemsDAO import ItemOwnershipDAO
+from app.models import JobRun, JobRunMember, db
+from app.models.chest import Chest
+from app.models.item import Item
+from app.models.user import PlanType, User
+from app.services.job_run_service import JobRunService
+from app.services.pet_service import PetService
+from app.services.segment_grant_service import SegmentGrantService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _users(streaks: list[int]) -> list[int]:
+    ids = []
+    for streak in streaks:
+        user = UserService.create_guest_user()
+        user.streak_current = streak
+        user.plan = PlanType.PREMIUM if streak >= 5 else PlanType.FREE
+        ids.append(user.id)
+    db.session.commit()
+    return ids
+
+
+def _coins(user_ids: list[int]) -> list[int]:
+    db.session.expire_all()
+    return [db.session.get(User, user_id).coins for user_id in user_ids]
+
+
+def test_coin_grant_is_chunked_and_resumable(app):
+    user_ids = _users([0, 5, 6, 7, 9, 1])
+    before = _coins(user_ids)
+    job = SegmentGrantService.create_job(
+        {"filters": {"plan": "premium", "min_streak": 5}, "grant": {"type": "coins", "amount": 50}, "chunk_size": 2}
+    )
+    assert job.total == 4
+
+    job = JobRunService.run(job.id, max_chunks=1)
+    assert (job.status, job.processed) == (JobRun.STATUS_RUNNING, 2)
+
+    # A failing chunk rolls back on its own and leaves the checkpoint where it was.
+    with patch.object(SegmentGrantService, "_grant_coins", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError):
+            JobRunService.run(job.id)
+    job = JobRunService.get(job.id)
+    assert (job.status, job.processed, job.error) == (JobRun.STATUS_FAILED, 2, "boom")
+
+    job = JobRunService.run(job.id)
+    assert (job.status, job.processed, job.affected) == (JobRun.STATUS_COMPLETED, 4, 4)
+    after = _coins(user_ids)
+    assert [a - b for a, b in zip(after, before)] == [0, 50, 50, 50, 50, 0]
+
+
+def test_segment_is_frozen_when_the_job_is_created(app):
+    user_ids = _users([5, 6, 7])
+    job = SegmentGrantService.create_job(
+        {"filters": {"min_streak": 5}, "grant": {"type": "coins", "amount": 10}, "chunk_size": 1}
+    )
+    job = JobRunService.run(job.id, max_chunks=1)
+
+    # Between chunks a new user starts matching and a pending member stops matching.
+    late = _users([9])
+    db.session.get(User, user_ids[2]).streak_current = 0
+    db.session.commit()
+    before = _coins(user_ids + late)
+
+    job = JobRunService.run(job.id)
+    assert (job.status, job.total, job.processed) == (JobRun.STATUS_COMPLETED, 3, 3)
+    assert [a - b for a, b in zip(_coins(user_ids + late), before)] == [0, 10, 10, 0]
+    assert db.session.query(JobRunMember).count() == 0
+
+
+def test_chest_grant_tops_up_or_creates_stacks(app):
+    user_ids = _users([3, 3, 0])
+    chest_item = Item(name="Gift chest", default_source="chest")
+    db.session.add(chest_item)
+    db.session.flush()
+    db.session.add(Chest(item_id=chest_item.id, tier="rare"))
+    pet = PetService.get_pet_by_user(user_ids[0])
+    ItemOwnershipDAO.create_item_ownership(user_ids[0], chest_item.id, pet.id, 2)
+    db.session.commit()
+
+    job = SegmentGrantService.create_job(
+        {"filters": {"min_streak": 1}, "grant": {"type": "chests", "tier": "rare", "quantity": 3}}
+    )
+    job = JobRunService.run(job.id)
+    assert (job.status, job.affected) == (JobRun.STATUS_COMPLETED, 2)
+
+    db.session.expire_all()
+    assert ItemOwnershipDAO.get_item_from_inventory(user_ids[0], chest_item.id).quantity == 5
+    created = ItemOwnershipDAO.get_item_from_inventory(user_ids[1], chest_item.id)
+    assert created.quantity == 3
+    assert created.pet_id == PetService.get_pet_by_user(user_ids[1]).id
+    assert ItemOwnershipDAO.get_item_from_inventory(user_ids[2], chest_item.id) is None
+
+    with pytest.raises(ValueError):
+        SegmentGrantService.create_job({"grant": {"type": "coins", "amount": 0}})
@@ -0,0 +1,102 @@
+import pytest
+
+from app import create_app
+from app.config import DEFAULT_SECRET_KEY, Config
+from app.auth.token_auth import token_required
+from app.models import AuthToken, db
+from app.services.auth_token_service import AuthTokenService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+    AUTH_TOKEN_FORMAT = "signed"
+    SECRET_KEY = "test-signing-key"
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+
+    @app.route("/protected")
+    @token_required  # type: ignore[misc]
+    def protected():  # pragma: no cover - minimal route for testing
+        return "ok"
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _guest(app) -> int:
+    with app.app_context():
+        user = UserService.create_guest_user()
+        db.session.commit()
+        return user.id
+
+
+def test_signed_token_validates_without_token_row(app):
+    user_id = _guest(app)
+    with app.app_context():
+        token_value = AuthTokenService.issue_token(user_id)
+        db.session.commit()
+        assert AuthTokenService.is_signed_token(token_value)
+        assert AuthToken.query.count() == 0
+
+    client = app.test_client()
+    resp = client.get("/protected", headers={"Authorization": f"Bearer {token_value}"})
+    assert resp.status_code == 200
+
+    tampered = token_value[:-2] + ("AA" if not token_value.endswith("AA") else "BB")
+    resp = client.get("/protected", headers={"Authorization": f"Bearer {tampered}"})
+    assert resp.status_code == 401
+
+
+def test_logout_bumps_generation(app):
+    user_id = _guest(app)
+    with app.app_context():
+        token_value = AuthTokenService.issue_token(user_id)
+        db.session.commit()
+
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token_value}"}
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.get("/protected", headers=headers).status_code == 401
+
+    with app.app_context():
+        fresh_token = AuthTokenService.issue_token(user_id)
+        db.session.commit()
+    resp = client.get("/protected", headers={"Authorization": f"Bearer {fresh_token}"})
+    assert resp.status_code == 200
+
+
+def test_deactivate_revokes_signed_and_opaque_tokens(app):
+    user_id = _guest(app)
+    with app.app_context():
+        signed_token = AuthTokenService.issue_token(user_id)
+        app.config["AUTH_TOKEN_FORMAT"] = "opaque"
+        opaque_token = AuthTokenService.issue_token(user_id)
+        app.config["AUTH_TOKEN_FORMAT"] = "signed"
+        db.session.commit()
+
+    client = app.test_client()
+    # Opaque tokens issued before the switch keep working.
+    assert client.get("/protected", headers={"Authorization": f"Bearer {opaque_token}"}).status_code == 200
+    assert client.get("/protected", headers={"Authorization": f"Bearer {signed_token}"}).status_code == 200
+
+    with app.app_context():
+        assert UserService.deactivate_user(user_id) is True
+
+    assert client.get("/protected", headers={"Authorization": f"Bearer {opaque_token}"}).status_code == 401
+    assert client.get("/protected", headers={"Authorization": f"Bearer {signed_token}"}).status_code == 401
+
+
+def test_signed_tokens_refuse_the_default_secret_key():
+    class DefaultKeyConfig(TestConfig):
+        SECRET_KEY = DEFAULT_SECRET_KEY
+
+    with pytest.raises(RuntimeError):
+        create_app(DefaultKeyConfig)
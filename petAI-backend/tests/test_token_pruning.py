@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.models import AuthToken, db
+from app.services.auth_token_service import AuthTokenService
+from app.services.user_service import UserService
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    TESTING = True
+    AUTH_TOKEN_FORMAT = "opaque"
+
+
+@pytest.fixture()
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def user_id(app):
+    user = UserService.create_guest_user()
+    db.session.commit()
+    return user.id
+
+
+def test_device_policy_reuse_and_rotate(app, user_id):
+    app.config["AUTH_TOKEN_DEVICE_POLICY"] = "reuse"
+    first = AuthTokenService.issue_token(user_id, "phone-1")
+    db.session.commit()
+    assert AuthTokenService.issue_token(user_id, "phone-1") == first
+    db.session.commit()
+    assert AuthToken.query.count() == 1
+
+    app.config["AUTH_TOKEN_DEVICE_POLICY"] = "rotate"
+    rotated = AuthTokenService.issue_token(user_id, "phone-1")
+    db.session.commit()
+    assert rotated != first
+    assert [t.token for t in AuthToken.query.all()] == [rotated]
+
+    # Tokens without a device id keep the old insert-per-login behaviour.
+    AuthTokenService.issue_token(user_id)
+    AuthTokenService.issue_token(user_id)
+    db.session.commit()
+    assert AuthToken.query.count() == 3
+
+
+def test_prune_tokens_removes_expired_and_superseded(app, user_id):
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    for index in range(5):
+        db.session.add(AuthToken(user_id=user_id, token=f"expired-{index}", expires_at=past))
+    for index in range(3):
+        db.session.add(AuthToken(user_id=user_id, token=f"tablet-{index}", device_id="tablet"))
+    db.session.add(AuthToken(user_id=user_id, token="live"))
+    db.session.commit()
+
+    report = AuthTokenService.prune_tokens(batch_size=2)
+    assert report["rows_before"] == 9
+    assert report["deleted_expired"] == 5
+    assert report["deleted_superseded"] == 2
+    assert report["rows_after"] == 2
+    assert report["batches"] == 4
+    assert sorted(t.token for t in AuthToken.query.all()) == ["live", "tablet-2"]
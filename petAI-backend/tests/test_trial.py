@@ -8,6 +8,8 @@ from app.models import db
 from app.auth.token_auth import active_user_required, token_required
 from app.dao.userDAO import UserDAO
 from app.services.auth_token_service import AuthTokenService
+from app.services.entitlement_sweeper import EntitlementSweeper
+from app.services.subscription_service import SubscriptionService
 from app.services.user_service import UserService
 
 
@@ -92,10 +94,30 @@ def test_token_blocked_when_trial_expired(app):
     assert resp.status_code == 403
 
     with app.app_context():
+        # The request itself is read-only; the sweeper persists the expiry.
+        assert UserDAO.get_by_id(user_id).is_active is True
+        result = EntitlementSweeper.sweep()
+        assert result == {"deactivated": 1, "reactivated": 0}
+        db.session.expire_all()
         user_obj = UserDAO.get_by_id(user_id)
         assert user_obj is not None
         assert user_obj.is_active is False
 
+    resp = client.get("/protected", headers=headers)
+    assert resp.status_code == 403
+
+    with app.app_context():
+        SubscriptionService.set_mock_subscription(user_id, active=True)
+        db.session.commit()
+
+    # Paid access unblocks immediately, before the sweeper flips the flag back.
+    assert client.get("/protected", headers=headers).status_code == 200
+
+    with app.app_context():
+        assert EntitlementSweeper.sweep() == {"deactivated": 0, "reactivated": 1}
+        db.session.expire_all()
+        assert UserDAO.get_by_id(user_id).is_active is True
+
 
 def test_streak_multiplier_scaling(ctx):
     assert UserService.streak_multiplier(0) == 1.0